@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CompaniesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.companies"
+
+    def ready(self):
+        from apps.companies import signals  # noqa: F401
+
+        # core has no app config of its own
+        from core import checks  # noqa: F401
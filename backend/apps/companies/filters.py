@@ -0,0 +1,23 @@
+"""
+Filters for companies
+"""
+import django_filters
+from apps.companies.models import Company
+from core.search import SearchSpec, search
+
+COMPANY_SEARCH = SearchSpec(fields=("name", "nit"), trigram_fields=("name", "nit"))
+
+
+class CompanyFilter(django_filters.FilterSet):
+    """Company filters: ?search= (ranked search over name and NIT)"""
+
+    search = django_filters.CharFilter(method="filter_search")
+
+    class Meta:
+        """Meta class"""
+
+        model = Company
+        fields = []
+
+    def filter_search(self, queryset, name, value):
+        return search(queryset, COMPANY_SEARCH, value)
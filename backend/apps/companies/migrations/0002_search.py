@@ -0,0 +1,29 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from core.search import SearchSpec, drop_search_schema_statements, search_schema_statements
+
+COMPANY_SEARCH = SearchSpec(fields=("name", "nit"), trigram_fields=("name", "nit"))
+
+
+def create_search_schema(apps, schema_editor):
+    for statement in search_schema_statements(schema_editor.connection.vendor, "companies_company", COMPANY_SEARCH):
+        schema_editor.execute(statement)
+
+
+def drop_search_schema(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for statement in drop_search_schema_statements(vendor, "companies_company", COMPANY_SEARCH):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0001_initial"),
+    ]
+
+    operations = [
+        # No-op on databases other than PostgreSQL
+        TrigramExtension(),
+        migrations.RunPython(create_search_schema, drop_search_schema),
+    ]
@@ -0,0 +1,31 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+from core.search import SearchSpec, sqlite_fts_statements
+
+COMPANY_SEARCH = SearchSpec(fields=("name", "nit"), trigram_fields=("name", "nit"))
+
+
+def restore_sqlite_fts(apps, schema_editor):
+    """SQLite rebuilds the table to add the column, which drops the FTS triggers"""
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in sqlite_fts_statements("companies_company", COMPANY_SEARCH):
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0002_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="company",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name="Updated at"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(restore_sqlite_fts, migrations.RunPython.noop),
+    ]
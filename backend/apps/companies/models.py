@@ -13,6 +13,7 @@ class Company(models.Model):
     name = models.CharField(max_length=255, verbose_name="Nombre de la empresa")
     address = models.CharField(max_length=255, verbose_name="Dirección")
     phone = models.CharField(max_length=20, verbose_name="Teléfono")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Updated at")
 
     def __str__(self):
         return f"{self.name} ({self.nit})"
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from .models import Company
 
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Company serializer"""
 
     class Meta:
@@ -0,0 +1,15 @@
+"""
+Signals for companies
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.companies.models import Company
+from core.response_cache import ResponseCache
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_responses(sender, instance: Company, **kwargs) -> None:
+    """Drop the cached company lists and the cached detail of the changed company"""
+    ResponseCache.for_model(Company).invalidate(instance.pk)
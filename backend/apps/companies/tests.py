@@ -98,3 +98,216 @@ class TestCompanyAPI:
         # If permissions are set up, it should be 403 FORBIDDEN
         # Currently it might be 201 CREATED without proper permissions
         assert response.status_code in [status.HTTP_403_FORBIDDEN]
+
+    def test_export_companies_csv(self) -> None:
+        """Test that companies are streamed as CSV."""
+        Company.objects.create(**self.company_data)
+        response = self.external_client.get(reverse("company-export"))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "ID,NIT,Name,Address,Phone"
+        assert lines[1].endswith("987654321,New Company,New Address 123,555-9876")
+
+    def test_export_unsupported_type(self) -> None:
+        """Test that unknown export types are rejected."""
+        response: Response = self.admin_client.get(reverse("company-export"), {"type": "pdf"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_companies_page_size(self) -> None:
+        """Test that companies are paginated on request with ?page_size=."""
+        for index in range(3):
+            Company.objects.create(**{**self.company_data, "nit": f"nit-{index}"})
+        assert isinstance(self.admin_client.get(self.company_list_url).data, list)
+
+        response: Response = self.admin_client.get(self.company_list_url, {"page_size": 2})
+        assert response.data["count"] == 3
+        assert len(response.data["results"]) == 2
+        assert response.data["next"] is not None
+
+    def test_conditional_get(self, company, company_factory, django_assert_num_queries, settings) -> None:
+        """Test that list and detail answer 304 to a matching validator, with a single query."""
+        settings.API_CACHE_TIMEOUT = 0
+        detail_url: str = reverse("company-detail", kwargs={"pk": company.id})
+        listing: Response = self.external_client.get(self.company_list_url)
+        detail: Response = self.external_client.get(detail_url)
+        assert listing["ETag"].startswith('W/"') and listing["ETag"] != detail["ETag"]
+        assert "Last-Modified" in detail
+
+        with django_assert_num_queries(1):
+            not_modified = self.external_client.get(self.company_list_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified["ETag"] == listing["ETag"]
+        since = self.external_client.get(detail_url, HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"])
+        assert since.status_code == status.HTTP_304_NOT_MODIFIED
+
+        company.name = "Renamed"
+        company.save()
+        changed = self.external_client.get(self.company_list_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+        assert changed.status_code == status.HTTP_200_OK
+        changed_detail = self.external_client.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"])
+        assert changed_detail.data["name"] == "Renamed"
+
+        # Deleting a row leaves MAX(updated_at) alone but changes the count
+        extra = company_factory(nit="900000001")
+        listing = self.external_client.get(self.company_list_url)
+        Company.objects.exclude(pk=extra.pk).delete()
+        after_delete = self.external_client.get(self.company_list_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+        assert after_delete.status_code == status.HTTP_200_OK
+
+    def test_cached_responses(self, company, django_assert_num_queries, settings) -> None:
+        """Test that lists and details are served from the cache until a company changes."""
+        settings.API_CACHE_TIMEOUT = 300
+        detail_url: str = reverse("company-detail", kwargs={"pk": company.id})
+        first: Response = self.external_client.get(self.company_list_url)
+        self.external_client.get(detail_url)
+
+        with django_assert_num_queries(0):
+            cached: Response = self.external_client.get(self.company_list_url)
+            cached_detail: Response = self.external_client.get(detail_url)
+            not_modified = self.external_client.get(detail_url, HTTP_IF_NONE_MATCH=cached_detail["ETag"])
+        assert cached.data == first.data
+        assert cached["ETag"] == first["ETag"]
+        assert cached_detail.data["name"] == company.name
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Each query string is cached on its own
+        filtered: Response = self.external_client.get(self.company_list_url, {"search": "nothing-like-this"})
+        assert filtered.data == []
+
+        self.admin_client.patch(detail_url, {"name": "Renamed"}, format="json")
+        assert self.external_client.get(self.company_list_url).data[0]["name"] == "Renamed"
+        assert self.external_client.get(detail_url).data["name"] == "Renamed"
+
+        company.delete()
+        assert self.external_client.get(self.company_list_url).data == []
+        assert self.external_client.get(detail_url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_response_cache_needs_a_shared_cache(self, settings) -> None:
+        """Test the system check warning about cached responses in a per-process cache."""
+        from core.checks import check_response_cache
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        settings.API_CACHE_TIMEOUT = 0
+        assert check_response_cache(None) == []
+        settings.API_CACHE_TIMEOUT = 300
+        assert [message.id for message in check_response_cache(None)] == ["core.W001"]
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        assert check_response_cache(None) == []
+
+    def test_response_cache_computes_cold_key_once(self, settings) -> None:
+        """Test that requests arriving while a key is computed wait for it instead of computing it too."""
+        import threading
+        from core.response_cache import ResponseCache
+
+        settings.API_CACHE_TIMEOUT = 300
+        response_cache = ResponseCache("tests.stampede")
+        started, release = threading.Event(), threading.Event()
+        calls: list = []
+
+        def slow_compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results: list = []
+        first = threading.Thread(target=lambda: results.append(response_cache.get_or_compute("key", slow_compute)))
+        first.start()
+        started.wait(5)
+        waiters = [
+            threading.Thread(target=lambda: results.append(response_cache.get_or_compute("key", slow_compute)))
+            for _ in range(3)
+        ]
+        for waiter in waiters:
+            waiter.start()
+        release.set()
+        for thread in [first, *waiters]:
+            thread.join(5)
+
+        assert results == ["value"] * 4
+        assert len(calls) == 1
+
+    def test_fast_list_matches_serializer_bytes(self, company_factory, settings) -> None:
+        """Test that the values() list path and the orjson renderer produce the same bytes as before."""
+        from rest_framework.renderers import JSONRenderer
+
+        settings.API_CACHE_TIMEOUT = 0
+        company_factory(nit="900000001", name="Compañía \u2028 «Ñandú»", address='Calle "10" #5', phone="")
+        company_factory(nit="900000002", name="Beta", address="-", phone="555")
+
+        for params in ({"fields": "id,name"}, {"page_size": 1}, {"search": "beta"}, {}):
+            settings.API_FAST_LISTS = True
+            fast: Response = self.external_client.get(self.company_list_url, params)
+            settings.API_FAST_LISTS = False
+            regular: Response = self.external_client.get(self.company_list_url, params)
+            assert fast.content == regular.content, params
+            assert fast.content == JSONRenderer().render(regular.data), params
+        assert b"\\u2028" in fast.content
+
+    def test_request_metrics(self, company, settings, tmp_path) -> None:
+        """Test the Server-Timing header and the metrics endpoint adding up every worker."""
+        import json
+        import re
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.metrics import registry
+
+        settings.API_CACHE_TIMEOUT = 0
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.external_client.get(self.company_list_url)
+        timing = response["Server-Timing"]
+        assert re.match(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+, render;dur=[\d.]+, total;dur=', timing)
+        assert f'desc="{len(queries)} queries"' in timing
+
+        # Another worker's dump in the shared directory
+        settings.METRICS_DIR = str(tmp_path)
+        requests_key = ("http_requests_total", (("route", "company-list"), ("method", "GET"), ("status", "200")))
+        labels = [["route", "company-list"], ["method", "GET"], ["status", "200"]]
+        other_worker = {"counters": [["http_requests_total", labels, 5]], "histograms": []}
+        (tmp_path / "metrics-0.json").write_text(json.dumps(other_worker))
+
+        # Closed until a token is configured
+        settings.METRICS_TOKEN = ""
+        assert APIClient().get(reverse("metrics")).status_code == status.HTTP_403_FORBIDDEN
+
+        settings.METRICS_TOKEN = "scraper"
+        assert APIClient().get(reverse("metrics")).status_code == status.HTTP_403_FORBIDDEN
+        metrics: Response = APIClient().get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scraper")
+        assert metrics.status_code == status.HTTP_200_OK
+        assert metrics["Content-Type"].startswith("text/plain; version=0.0.4")
+        text = metrics.content.decode()
+        total = int(registry.counters[requests_key]) + 5
+        assert f'http_requests_total{{route="company-list",method="GET",status="200"}} {total}' in text
+        assert 'http_request_duration_seconds_bucket{route="company-list",method="GET",le="+Inf"}' in text
+        assert 'http_request_phase_seconds_count{route="company-list",method="GET",phase="db"}' in text
+
+    def test_search_companies(self, company_factory) -> None:
+        """Test that ?search= matches companies by name or NIT."""
+        company_factory(nit="900123456", name="Acme Tools")
+        company_factory(nit="800555000", name="Globex Supplies")
+
+        by_name: Response = self.external_client.get(self.company_list_url, {"search": "acme"})
+        assert [item["name"] for item in by_name.data] == ["Acme Tools"]
+        by_nit: Response = self.external_client.get(self.company_list_url, {"search": "800555"})
+        assert [item["name"] for item in by_nit.data] == ["Globex Supplies"]
+
+    def test_global_search(self, company_factory, product_factory) -> None:
+        """Test that /api/search/ returns ranked products and companies with a link to more results."""
+        acme = company_factory(nit="900123456", name="Acme Tools")
+        for n in range(3):
+            product_factory(company=acme, code=f"AC-{n}", name=f"Acme anvil {n}")
+
+        response: Response = self.external_client.get(reverse("search"), {"q": "acme", "limit": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["name"] for item in response.data["companies"]["results"]] == ["Acme Tools"]
+        assert response.data["companies"]["next"] is None
+        assert len(response.data["products"]["results"]) == 2
+
+        next_page: Response = self.external_client.get(response.data["products"]["next"])
+        assert next_page.data["count"] == 3
+        assert len(next_page.data["results"]) == 1
+
+        assert self.external_client.get(reverse("search")).status_code == status.HTTP_400_BAD_REQUEST
@@ -2,20 +2,35 @@
 Views for companies
 """
 from rest_framework import viewsets
+from apps.companies.filters import CompanyFilter
 from apps.companies.models import Company
 from apps.companies.serializers import CompanySerializer
+from core.conditional import ConditionalGetMixin
+from core.response_cache import CachedResponseMixin
+from core.exports import ExportMixin
+from core.fastlist import FastListMixin
+from core.fieldsets import SparseFieldsetsMixin
 from core.permissions import IsAdminOrReadOnly
 
 # Create your views here.
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(
+    CachedResponseMixin, ConditionalGetMixin, SparseFieldsetsMixin, FastListMixin, ExportMixin, viewsets.ModelViewSet
+):
     """
     Viewset para empresas.
     - Administradores pueden crear, leer, actualizar y eliminar empresas.
     - Usuarios externos solo pueden ver las empresas.
+    - Ambos roles pueden exportar las empresas en CSV o XLSX.
+    - Listado y detalle responden 304 cuando el cliente ya tiene la versión actual.
+    - Listado y detalle se sirven desde la caché hasta que cambia una fila.
+    - ?fields= y ?omit= limitan los campos devueltos (y las columnas leídas).
     """
 
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     permission_classes = [IsAdminOrReadOnly]
+    filterset_class = CompanyFilter
+    export_filename = "companies"
+    export_fields = [("ID", "id"), ("NIT", "nit"), ("Name", "name"), ("Address", "address"), ("Phone", "phone")]
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Inventory
+from .models import Inventory, StockMovement, StockSnapshot, StockSummary
 
 # Register your models here.
 admin.site.register(Inventory)
+admin.site.register(StockSummary)
+admin.site.register(StockMovement)
+admin.site.register(StockSnapshot)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InventoriesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.inventories"
+
+    def ready(self):
+        from apps.inventories import signals  # noqa: F401
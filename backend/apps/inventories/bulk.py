@@ -0,0 +1,87 @@
+"""
+Batched inventory writes for the bulk endpoint.
+
+``bulk_create``/``bulk_update`` skip the model signals, so the stock summary,
+the movement ledger and the report cache version are updated here, in the
+same transaction: once per (company, product) pair and once per batch
+instead of once per record.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.inventories.ledger import record_movements
+from apps.inventories.models import Inventory, MovementReason
+from apps.inventories.report_cache import bump_data_version
+from apps.inventories.summary import apply_stock_change
+
+UPDATABLE_FIELDS = ("company", "product", "quantity")
+
+
+@dataclass
+class BulkWriteResult:
+    created: list[Inventory] = field(default_factory=list)
+    updated: list[Inventory] = field(default_factory=list)
+
+
+def bulk_write_inventory(creates: list[dict], updates: list[dict]) -> BulkWriteResult:
+    """
+    Create and update inventory records in batches of INVENTORY_BULK_BATCH_SIZE, in one transaction.
+
+    Args:
+        creates: Validated data of the records to create
+        updates: Validated (partial) data of the records to update, each with its ``id``
+    """
+    batch_size = settings.INVENTORY_BULK_BATCH_SIZE
+    stock = defaultdict(lambda: [0, 0])
+    movements = []
+
+    with transaction.atomic():
+        created = Inventory.objects.bulk_create([Inventory(**data) for data in creates], batch_size=batch_size)
+        for record in created:
+            stock[(record.company_id, record.product_id)][0] += record.quantity
+            stock[(record.company_id, record.product_id)][1] += 1
+            movements.append((record.company_id, record.product_id, record.quantity, MovementReason.CREATED, record.pk))
+
+        # Lock the records so the deltas are computed from the values being replaced
+        records = Inventory.objects.select_for_update().in_bulk([data["id"] for data in updates])
+        updated = {}
+        for data in updates:
+            record = records[data["id"]]
+            before = (record.company_id, record.product_id, record.quantity)
+            for name in UPDATABLE_FIELDS:
+                if name in data:
+                    setattr(record, name, data[name])
+            after = (record.company_id, record.product_id, record.quantity)
+            if after == before:
+                continue
+            updated[record.pk] = record
+            moved = before[:2] != after[:2]
+            stock[before[:2]][0] -= before[2]
+            stock[before[:2]][1] -= moved
+            stock[after[:2]][0] += after[2]
+            stock[after[:2]][1] += moved
+            if moved:
+                movements.append((*before[:2], -before[2], MovementReason.UPDATED, record.pk))
+                movements.append((*after, MovementReason.UPDATED, record.pk))
+            else:
+                movements.append((*after[:2], after[2] - before[2], MovementReason.UPDATED, record.pk))
+        # A record listed twice is written once, with its last values.
+        # bulk_update does not apply auto_now, so updated_at is set here
+        now = timezone.now()
+        for record in updated.values():
+            record.updated_at = now
+        Inventory.objects.bulk_update(list(updated.values()), (*UPDATABLE_FIELDS, "updated_at"), batch_size=batch_size)
+
+        for (company_id, product_id), (quantity, rows) in stock.items():
+            if quantity or rows:
+                apply_stock_change(company_id, product_id, quantity, rows)
+        record_movements(movements)
+
+        if created or updated:
+            transaction.on_commit(bump_data_version)
+
+    return BulkWriteResult(created=created, updated=list(updated.values()))
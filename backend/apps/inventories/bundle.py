@@ -0,0 +1,90 @@
+"""
+Per-company report bundle: one inventory PDF per company, streamed as a ZIP.
+"""
+import logging
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Iterator
+
+from django.db.models import QuerySet
+from django.utils.text import slugify
+
+from apps.companies.models import Company
+from apps.inventories.models import Inventory
+from apps.inventories.queries import fetch_report_rows
+from apps.inventories.workers import render_company_pdf, report_workers, shared_report_executor
+
+logger = logging.getLogger(__name__)
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object: zipfile falls back to data descriptors"""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def bundle_filename(company_id: int, company_name: str) -> str:
+    return f"{slugify(company_name) or 'company'}-{company_id}.pdf"
+
+
+def generate_inventory_bundle(inventory_queryset: QuerySet[Inventory]) -> Iterator[bytes]:
+    """
+    Render one report per company in a process pool and yield a ZIP archive.
+
+    Rows are fetched company by company and only a bounded number of reports
+    is in flight at any time; each PDF is added to the archive (and its bytes
+    sent) as soon as it finishes, in completion order. Reports not started
+    yet are cancelled if the download is abandoned.
+    """
+    companies = list(
+        Company.objects.filter(inventories__in=inventory_queryset)
+        .distinct()
+        .order_by("name", "id")
+        .values_list("id", "name")
+    )
+    workers = report_workers()
+    max_in_flight = workers * 2
+
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    pending: dict[Future, str] = {}
+    with shared_report_executor() as executor:
+
+        def write_finished(futures) -> bytes:
+            for future in futures:
+                filename = pending.pop(future)
+                archive.writestr(filename, future.result())
+                logger.info(f"Added {filename} to the inventory bundle")
+            return sink.drain()
+
+        try:
+            for company_id, company_name in companies:
+                rows = list(fetch_report_rows(inventory_queryset.filter(company_id=company_id), include_company=False))
+                future = executor.submit(render_company_pdf, company_name, rows)
+                pending[future] = bundle_filename(company_id, company_name)
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield write_finished(done)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield write_finished(done)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    archive.close()
+    yield sink.drain()
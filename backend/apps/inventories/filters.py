@@ -0,0 +1,33 @@
+"""
+Filters for inventories
+"""
+import django_filters
+from apps.inventories.models import Inventory, StockSummary
+
+
+class InventoryFilter(django_filters.FilterSet):
+    """
+    Inventory filters: ?company=, ?product=, ?quantity_min=, ?quantity_max=,
+    ?created_after= and ?created_before= (ISO 8601 datetimes).
+    """
+
+    quantity_min = django_filters.NumberFilter(field_name="quantity", lookup_expr="gte")
+    quantity_max = django_filters.NumberFilter(field_name="quantity", lookup_expr="lte")
+    created_after = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lte")
+
+    class Meta:
+        """Meta class"""
+
+        model = Inventory
+        fields = ["company", "product"]
+
+
+class StockSummaryFilter(django_filters.FilterSet):
+    """Stock summary filters: ?company= and ?product="""
+
+    class Meta:
+        """Meta class"""
+
+        model = StockSummary
+        fields = ["company", "product"]
@@ -0,0 +1,64 @@
+"""
+Background job handlers for inventories
+"""
+from django.conf import settings
+
+from apps.inventories.ledger import stock_changed_since_snapshot, take_stock_snapshot
+from apps.inventories.models import Inventory
+from apps.inventories.report_cache import report_cache
+from apps.inventories.utils import (
+    deliver_inventory_email,
+    deliver_inventory_emails,
+    generate_inventory_pdf,
+    generate_inventory_pdf_stream,
+)
+from apps.jobs.queue import JobResult, register, save_result_file, schedule
+
+
+@register("inventories.send_email")
+def send_email_job(payload: dict) -> dict:
+    """Render the inventory PDF and email it"""
+    deliver_inventory_email(email=payload["email"], company_id=payload.get("company_id"))
+    return {"message": f"The inventory has been sent successfully to {payload['email']}."}
+
+
+@register("inventories.send_email_bulk")
+def send_email_bulk_job(payload: dict) -> dict:
+    """Email the inventory PDF to many recipients and keep the per-recipient report"""
+    return deliver_inventory_emails(payload["emails"], company_id=payload.get("company_id"))
+
+
+@register("inventories.download_pdf")
+def download_pdf_job(payload: dict) -> JobResult:
+    """
+    Render the inventory PDF into a result file. Large reports are streamed
+    to the file page by page, so they are never held in memory whole.
+    """
+    stream = payload.get("stream", False)
+    queryset = Inventory.objects.all()
+    cache_key = report_cache.make_key("download_stream" if stream else "download")
+
+    cached_pdf = report_cache.get(cache_key)
+    if cached_pdf is not None:
+        chunks = [cached_pdf]
+    elif stream or queryset.count() > settings.INVENTORY_PDF_STREAMING_THRESHOLD:
+        chunks = report_cache.tee(cache_key, generate_inventory_pdf_stream(queryset))
+    else:
+        content = generate_inventory_pdf(queryset).getvalue()
+        report_cache.set(cache_key, content)
+        chunks = [content]
+
+    path, size = save_result_file(chunks, "inventory.pdf")
+    return JobResult(data={"size": size}, path=path, filename="inventory.pdf", content_type="application/pdf")
+
+
+@register("inventories.snapshot_stock")
+def snapshot_stock_job(payload: dict) -> dict:
+    """Snapshot the stock, unless nothing moved since the latest snapshot"""
+    if not stock_changed_since_snapshot():
+        return {"skipped": True}
+    taken_at, pairs = take_stock_snapshot()
+    return {"taken_at": taken_at.isoformat(), "pairs": pairs}
+
+
+schedule("inventories.snapshot_stock", "STOCK_SNAPSHOT_INTERVAL")
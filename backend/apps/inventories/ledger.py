@@ -0,0 +1,105 @@
+"""
+Stock movement ledger and point-in-time stock.
+
+Every inventory write appends one ``StockMovement`` row, so writes cost one
+INSERT whatever the size of the history. ``take_stock_snapshot`` stores the
+stock of every pair, every STOCK_SNAPSHOT_INTERVAL seconds from the job
+worker, and the stock at a given moment is read as the latest snapshot batch
+before it plus the movements since that batch: reads replay at most one
+snapshot interval of movements.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from apps.inventories.models import StockMovement, StockSnapshot
+
+
+def record_movement(
+    company_id: int, product_id: int, delta: int, reason: str, inventory_id: int | None = None
+) -> StockMovement | None:
+    """Append a stock change to the ledger; a zero delta is not recorded"""
+    if not delta:
+        return None
+    return StockMovement.objects.create(
+        company_id=company_id, product_id=product_id, inventory_id=inventory_id, delta=delta, reason=reason
+    )
+
+
+def record_movements(movements: list[tuple[int, int, int, str, int | None]]) -> int:
+    """
+    Append many stock changes at once, for writes that bypass the model signals.
+    Each movement is a (company id, product id, delta, reason, inventory id) tuple.
+    """
+    rows = [
+        StockMovement(company_id=company_id, product_id=product_id, delta=delta, reason=reason, inventory_id=pk)
+        for company_id, product_id, delta, reason, pk in movements
+        if delta
+    ]
+    return len(StockMovement.objects.bulk_create(rows, batch_size=settings.INVENTORY_BULK_BATCH_SIZE))
+
+
+def stock_as_of(moment: datetime, company_id: int | None = None, product_id: int | None = None) -> dict:
+    """
+    Stock of each (company, product) pair at ``moment``.
+
+    Returns the time of the snapshot the replay started from and the non-zero
+    stock keyed by (company id, product id).
+    """
+    pair_filter = {}
+    if company_id is not None:
+        pair_filter["company_id"] = company_id
+    if product_id is not None:
+        pair_filter["product_id"] = product_id
+
+    snapshot_at = StockSnapshot.objects.filter(taken_at__lte=moment).aggregate(last=Max("taken_at"))["last"]
+    stock: dict[tuple[int, int], int] = {}
+    movements = StockMovement.objects.filter(created_at__lte=moment, **pair_filter)
+    if snapshot_at is not None:
+        snapshot = StockSnapshot.objects.filter(taken_at=snapshot_at, **pair_filter)
+        for company, product, quantity in snapshot.values_list("company_id", "product_id", "quantity"):
+            stock[(company, product)] = quantity
+        movements = movements.filter(created_at__gt=snapshot_at)
+
+    changes = movements.values("company_id", "product_id").annotate(total=Sum("delta")).order_by()
+    for row in changes:
+        pair = (row["company_id"], row["product_id"])
+        stock[pair] = stock.get(pair, 0) + row["total"]
+
+    return {
+        "snapshot_at": snapshot_at,
+        "stock": {pair: quantity for pair, quantity in sorted(stock.items()) if quantity},
+    }
+
+
+def stock_changed_since_snapshot() -> bool:
+    """Whether movements were recorded after the latest snapshot (or there is no snapshot yet)"""
+    latest = StockSnapshot.objects.aggregate(last=Max("taken_at"))["last"]
+    movements = StockMovement.objects.all()
+    if latest is not None:
+        movements = movements.filter(created_at__gt=latest)
+    return movements.exists()
+
+
+def take_stock_snapshot(moment: datetime | None = None) -> tuple[datetime, int]:
+    """
+    Store the stock of every pair at ``moment`` as one snapshot batch.
+
+    By default the moment lags STOCK_SNAPSHOT_LAG seconds behind now, so
+    movements of transactions still in flight are not left out of it.
+    Returns the snapshot time and the number of pairs stored.
+    """
+    if moment is None:
+        moment = timezone.now() - timedelta(seconds=settings.STOCK_SNAPSHOT_LAG)
+    stock = stock_as_of(moment)["stock"]
+    snapshots = [
+        StockSnapshot(company_id=company, product_id=product, quantity=quantity, taken_at=moment)
+        for (company, product), quantity in stock.items()
+    ]
+    with transaction.atomic():
+        StockSnapshot.objects.filter(taken_at=moment).delete()
+        StockSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return moment, len(snapshots)
@@ -0,0 +1,229 @@
+"""
+Time the hot API endpoints on seeded data, through the full middleware stack.
+
+    python manage.py benchmark --output bench.json
+    python manage.py benchmark --baseline bench.json --threshold 0.2
+
+Seeds --companies, --products and --inventories rows (1k, 100k and 1M by
+default) inside a transaction that is rolled back at the end; --no-seed times
+the data already in the database instead. Each endpoint is requested --repeat
+times: ``cold_ms`` is the first request, before the response and report
+caches are warm, and ``median_ms``/``p95_ms``/``min_ms`` cover every request.
+Caches and email go to private in-memory backends while it runs.
+
+The results are written as JSON (stdout, or --output). With --baseline, the
+chosen --metric of every endpoint is compared to that earlier run and the
+command fails when one is more than --threshold slower.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from functools import partial
+from typing import Callable
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.inventories.models import Inventory
+from apps.inventories.seed import seed_catalog
+from apps.products.models import Product
+from apps.users.models import RoleChoices, User
+
+BENCHMARK_EMAIL = "benchmark@example.com"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+METRICS = ("cold_ms", "median_ms", "p95_ms", "min_ms")
+
+
+def endpoints(company_id: int, product_id: int, inventory_id: int) -> list[tuple[str, str, str, dict]]:
+    """(name, method, url, params or body) of every timed request"""
+    return [
+        (
+            "token_obtain",
+            "post",
+            reverse("token_obtain_pair"),
+            {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD},
+        ),
+        ("companies_list", "get", reverse("company-list"), {"page_size": 100}),
+        ("companies_search", "get", reverse("company-list"), {"search": "Company 42", "page_size": 100}),
+        ("company_retrieve", "get", reverse("company-detail", kwargs={"pk": company_id}), {}),
+        ("products_list", "get", reverse("product-list"), {"page_size": 100}),
+        ("products_filter", "get", reverse("product-list"), {"company": company_id, "page_size": 100}),
+        ("products_by_price", "get", reverse("product-list"), {"ordering": "-price_usd", "page_size": 100}),
+        ("products_search", "get", reverse("product-list"), {"search": "Product 42", "page_size": 100}),
+        ("product_retrieve", "get", reverse("product-detail", kwargs={"pk": product_id}), {}),
+        ("inventories_list", "get", reverse("inventory-list"), {}),
+        ("inventories_filter", "get", reverse("inventory-list"), {"company": company_id}),
+        ("inventory_retrieve", "get", reverse("inventory-detail", kwargs={"pk": inventory_id}), {}),
+        ("download_pdf", "get", reverse("inventory-download-pdf"), {}),
+        (
+            "send_email",
+            "post",
+            reverse("inventory-send-email"),
+            {"email": "bench@example.com", "company_id": company_id},
+        ),
+    ]
+
+
+def _consume(response) -> int:
+    """Read the whole body, as a client would, and return its size"""
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(results: dict, baseline: dict, metric: str, threshold: float) -> list[tuple[str, float, float, float]]:
+    """(name, baseline, current, ratio) of the endpoints more than threshold slower than the baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name, {}).get(metric)
+        if not before:
+            continue
+        ratio = result[metric] / before
+        if ratio > 1 + threshold:
+            regressions.append((name, before, result[metric], ratio))
+    return regressions
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API endpoints on seeded data and check for regressions against a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=1000)
+        parser.add_argument("--products", type=int, default=100000)
+        parser.add_argument("--inventories", type=int, default=1000000)
+        parser.add_argument("--no-seed", action="store_true", help="Time the rows already in the database")
+        parser.add_argument("--repeat", type=int, default=5, help="Requests per endpoint")
+        parser.add_argument("--only", default="", help="Comma separated endpoint names")
+        parser.add_argument("--output", help="JSON file to write the results to (default: stdout)")
+        parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+        parser.add_argument("--metric", choices=METRICS, default="median_ms", help="Timing compared to the baseline")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown (0.2 = 20%%)")
+
+    def handle(self, *args, **options):
+        only = {name.strip() for name in options["only"].split(",") if name.strip()}
+        private_backends = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark"}},
+            API_CACHE_ALIAS="default",
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            JOBS_RUN_EAGERLY=False,
+            METRICS_DIR="",
+        )
+        with private_backends, transaction.atomic():
+            if not options["no_seed"]:
+                started = time.perf_counter()
+                seed_catalog(options["companies"], options["products"], options["inventories"])
+                self.stderr.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+            results = self.run(options["repeat"], only)
+            volumes = {
+                "companies": Company.objects.count(),
+                "products": Product.objects.count(),
+                "inventories": Inventory.objects.count(),
+            }
+            transaction.set_rollback(True)
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "repeat": options["repeat"],
+                "volumes": volumes,
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as stream:
+                stream.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as stream:
+                baseline = json.load(stream)["results"]
+            self.check_regressions(results, baseline, options["metric"], options["threshold"])
+
+    def run(self, repeat: int, only: set[str]) -> dict:
+        company, product, inventory = Company.objects.first(), Product.objects.first(), Inventory.objects.first()
+        if company is None or product is None or inventory is None:
+            raise CommandError("There are no companies, products and inventory records to benchmark")
+        User.objects.create_user(
+            username="benchmark", email=BENCHMARK_EMAIL, password=BENCHMARK_PASSWORD, role=RoleChoices.ADMIN
+        )
+        client = APIClient()
+        access = client.post(reverse("token_obtain_pair"), {"email": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD})
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access.data['access']}")
+
+        results = {}
+        self.stderr.write(
+            f"{'endpoint':<20} {'status':>6} {'queries':>8} {'cold ms':>9} {'median ms':>10} {'p95 ms':>9}"
+        )
+        for name, method, url, data in endpoints(company.pk, product.pk, inventory.pk):
+            if only and name not in only:
+                continue
+            send = partial(getattr(client, method), url, data, **({"format": "json"} if method == "post" else {}))
+            result = results[name] = self.measure(send, repeat)
+            self.stderr.write(
+                f"{name:<20} {result['status']:>6} {result['queries']:>8} {result['cold_ms']:>9.1f} "
+                f"{result['median_ms']:>10.1f} {result['p95_ms']:>9.1f}"
+            )
+        return results
+
+    @staticmethod
+    def measure(request: Callable, repeat: int) -> dict:
+        timings, queries = [], 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        for attempt in range(max(repeat, 1)):
+            queries = 0
+            with connection.execute_wrapper(count_query):
+                started = time.perf_counter()
+                response = request()
+                size = _consume(response)
+                timings.append((time.perf_counter() - started) * 1000)
+            if attempt == 0:
+                first = {"status": response.status_code, "queries": queries, "bytes": size}
+        ordered = sorted(timings)
+        return {
+            **first,
+            "cold_ms": timings[0],
+            "median_ms": statistics.median(timings),
+            "p95_ms": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+            "min_ms": ordered[0],
+        }
+
+    def check_regressions(self, results: dict, baseline: dict, metric: str, threshold: float) -> None:
+        regressions = compare(results, baseline, metric, threshold)
+        for name, before, after, ratio in regressions:
+            self.stderr.write(f"{name}: {metric} {before:.1f} -> {after:.1f} ({ratio:.2f}x)")
+        if regressions:
+            names = ", ".join(name for name, *_ in regressions)
+            raise CommandError(
+                f"{len(regressions)} endpoint(s) more than {threshold:.0%} slower than the baseline: {names}"
+            )
+        self.stderr.write(f"No endpoint is more than {threshold:.0%} slower than the baseline ({metric})")
@@ -0,0 +1,78 @@
+"""
+Compare the serializer list path with the values() fast path (core.fastlist).
+
+    python manage.py benchmark_lists --rows 50000
+
+Seeds companies, products and inventory records inside a transaction that is
+rolled back at the end, then renders each list both ways and checks that the
+bytes are identical.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.companies.models import Company
+from apps.companies.serializers import CompanySerializer
+from apps.inventories.models import Inventory
+from apps.inventories.seed import seed_catalog
+from apps.inventories.serializers import InventorySerializer
+from apps.products.models import Product
+from apps.products.serializers import ProductSerializer
+from core.fastlist import render_rows, row_plan
+from core.renderers import ORJSONRenderer
+
+LISTS = [
+    ("companies", Company, CompanySerializer),
+    ("products", Product, ProductSerializer),
+    ("inventories", Inventory, InventorySerializer),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark serializer vs values() list rendering on seeded data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=20000, help="Inventory records (plus 1/10 products, 1/100 companies)"
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best one is reported")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = options["rows"]
+            seed_catalog(companies=rows // 100, products=rows // 10, inventories=rows)
+            self.stdout.write(f"{'list':<12} {'rows':>8} {'serializer rows/s':>18} {'fast rows/s':>12} {'speedup':>8}")
+            for name, model, serializer_class in LISTS:
+                self.benchmark(name, model, serializer_class, options["repeat"])
+            transaction.set_rollback(True)
+
+    def benchmark(self, name: str, model, serializer_class, repeat: int) -> None:
+        queryset = model.objects.all()
+        plan = row_plan(model, serializer_class())
+        keys = {key for _, key, _ in plan}
+
+        def regular() -> bytes:
+            return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+        def fast() -> bytes:
+            return ORJSONRenderer().render(render_rows(queryset.values(*keys), plan))
+
+        (regular_time, expected), (fast_time, output) = _best(regular, repeat), _best(fast, repeat)
+        if output != expected:
+            raise CommandError(f"The fast {name} list differs from the serializer output")
+        rows = queryset.count()
+        self.stdout.write(
+            f"{name:<12} {rows:>8} {rows / regular_time:>18.0f} {rows / fast_time:>12.0f} "
+            f"{regular_time / fast_time:>7.2f}x"
+        )
+
+
+def _best(render, repeat: int) -> tuple[float, bytes]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = render()
+        timings.append(time.perf_counter() - started)
+    return min(timings), output
@@ -0,0 +1,65 @@
+"""
+Measure how streamed PDF rendering scales with the number of worker processes.
+
+    python manage.py benchmark_report --rows 100000 --workers 1,2,4,8
+
+Rows are synthetic, so only layout, compression and writing are measured.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.inventories.pdf_stream import Column, TextLine, stream_table_pdf, stream_table_pdf_parallel
+from apps.inventories.workers import report_executor
+
+COLUMNS = [
+    Column("ID", 50),
+    Column("Company", 120),
+    Column("Product", 140),
+    Column("Code", 80),
+    Column("Quantity", 60),
+    Column("Date", 90),
+]
+
+
+def synthetic_rows(count: int):
+    for i in range(count):
+        yield (str(i), f"Company {i % 500}", f"Product {i % 10000}", f"P{i:07d}", str(i % 1000), "01/01/2025 10:00")
+
+
+class Command(BaseCommand):
+    help = "Benchmark streamed inventory PDF rendering with different worker counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--workers", default="1,2,4", help="Comma separated worker counts")
+        parser.add_argument("--pages-per-segment", type=int, default=50)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        header = [TextLine("Inventory Report", size=18, bold=True, space_after=20)]
+        baseline = None
+        self.stdout.write(f"{'workers':>8} {'seconds':>9} {'rows/s':>10} {'speedup':>8} {'size (MB)':>10}")
+        for workers in [int(value) for value in options["workers"].split(",")]:
+            started = time.perf_counter()
+            size = 0
+            if workers <= 1:
+                chunks = stream_table_pdf(synthetic_rows(rows), COLUMNS, header)
+                size = sum(len(chunk) for chunk in chunks)
+            else:
+                with report_executor(workers) as executor:
+                    chunks = stream_table_pdf_parallel(
+                        synthetic_rows(rows),
+                        COLUMNS,
+                        executor,
+                        header,
+                        pages_per_segment=options["pages_per_segment"],
+                        max_in_flight=workers * 2,
+                    )
+                    size = sum(len(chunk) for chunk in chunks)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            self.stdout.write(
+                f"{workers:>8} {elapsed:>9.2f} {rows / elapsed:>10.0f} {speedup:>7.2f}x {size / 2**20:>10.1f}"
+            )
@@ -0,0 +1,18 @@
+"""
+Recompute the StockSummary table from the inventory records.
+
+    python manage.py rebuild_stock_summary
+
+Needed after writes that bypass the model signals, such as QuerySet.update().
+"""
+from django.core.management.base import BaseCommand
+
+from apps.inventories.summary import rebuild_stock_summary
+
+
+class Command(BaseCommand):
+    help = "Recompute the per company and product stock totals"
+
+    def handle(self, *args, **options):
+        pairs = rebuild_stock_summary()
+        self.stdout.write(self.style.SUCCESS(f"Stock summary rebuilt for {pairs} company/product pairs"))
@@ -0,0 +1,20 @@
+"""
+Store a snapshot batch of the stock of every company and product.
+
+    python manage.py snapshot_stock
+
+The job worker (run_jobs) already takes one every STOCK_SNAPSHOT_INTERVAL
+seconds; point-in-time queries replay the movements since the latest
+snapshot, so the interval bounds their cost.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.inventories.ledger import take_stock_snapshot
+
+
+class Command(BaseCommand):
+    help = "Snapshot the stock of every company and product"
+
+    def handle(self, *args, **options):
+        taken_at, pairs = take_stock_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Stock snapshot of {pairs} company/product pairs at {taken_at}"))
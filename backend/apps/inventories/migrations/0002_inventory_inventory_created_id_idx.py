@@ -0,0 +1,16 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventories", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(fields=["-created_at", "-id"], name="inventory_created_id_idx"),
+        ),
+    ]
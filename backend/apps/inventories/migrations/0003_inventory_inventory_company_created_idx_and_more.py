@@ -0,0 +1,20 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventories", "0002_inventory_inventory_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(fields=["company", "-created_at", "-id"], name="inventory_company_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(fields=["product", "-created_at", "-id"], name="inventory_product_created_idx"),
+        ),
+    ]
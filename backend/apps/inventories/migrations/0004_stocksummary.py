@@ -0,0 +1,78 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:26
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+import django.db.models.deletion
+
+
+def populate_stock_summary(apps, schema_editor):
+    Inventory = apps.get_model("inventories", "Inventory")
+    StockSummary = apps.get_model("inventories", "StockSummary")
+    totals = (
+        Inventory.objects.values("company_id", "product_id")
+        .annotate(total=Sum("quantity"), rows=Count("id"), last=Max("created_at"))
+        .order_by()
+    )
+    StockSummary.objects.bulk_create(
+        [
+            StockSummary(
+                company_id=row["company_id"],
+                product_id=row["product_id"],
+                quantity=row["total"],
+                row_count=row["rows"],
+                last_changed_at=row["last"],
+            )
+            for row in totals
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0001_initial"),
+        ("companies", "0001_initial"),
+        ("inventories", "0003_inventory_inventory_company_created_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSummary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("quantity", models.PositiveBigIntegerField(default=0, verbose_name="Quantity")),
+                ("row_count", models.PositiveIntegerField(default=0, verbose_name="Inventory records")),
+                ("last_changed_at", models.DateTimeField(verbose_name="Last changed at")),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_summaries",
+                        to="companies.company",
+                        verbose_name="Company",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_summaries",
+                        to="products.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Stock summary",
+                "verbose_name_plural": "Stock summaries",
+                "ordering": ["company", "product"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="stocksummary",
+            constraint=models.UniqueConstraint(
+                fields=("company", "product"), name="stock_summary_company_product_uniq"
+            ),
+        ),
+        migrations.RunPython(populate_stock_summary, migrations.RunPython.noop),
+    ]
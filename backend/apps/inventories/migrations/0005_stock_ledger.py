@@ -0,0 +1,131 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def seed_ledger(apps, schema_editor):
+    """Record the existing inventory records as the initial movements"""
+    Inventory = apps.get_model("inventories", "Inventory")
+    StockMovement = apps.get_model("inventories", "StockMovement")
+    batch = []
+    records = Inventory.objects.filter(quantity__gt=0).values_list(
+        "id", "company_id", "product_id", "quantity", "created_at"
+    )
+    for inventory_id, company_id, product_id, quantity, created_at in records.iterator(chunk_size=2000):
+        batch.append(
+            StockMovement(
+                company_id=company_id,
+                product_id=product_id,
+                inventory_id=inventory_id,
+                delta=quantity,
+                reason="initial",
+                created_at=created_at,
+            )
+        )
+        if len(batch) >= 2000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0001_initial"),
+        ("products", "0001_initial"),
+        ("inventories", "0004_stocksummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("quantity", models.BigIntegerField(verbose_name="Quantity")),
+                ("taken_at", models.DateTimeField(verbose_name="Taken at")),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="companies.company",
+                        verbose_name="Company",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="products.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Stock snapshot",
+                "verbose_name_plural": "Stock snapshots",
+                "ordering": ["-taken_at", "company", "product"],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("inventory_id", models.BigIntegerField(blank=True, null=True, verbose_name="Inventory record")),
+                ("delta", models.BigIntegerField(verbose_name="Delta")),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("initial", "Initial"),
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=10,
+                        verbose_name="Reason",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name="Created at"),
+                ),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_movements",
+                        to="companies.company",
+                        verbose_name="Company",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_movements",
+                        to="products.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Stock movement",
+                "verbose_name_plural": "Stock movements",
+                "ordering": ["created_at", "id"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="stocksnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("taken_at", "company", "product"), name="stock_snapshot_batch_uniq"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockmovement",
+            index=models.Index(fields=["company", "product", "created_at"], name="stock_movement_pair_idx"),
+        ),
+        migrations.RunPython(seed_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created_at(apps, schema_editor):
+    """Existing records were last changed, as far as we know, when they were created"""
+    Inventory = apps.get_model("inventories", "Inventory")
+    Inventory.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventories", "0005_stock_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inventory",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name="Updated at"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
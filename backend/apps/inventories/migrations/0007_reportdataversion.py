@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-17 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventories", "0006_inventory_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportDataVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", models.PositiveBigIntegerField(default=0, verbose_name="Version")),
+            ],
+            options={
+                "verbose_name": "Report data version",
+                "verbose_name_plural": "Report data versions",
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from apps.companies.models import Company
 from apps.products.models import Product
 
@@ -10,14 +11,157 @@ class Inventory(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="inventories", verbose_name="Product")
     quantity = models.PositiveIntegerField(verbose_name="Quantity")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Updated at")
 
     def __str__(self):
         """String representation of the inventory"""
         return f"{self.company.name} - {self.product.name}: {self.quantity}"
 
+    def save(self, *args, **kwargs):
+        """Save the record and its StockSummary change in one transaction"""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete the record and its StockSummary change in one transaction"""
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     class Meta:
         """Meta class"""
 
         verbose_name = "Inventory"
         verbose_name_plural = "Inventories"
         ordering = ["-created_at"]
+        indexes = [
+            # Backs the keyset pagination of the inventory list
+            models.Index(fields=["-created_at", "-id"], name="inventory_created_id_idx"),
+            # Back the same pagination when the list is filtered by company or product
+            models.Index(fields=["company", "-created_at", "-id"], name="inventory_company_created_idx"),
+            models.Index(fields=["product", "-created_at", "-id"], name="inventory_product_created_idx"),
+        ]
+
+
+class StockSummary(models.Model):
+    """
+    Running totals of the inventory records of each (company, product) pair.
+    Kept up to date by the inventory signals, so totals are read without
+    scanning the inventory table.
+    """
+
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE, related_name="stock_summaries", verbose_name="Company"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_summaries", verbose_name="Product"
+    )
+    quantity = models.PositiveBigIntegerField(default=0, verbose_name="Quantity")
+    row_count = models.PositiveIntegerField(default=0, verbose_name="Inventory records")
+    last_changed_at = models.DateTimeField(verbose_name="Last changed at")
+
+    def __str__(self):
+        """String representation of the stock summary"""
+        return f"{self.company_id} - {self.product_id}: {self.quantity}"
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = "Stock summary"
+        verbose_name_plural = "Stock summaries"
+        ordering = ["company", "product"]
+        constraints = [
+            models.UniqueConstraint(fields=["company", "product"], name="stock_summary_company_product_uniq"),
+        ]
+
+
+class MovementReason(models.TextChoices):
+    """Why the stock of a company and product changed"""
+
+    INITIAL = "initial", "Initial"
+    CREATED = "created", "Created"
+    UPDATED = "updated", "Updated"
+    DELETED = "deleted", "Deleted"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of stock changes. Rows are never updated; the stock of
+    a pair at any moment is the sum of its deltas up to that moment.
+    """
+
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE, related_name="stock_movements", verbose_name="Company"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_movements", verbose_name="Product"
+    )
+    # Plain id so the history outlives the inventory record
+    inventory_id = models.BigIntegerField(null=True, blank=True, verbose_name="Inventory record")
+    delta = models.BigIntegerField(verbose_name="Delta")
+    reason = models.CharField(max_length=10, choices=MovementReason.choices, verbose_name="Reason")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Created at")
+
+    def __str__(self):
+        """String representation of the stock movement"""
+        return f"{self.company_id} - {self.product_id}: {self.delta:+d} ({self.reason})"
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = "Stock movement"
+        verbose_name_plural = "Stock movements"
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["company", "product", "created_at"], name="stock_movement_pair_idx"),
+        ]
+
+
+class StockSnapshot(models.Model):
+    """
+    Stock of every pair with stock at ``taken_at``. Snapshots are taken in
+    batches sharing one timestamp, so the state at any moment is the latest
+    batch before it plus the movements in between.
+    """
+
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE, related_name="stock_snapshots", verbose_name="Company"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_snapshots", verbose_name="Product"
+    )
+    quantity = models.BigIntegerField(verbose_name="Quantity")
+    taken_at = models.DateTimeField(verbose_name="Taken at")
+
+    def __str__(self):
+        """String representation of the stock snapshot"""
+        return f"{self.company_id} - {self.product_id}: {self.quantity} at {self.taken_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = "Stock snapshot"
+        verbose_name_plural = "Stock snapshots"
+        ordering = ["-taken_at", "company", "product"]
+        constraints = [
+            models.UniqueConstraint(fields=["taken_at", "company", "product"], name="stock_snapshot_batch_uniq"),
+        ]
+
+
+class ReportDataVersion(models.Model):
+    """
+    Single row counting the changes to the data shown in the inventory reports.
+    Cached reports are keyed by it, and it lives in the database so that every
+    process (web workers, the job worker, management commands) sees each bump.
+    """
+
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Version")
+
+    def __str__(self):
+        """String representation of the report data version"""
+        return f"Report data version {self.version}"
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = "Report data version"
+        verbose_name_plural = "Report data versions"
@@ -0,0 +1,353 @@
+"""
+Incremental PDF writer for large inventory reports.
+
+ReportLab keeps every page object in memory until ``doc.build`` finishes, so a
+report over hundreds of thousands of rows cannot start sending bytes until the
+whole document exists. This module writes the PDF objects one page at a time:
+only the byte offsets of the objects already sent are kept, so memory stays
+flat no matter how many rows the report has.
+"""
+import zlib
+from dataclasses import dataclass, field
+from collections import deque
+from concurrent.futures import Executor, Future
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 36
+ROW_HEIGHT = 20
+HEADER_HEIGHT = 24
+CELL_PADDING = 6
+
+# Object ids reserved up-front; page objects start after them
+CATALOG_ID = 1
+PAGES_ID = 2
+FONT_REGULAR_ID = 3
+FONT_BOLD_ID = 4
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+GREY = "0.502 0.502 0.502"
+LIGHT_GREY = "0.827 0.827 0.827"
+WHITE_SMOKE = "0.961 0.961 0.961"
+
+
+@dataclass(frozen=True)
+class Column:
+    """A table column: header label and width in points"""
+
+    label: str
+    width: float
+
+
+@dataclass(frozen=True)
+class TextLine:
+    """A centered line of text drawn above or below the table"""
+
+    text: str
+    size: float = 10
+    bold: bool = False
+    space_after: float = 6
+
+    @property
+    def height(self) -> float:
+        return self.size + self.space_after
+
+
+@dataclass
+class PageLayout:
+    """Everything needed to draw a single page, independent from the other pages"""
+
+    columns: Sequence[Column]
+    rows: Sequence[Sequence[str]]
+    page_number: int
+    top_lines: Sequence[TextLine] = field(default_factory=tuple)
+    bottom_lines: Sequence[TextLine] = field(default_factory=tuple)
+    show_table: bool = True
+
+
+def _encode(text: str) -> str:
+    """Encode text for a WinAnsi literal string, escaping PDF delimiters"""
+    raw = text.encode("cp1252", "replace").decode("latin-1")
+    return raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _fit(text: str, width: float, font: str, size: float) -> str:
+    """Truncate text with an ellipsis so it fits inside the given width"""
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def _text(x: float, y: float, text: str, font: str = "F1", size: float = 10) -> str:
+    return f"BT /{font} {size:g} Tf {x:.2f} {y:.2f} Td ({_encode(text)}) Tj ET\n"
+
+
+def _centered(y: float, line: TextLine) -> str:
+    font = "F2" if line.bold else "F1"
+    width = stringWidth(line.text, FONTS[font], line.size)
+    return _text((PAGE_WIDTH - width) / 2, y, line.text, font, line.size)
+
+
+def lines_height(lines: Iterable[TextLine]) -> float:
+    """Vertical space taken by a block of text lines"""
+    return sum(line.height for line in lines)
+
+
+def rows_capacity(top_lines: Sequence[TextLine] = (), bottom_lines: Sequence[TextLine] = ()) -> int:
+    """Number of table rows that fit on a page with the given text blocks"""
+    available = PAGE_HEIGHT - 2 * MARGIN - ROW_HEIGHT - HEADER_HEIGHT
+    available -= lines_height(top_lines) + lines_height(bottom_lines)
+    return max(int(available // ROW_HEIGHT), 0)
+
+
+def render_page(layout: PageLayout) -> bytes:
+    """
+    Render the content stream of one page.
+
+    This is a pure function of its arguments, so pages can be rendered in any
+    order (or in other processes) and stitched together by ``StreamingPDFWriter``.
+    """
+    ops = []
+    y = PAGE_HEIGHT - MARGIN
+
+    for line in layout.top_lines:
+        y -= line.size
+        ops.append(_centered(y, line))
+        y -= line.space_after
+
+    if layout.show_table:
+        table_width = sum(column.width for column in layout.columns)
+        left = (PAGE_WIDTH - table_width) / 2
+        table_top = y
+        table_bottom = y - HEADER_HEIGHT - ROW_HEIGHT * len(layout.rows)
+
+        # Header row
+        ops.append(f"{GREY} rg {left:.2f} {y - HEADER_HEIGHT:.2f} {table_width:.2f} {HEADER_HEIGHT} re f\n")
+        ops.append(f"{WHITE_SMOKE} rg\n")
+        x = left
+        for column in layout.columns:
+            label = _fit(column.label, column.width - 2 * CELL_PADDING, FONTS["F2"], 12)
+            label_width = stringWidth(label, FONTS["F2"], 12)
+            ops.append(_text(x + (column.width - label_width) / 2, y - HEADER_HEIGHT + 8, label, "F2", 12))
+            x += column.width
+        y -= HEADER_HEIGHT
+
+        # Body rows with alternating backgrounds
+        for index, row in enumerate(layout.rows):
+            if index % 2:
+                ops.append(f"{LIGHT_GREY} rg {left:.2f} {y - ROW_HEIGHT:.2f} {table_width:.2f} {ROW_HEIGHT} re f\n")
+            ops.append("0 0 0 rg\n")
+            x = left
+            for column, value in zip(layout.columns, row):
+                cell = _fit(str(value), column.width - 2 * CELL_PADDING, FONTS["F1"], 10)
+                ops.append(_text(x + CELL_PADDING, y - ROW_HEIGHT + 7, cell))
+                x += column.width
+            y -= ROW_HEIGHT
+
+        # Grid
+        ops.append("0 0 0 RG 1 w\n")
+        for line_y in [table_top, table_top - HEADER_HEIGHT] + [
+            table_top - HEADER_HEIGHT - ROW_HEIGHT * (i + 1) for i in range(len(layout.rows))
+        ]:
+            ops.append(f"{left:.2f} {line_y:.2f} m {left + table_width:.2f} {line_y:.2f} l S\n")
+        x = left
+        for column in list(layout.columns) + [None]:
+            ops.append(f"{x:.2f} {table_top:.2f} m {x:.2f} {table_bottom:.2f} l S\n")
+            if column is not None:
+                x += column.width
+
+        y -= ROW_HEIGHT
+
+    ops.append("0 0 0 rg\n")
+    for line in layout.bottom_lines:
+        y -= line.size
+        ops.append(_centered(y, line))
+        y -= line.space_after
+
+    ops.append(_centered(MARGIN / 2, TextLine(f"Page {layout.page_number}", size=8)))
+    return "".join(ops).encode("latin-1")
+
+
+class StreamingPDFWriter:
+    """
+    Writes a PDF document as a sequence of byte chunks.
+
+    Usage::
+
+        writer = StreamingPDFWriter()
+        yield writer.begin()
+        for content in page_contents:
+            yield writer.add_page(content)
+        yield writer.finish()
+    """
+
+    def __init__(self) -> None:
+        self._position = 0
+        self._offsets: dict[int, int] = {}
+        self._page_ids: list[int] = []
+        self._next_id = FONT_BOLD_ID + 1
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _object(self, object_id: int, body: bytes) -> bytes:
+        chunk = b"%d 0 obj\n" % object_id + body + b"\nendobj\n"
+        self._offsets[object_id] = self._position
+        self._position += len(chunk)
+        return chunk
+
+    def _raw(self, data: bytes) -> bytes:
+        self._position += len(data)
+        return data
+
+    def begin(self) -> bytes:
+        """PDF header, catalog and font resources"""
+        chunks = [self._raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")]
+        chunks.append(self._object(CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_ID))
+        for object_id, name in ((FONT_REGULAR_ID, "Helvetica"), (FONT_BOLD_ID, "Helvetica-Bold")):
+            font = f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>"
+            chunks.append(self._object(object_id, font.encode("ascii")))
+        return b"".join(chunks)
+
+    def add_page(self, content: bytes) -> bytes:
+        """Compress a page content stream and emit it together with its page object"""
+        return self.add_compressed_page(zlib.compress(content))
+
+    def add_compressed_page(self, compressed: bytes) -> bytes:
+        """Emit an already Flate-compressed content stream and its page object"""
+        stream_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        stream = b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(compressed) + compressed + b"\nendstream"
+        page = (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+            % (PAGES_ID, PAGE_WIDTH, PAGE_HEIGHT, FONT_REGULAR_ID, FONT_BOLD_ID, stream_id)
+        )
+        self._page_ids.append(page_id)
+        return self._object(stream_id, stream) + self._object(page_id, page)
+
+    def finish(self) -> bytes:
+        """Page tree, cross-reference table and trailer"""
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        chunks = [self._object(PAGES_ID, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)))]
+
+        xref_position = self._position
+        size = self._next_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for object_id in range(1, size):
+            xref.append(b"%010d 00000 n \n" % self._offsets[object_id])
+        xref.append(b"trailer\n<< /Size %d /Root %d 0 R >>\n" % (size, CATALOG_ID))
+        xref.append(b"startxref\n%d\n%%%%EOF\n" % xref_position)
+        chunks.append(self._raw(b"".join(xref)))
+        return b"".join(chunks)
+
+
+def paginate(
+    rows: Iterable[Sequence[str]],
+    columns: Sequence[Column],
+    header_lines: Sequence[TextLine] = (),
+    footer_lines: Sequence[TextLine] = (),
+) -> Iterator[PageLayout]:
+    """
+    Split rows into page layouts lazily.
+
+    The title block goes on the first page and the footer block after the last
+    row; one page is held back so the footer can be placed once the rows run out.
+    """
+    first_capacity = rows_capacity(top_lines=header_lines)
+    capacity = rows_capacity()
+    page_number = 1
+    current: list[Sequence[str]] = []
+    pending: PageLayout | None = None
+
+    def _layout(page_rows: list[Sequence[str]], number: int) -> PageLayout:
+        return PageLayout(columns, page_rows, number, top_lines=header_lines if number == 1 else ())
+
+    for row in rows:
+        current.append(row)
+        if len(current) == (first_capacity if page_number == 1 else capacity):
+            if pending is not None:
+                yield pending
+            pending = _layout(current, page_number)
+            current = []
+            page_number += 1
+
+    if current or pending is None:
+        if pending is not None:
+            yield pending
+        pending = _layout(current, page_number)
+        page_number += 1
+
+    # Fit the footer on the last page when there is room, otherwise give it its own page
+    used = len(pending.rows)
+    if used <= rows_capacity(top_lines=pending.top_lines, bottom_lines=footer_lines):
+        pending.bottom_lines = footer_lines
+        yield pending
+    else:
+        yield pending
+        yield PageLayout(columns, [], page_number, bottom_lines=footer_lines, show_table=False)
+
+
+def stream_table_pdf(
+    rows: Iterable[Sequence[str]],
+    columns: Sequence[Column],
+    header_lines: Sequence[TextLine] = (),
+    footer_lines: Sequence[TextLine] = (),
+) -> Iterator[bytes]:
+    """Render a table report page by page, yielding PDF bytes as soon as each page is ready"""
+    writer = StreamingPDFWriter()
+    yield writer.begin()
+    for layout in paginate(rows, columns, header_lines, footer_lines):
+        yield writer.add_page(render_page(layout))
+    yield writer.finish()
+
+
+def render_segment(layouts: Sequence[PageLayout]) -> list[bytes]:
+    """Render and compress a run of consecutive pages (executed in worker processes)"""
+    return [zlib.compress(render_page(layout)) for layout in layouts]
+
+
+def stream_table_pdf_parallel(
+    rows: Iterable[Sequence[str]],
+    columns: Sequence[Column],
+    executor: Executor,
+    header_lines: Sequence[TextLine] = (),
+    footer_lines: Sequence[TextLine] = (),
+    pages_per_segment: int = 50,
+    max_in_flight: int = 8,
+) -> Iterator[bytes]:
+    """
+    Same output as ``stream_table_pdf``, with page layout spread over an executor.
+
+    Pagination is cheap and stays in the caller, so every page already knows its
+    number and carries its own header row; runs of ``pages_per_segment`` pages are
+    rendered in parallel and written back in order, which keeps the numbering
+    continuous. At most ``max_in_flight`` segments are pending at any time, and
+    those not started yet are cancelled if the stream is closed early.
+    """
+    writer = StreamingPDFWriter()
+    yield writer.begin()
+
+    in_flight: deque[Future] = deque()
+    pages = paginate(rows, columns, header_lines, footer_lines)
+    try:
+        while segment := list(islice(pages, pages_per_segment)):
+            in_flight.append(executor.submit(render_segment, segment))
+            # Write every finished segment at the head of the queue, and block once it is full
+            while in_flight and (len(in_flight) >= max_in_flight or in_flight[0].done()):
+                yield b"".join(writer.add_compressed_page(page) for page in in_flight.popleft().result())
+
+        while in_flight:
+            yield b"".join(writer.add_compressed_page(page) for page in in_flight.popleft().result())
+    finally:
+        for future in in_flight:
+            future.cancel()
+    yield writer.finish()
@@ -0,0 +1,41 @@
+"""
+Row fetching for inventory reports.
+
+Reports only need a handful of columns from three tables. Reading them with a
+single joined ``values_list`` query avoids instantiating model objects and the
+two extra queries per row that ``item.product`` / ``item.company`` would cost.
+"""
+from typing import Iterator
+
+from django.db.models import QuerySet
+
+from apps.inventories.models import Inventory
+
+DATE_FORMAT = "%d/%m/%Y %H:%M"
+
+COMPANY_REPORT_FIELDS = ("id", "product__name", "product__code", "quantity", "created_at")
+ALL_COMPANIES_REPORT_FIELDS = ("id", "company__name", "product__name", "product__code", "quantity", "created_at")
+
+
+def report_fields(include_company: bool) -> tuple[str, ...]:
+    return ALL_COMPANIES_REPORT_FIELDS if include_company else COMPANY_REPORT_FIELDS
+
+
+def fetch_report_rows(
+    inventory_queryset: QuerySet[Inventory], include_company: bool = True, chunk_size: int | None = None
+) -> Iterator[tuple[str, ...]]:
+    """
+    Yield report rows as tuples of display strings, in one joined query.
+
+    Args:
+        inventory_queryset: Inventory rows to report on (its filters and ordering are kept)
+        include_company: Whether to add the company name column
+        chunk_size: When given, rows are read with a server-side cursor in chunks of this size
+    """
+    rows = inventory_queryset.values_list(*report_fields(include_company))
+    if chunk_size:
+        rows = rows.iterator(chunk_size=chunk_size)
+
+    for row in rows:
+        *values, created_at = row
+        yield tuple(str(value) for value in values) + (created_at.strftime(DATE_FORMAT),)
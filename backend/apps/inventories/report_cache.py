@@ -0,0 +1,151 @@
+"""
+Versioned cache for rendered inventory reports.
+
+Reports are keyed by (scope, company, data version). The data version is a
+counter row in the database (ReportDataVersion), so the web workers, the job
+worker and management commands all see the same value; the signals in
+``apps.inventories.signals`` bump it once a change to an inventory, product or
+company row is committed. A stale report is therefore never served: its key
+simply stops being requested and ages out of the LRU. Entries also expire
+after INVENTORY_REPORT_CACHE_MAX_AGE seconds, in case of writes that bypass
+the signals.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import F
+
+from apps.inventories.models import ReportDataVersion
+
+logger = logging.getLogger(__name__)
+
+# Primary key of the counter row
+DATA_VERSION_PK = 1
+
+
+def get_data_version() -> int:
+    """Current version of the data the reports are built from"""
+    return ReportDataVersion.objects.filter(pk=DATA_VERSION_PK).values_list("version", flat=True).first() or 0
+
+
+def bump_data_version() -> None:
+    """Invalidate every cached report by moving to a new data version"""
+    if ReportDataVersion.objects.filter(pk=DATA_VERSION_PK).update(version=F("version") + 1):
+        return
+    # First bump since the table was created
+    _, created = ReportDataVersion.objects.get_or_create(pk=DATA_VERSION_PK, defaults={"version": 1})
+    if not created:
+        ReportDataVersion.objects.filter(pk=DATA_VERSION_PK).update(version=F("version") + 1)
+
+
+class ReportCache:
+    """
+    Size-bounded LRU of rendered reports with hit/miss counters.
+
+    Entries larger than ``max_entry_bytes`` are never stored, the least
+    recently used entries are evicted once the total exceeds ``max_bytes``,
+    and entries older than ``max_age`` seconds are dropped when looked up.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, max_age: float | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.max_age = max_age
+        # key -> (monotonic time it was stored at, content)
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(scope: str, company_id: int | None = None) -> tuple:
+        return (scope, company_id, get_data_version())
+
+    def get(self, key: Hashable) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_age is not None and time.monotonic() - entry[0] > self.max_age:
+                self._size -= len(self._entries.pop(key)[1])
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, content: bytes) -> None:
+        if len(content) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key)[1])
+            self._entries[key] = (time.monotonic(), content)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """Return the cached report or render and store it"""
+        content = self.get(key)
+        if content is None:
+            content = render()
+            self.set(key, content)
+        return content
+
+    def tee(self, key: Hashable, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Pass streamed chunks through while keeping a copy for the cache.
+        The copy is dropped as soon as it grows past ``max_entry_bytes``.
+        """
+        parts: list[bytes] | None = []
+        size = 0
+        for chunk in chunks:
+            if parts is not None:
+                size += len(chunk)
+                if size > self.max_entry_bytes:
+                    parts = None
+                else:
+                    parts.append(chunk)
+            yield chunk
+        if parts is not None:
+            self.set(key, b"".join(parts))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                "data_version": get_data_version(),
+            }
+
+
+report_cache = ReportCache(
+    max_bytes=settings.INVENTORY_REPORT_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.INVENTORY_REPORT_CACHE_MAX_ENTRY_BYTES,
+    max_age=settings.INVENTORY_REPORT_CACHE_MAX_AGE or None,
+)
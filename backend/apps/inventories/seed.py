@@ -0,0 +1,58 @@
+"""
+Synthetic companies, products and inventory records for the benchmarks.
+
+Rows are inserted with bulk_create in batches, building one batch at a time,
+so a million inventory records never sit in memory together. bulk_create
+skips the model signals: the stock ledger and summary are not filled.
+"""
+from itertools import islice
+from typing import Iterable
+
+from apps.companies.models import Company
+from apps.inventories.models import Inventory
+from apps.products.models import Product
+
+BATCH_SIZE = 5000
+
+
+def _bulk_create(model, objs: Iterable, batch_size: int = BATCH_SIZE) -> list[int]:
+    """Primary keys of the inserted rows"""
+    objs, pks = iter(objs), []
+    while batch := list(islice(objs, batch_size)):
+        pks += [obj.pk for obj in model.objects.bulk_create(batch)]
+    return pks
+
+
+def seed_catalog(companies: int, products: int, inventories: int, prefix: str = "BENCH") -> None:
+    """Insert the given number of rows; products and inventory records are spread over the companies"""
+    company_ids = _bulk_create(
+        Company,
+        (
+            Company(nit=f"{prefix}{i:07d}", name=f"Company {i}", address=f"Street {i}", phone="555-0000")
+            for i in range(max(companies, 1))
+        ),
+    )
+    product_ids = _bulk_create(
+        Product,
+        (
+            Product(
+                code=f"{prefix}{i:07d}",
+                name=f"Product {i}",
+                features="Benchmark product " * 10,
+                price={"USD": i % 1000 + 0.5, "COP": i * 4000},
+                company_id=company_ids[i % len(company_ids)],
+            )
+            for i in range(max(products, 1))
+        ),
+    )
+    _bulk_create(
+        Inventory,
+        (
+            Inventory(
+                company_id=company_ids[i % len(company_ids)],
+                product_id=product_ids[i % len(product_ids)],
+                quantity=i % 500,
+            )
+            for i in range(inventories)
+        ),
+    )
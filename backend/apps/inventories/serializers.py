@@ -1,18 +1,188 @@
+from datetime import datetime, time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import serializers
-from .models import Inventory
+from apps.companies.models import Company
+from apps.products.models import Product
+from core.fieldsets import ExpandableFieldsMixin, SparseFieldsetSerializerMixin
+from .bulk import BulkWriteResult, bulk_write_inventory
+from .models import Inventory, StockSummary
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that looks the object up in ``context["related_objects"][field_name]``
+    when the caller has fetched the candidates in bulk, instead of one query per value.
+    """
+
+    def to_internal_value(self, data):
+        related = self.context.get("related_objects", {}).get(self.field_name)
+        if related is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return related[pk]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class InventoryBulkSerializer(serializers.ListSerializer):
+    """
+    List mode of InventorySerializer used by the bulk endpoint.
+
+    Items with an ``id`` partially update that record, the others create one.
+    Companies, products and the ids to update are each fetched in one query.
+    With ``context["skip_invalid"]`` invalid items are left out and kept in
+    ``skipped`` as (index, errors) pairs instead of failing the whole list.
+    """
+
+    related_models = {"company": Company, "product": Product}
+
+    def _ids(self, data: list, field: str) -> set[int]:
+        ids = set()
+        for item in data:
+            value = item.get(field) if isinstance(item, dict) else None
+            if isinstance(value, (int, str)) and not isinstance(value, bool) and str(value).isdigit():
+                ids.add(int(value))
+        return ids
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages["not_a_list"].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({"non_field_errors": [message]}, code="not_a_list")
+        if not data:
+            raise serializers.ValidationError({"non_field_errors": [self.error_messages["empty"]]}, code="empty")
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(max_length=self.max_length)
+            raise serializers.ValidationError({"non_field_errors": [message]}, code="max_length")
+
+        context = {
+            **self.context,
+            "related_objects": {
+                field: model.objects.in_bulk(self._ids(data, field)) for field, model in self.related_models.items()
+            },
+        }
+        existing = set(Inventory.objects.filter(pk__in=self._ids(data, "id")).values_list("pk", flat=True))
+
+        validated, errors = [], []
+        for item in data:
+            if not isinstance(item, dict):
+                errors.append({"non_field_errors": ["Expected an object."]})
+                continue
+            pk = item.get("id")
+            if pk is not None and (not str(pk).isdigit() or int(pk) not in existing):
+                errors.append({"id": [f'Inventory record "{pk}" does not exist.']})
+                continue
+            serializer = self.child.__class__(data=item, partial=pk is not None, context=context)
+            if serializer.is_valid():
+                validated.append({**serializer.validated_data, **({"id": int(pk)} if pk is not None else {})})
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+
+        self.skipped = [(index, error) for index, error in enumerate(errors) if error]
+        if self.skipped and not self.context.get("skip_invalid"):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def create(self, validated_data: list[dict]) -> BulkWriteResult:
+        return bulk_write_inventory(
+            creates=[item for item in validated_data if "id" not in item],
+            updates=[item for item in validated_data if "id" in item],
+        )
+
+
+class InventorySerializer(SparseFieldsetSerializerMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
+    """
+    Inventory serializer.
+    With ``context["expand"]`` holding "product" and/or "company", the names
+    (and product code) are embedded next to the ids; the view select_relates them.
+    """
 
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
 
-class InventorySerializer(serializers.ModelSerializer):
-    """Inventory serializer"""
+    # Read-only fields added for each relation that can be expanded
+    expandable_fields = {
+        "product": {"product_name": "product.name", "product_code": "product.code"},
+        "company": {"company_name": "company.name"},
+    }
 
     class Meta:
         """Meta class"""
 
         model = Inventory
         fields = "__all__"
+        list_serializer_class = InventoryBulkSerializer
+        # Not every database backend derives the minimum from PositiveIntegerField
+        extra_kwargs = {"quantity": {"min_value": 0}}
+
+
+class StockSummarySerializer(serializers.ModelSerializer):
+    """Stock totals of a company and product"""
+
+    company_name = serializers.CharField(source="company.name", read_only=True)
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    product_code = serializers.CharField(source="product.code", read_only=True)
+
+    class Meta:
+        """Meta class"""
+
+        model = StockSummary
+        fields = [
+            "company",
+            "company_name",
+            "product",
+            "product_name",
+            "product_code",
+            "quantity",
+            "row_count",
+            "last_changed_at",
+        ]
+
+
+class StockAsOfQuerySerializer(serializers.Serializer):
+    """Query parameters of the point-in-time stock endpoint"""
+
+    date = serializers.CharField()
+    company = serializers.IntegerField(required=False)
+    product = serializers.IntegerField(required=False)
+
+    def validate_date(self, value: str) -> datetime:
+        """Accept an ISO 8601 datetime, or a date meaning the end of that day"""
+        try:
+            day = parse_date(value)
+            moment = datetime.combine(day, time.max) if day is not None else parse_datetime(value)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise serializers.ValidationError("Enter an ISO 8601 date or datetime.")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
 
 
 class EmailInventorySerializer(serializers.Serializer):
     """Serializer for sending inventory by email"""
+
     email = serializers.EmailField()
     company_id = serializers.IntegerField(required=False)
+
+
+class BulkEmailInventorySerializer(serializers.Serializer):
+    """Serializer for sending inventory to many recipients"""
+
+    # Addresses are validated one by one while sending, so one bad address
+    # is reported back instead of rejecting the whole request
+    emails = serializers.ListField(
+        child=serializers.CharField(max_length=254),
+        allow_empty=False,
+        max_length=settings.INVENTORY_EMAIL_MAX_RECIPIENTS,
+    )
+    company_id = serializers.IntegerField(required=False)
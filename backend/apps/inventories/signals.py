@@ -0,0 +1,75 @@
+"""
+Signals for inventories
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.companies.models import Company
+from apps.inventories.ledger import record_movement
+from apps.inventories.models import Inventory, MovementReason
+from apps.inventories.report_cache import bump_data_version
+from apps.inventories.summary import apply_stock_change
+from apps.products.models import Product
+from apps.products.signals import products_imported
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(products_imported)
+def invalidate_inventory_reports(sender, **kwargs) -> None:
+    """
+    Any change to the data shown in the reports makes the cached ones stale.
+    The version is bumped on commit: the other processes only see the new
+    data from then on, and the counter row is not locked for the rest of the
+    transaction.
+    """
+    transaction.on_commit(bump_data_version)
+
+
+@receiver(pre_save, sender=Inventory)
+def remember_previous_stock(sender, instance: Inventory, **kwargs) -> None:
+    """Keep the stored values of an updated record to record the change by the difference"""
+    instance._previous_stock = None
+    if instance.pk is not None:
+        instance._previous_stock = (
+            Inventory.objects.filter(pk=instance.pk).values_list("company_id", "product_id", "quantity").first()
+        )
+
+
+def _apply(company_id: int, product_id: int, delta: int, rows: int, reason: str, inventory_id: int) -> None:
+    apply_stock_change(company_id, product_id, delta, rows)
+    record_movement(company_id, product_id, delta, reason, inventory_id)
+
+
+@receiver(post_save, sender=Inventory)
+def track_saved_stock(sender, instance: Inventory, created: bool, **kwargs) -> None:
+    """Move the summary and append to the ledger by the change of a saved record"""
+    previous = getattr(instance, "_previous_stock", None)
+    if created or previous is None:
+        _apply(instance.company_id, instance.product_id, instance.quantity, 1, MovementReason.CREATED, instance.pk)
+        return
+
+    company_id, product_id, quantity = previous
+    if (company_id, product_id) == (instance.company_id, instance.product_id):
+        if instance.quantity != quantity:
+            _apply(company_id, product_id, instance.quantity - quantity, 0, MovementReason.UPDATED, instance.pk)
+    else:
+        _apply(company_id, product_id, -quantity, -1, MovementReason.UPDATED, instance.pk)
+        _apply(instance.company_id, instance.product_id, instance.quantity, 1, MovementReason.UPDATED, instance.pk)
+
+
+@receiver(post_delete, sender=Inventory)
+def track_deleted_stock(sender, instance: Inventory, origin=None, **kwargs) -> None:
+    """
+    Take a deleted record out of the summary and the ledger.
+    When the deletion cascades from its company or product, their summary
+    and ledger rows are being deleted as well, so nothing is recorded.
+    """
+    if origin is not None and not (isinstance(origin, Inventory) or getattr(origin, "model", None) is Inventory):
+        return
+    _apply(instance.company_id, instance.product_id, -instance.quantity, -1, MovementReason.DELETED, instance.pk)
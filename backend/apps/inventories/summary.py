@@ -0,0 +1,64 @@
+"""
+Incremental maintenance of the StockSummary table.
+
+Every inventory write moves the totals of its (company, product) pair with a
+single ``UPDATE ... SET quantity = quantity + n`` so concurrent writers never
+overwrite each other's changes. Writes that skip signals (``QuerySet.update``,
+``bulk_create``, raw SQL) must call ``apply_stock_change`` themselves or be
+followed by ``rebuild_stock_summary``.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from apps.inventories.models import Inventory, StockSummary
+
+
+def apply_stock_change(company_id: int, product_id: int, quantity: int, rows: int) -> None:
+    """
+    Add ``quantity`` and ``rows`` (either may be negative) to the totals of a pair.
+    The summary row is created on the first record and removed with the last one.
+    """
+    now = timezone.now()
+    summaries = StockSummary.objects.filter(company_id=company_id, product_id=product_id)
+    changes = {"quantity": F("quantity") + quantity, "row_count": F("row_count") + rows, "last_changed_at": now}
+
+    if summaries.update(**changes):
+        if rows < 0:
+            summaries.filter(row_count__lte=0).delete()
+        return
+    if rows <= 0:
+        # The pair is already gone, e.g. its company is being deleted
+        return
+
+    try:
+        with transaction.atomic():
+            StockSummary.objects.create(
+                company_id=company_id, product_id=product_id, quantity=quantity, row_count=rows, last_changed_at=now
+            )
+    except IntegrityError:
+        # Another transaction created the row first
+        summaries.update(**changes)
+
+
+def rebuild_stock_summary() -> int:
+    """Recompute the whole table from the inventory records; returns the number of pairs"""
+    totals = (
+        Inventory.objects.values("company_id", "product_id")
+        .annotate(total=Sum("quantity"), rows=Count("id"), last=Max("created_at"))
+        .order_by()
+    )
+    summaries = [
+        StockSummary(
+            company_id=row["company_id"],
+            product_id=row["product_id"],
+            quantity=row["total"],
+            row_count=row["rows"],
+            last_changed_at=row["last"],
+        )
+        for row in totals
+    ]
+    with transaction.atomic():
+        StockSummary.objects.all().delete()
+        StockSummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
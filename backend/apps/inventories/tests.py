@@ -11,6 +11,7 @@ from rest_framework.response import Response
 from rest_framework.test import APIClient
 from typing import Dict, Any
 from apps.users.models import User
+from django.utils.text import slugify
 
 # Create your tests here.
 
@@ -103,3 +104,594 @@ class TestInventoryAPI:
         assert response.status_code == status.HTTP_200_OK
         assert response["Content-Type"] == "application/pdf"
         assert response["Content-Disposition"] == 'attachment; filename="inventory.pdf"'
+
+    def test_download_pdf_streaming(self, inventory: Inventory) -> None:
+        """Test that the streaming mode sends a well-formed PDF in chunks."""
+        response = self.admin_client.get(self.inventory_pdf_url, {"stream": "true"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/pdf"
+        assert response["Content-Disposition"] == 'attachment; filename="inventory.pdf"'
+
+        content: bytes = b"".join(response.streaming_content)
+        assert content.startswith(b"%PDF-1.4")
+        assert content.endswith(b"%%EOF\n")
+        # The startxref pointer must land on the cross-reference table
+        xref_offset = int(content.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+        assert content[xref_offset:].startswith(b"xref")
+
+    def test_streaming_pdf_paginates_rows(self) -> None:
+        """Test that rows are split over several pages with a continuous page tree."""
+        from apps.inventories.pdf_stream import Column, rows_capacity, stream_table_pdf
+
+        rows = ((str(i), f"Product {i}") for i in range(rows_capacity() * 3 + 1))
+        content = b"".join(stream_table_pdf(rows, [Column("ID", 100), Column("Product", 300)]))
+        assert content.count(b"/Type /Page ") == 4
+        assert b"/Count 4" in content
+
+    def test_download_pdf_uses_report_cache(self, inventory: Inventory, django_capture_on_commit_callbacks) -> None:
+        """Test that an unchanged inventory is served from the report cache."""
+        from apps.inventories.report_cache import report_cache
+
+        report_cache.clear()
+        first: Response = self.admin_client.get(self.inventory_pdf_url)
+        second: Response = self.admin_client.get(self.inventory_pdf_url)
+        assert b"".join(first.streaming_content) == b"".join(second.streaming_content)
+        assert (report_cache.hits, report_cache.misses) == (1, 1)
+
+        # Any committed write bumps the data version, so the next download is rendered again
+        with django_capture_on_commit_callbacks(execute=True):
+            inventory.quantity = 10
+            inventory.save()
+        self.admin_client.get(self.inventory_pdf_url)
+        assert (report_cache.hits, report_cache.misses) == (1, 2)
+
+        stats: Response = self.admin_client.get(reverse("inventory-report-cache-stats"))
+        assert stats.data["hit_rate"] == round(1 / 3, 4)
+        assert self.external_client.get(reverse("inventory-report-cache-stats")).status_code == 403
+
+    def test_report_cache_evicts_least_recently_used(self) -> None:
+        """Test that the report cache stays within its size bound."""
+        from apps.inventories.report_cache import ReportCache
+
+        cache = ReportCache(max_bytes=10, max_entry_bytes=6)
+        cache.set("a", b"aaaa")
+        cache.set("b", b"bbbb")
+        cache.get("a")
+        cache.set("c", b"cccc")
+        cache.set("too-big", b"x" * 7)
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("too-big") is None
+        assert cache.evictions == 1
+
+    def test_report_cache_entries_expire(self) -> None:
+        """Test that cached reports are dropped once older than the max age."""
+        from unittest import mock
+
+        from apps.inventories.report_cache import ReportCache
+
+        cache = ReportCache(max_bytes=10, max_entry_bytes=10, max_age=60)
+        with mock.patch("apps.inventories.report_cache.time.monotonic", return_value=1000):
+            cache.set("a", b"aaaa")
+        with mock.patch("apps.inventories.report_cache.time.monotonic", return_value=1059):
+            assert cache.get("a") == b"aaaa"
+        with mock.patch("apps.inventories.report_cache.time.monotonic", return_value=1061):
+            assert cache.get("a") is None
+        assert cache.expirations == 1
+        assert cache.stats()["size_bytes"] == 0
+
+    def test_report_data_version_is_shared(self, inventory: Inventory, django_capture_on_commit_callbacks) -> None:
+        """Test that the data version is read from the database, where every process sees the bumps."""
+        from apps.inventories.models import ReportDataVersion
+        from apps.inventories.report_cache import get_data_version
+
+        before = get_data_version()
+        with django_capture_on_commit_callbacks(execute=True):
+            inventory.quantity = 10
+            inventory.save()
+        # A bump made by another process, as seen by this one
+        assert ReportDataVersion.objects.get().version == get_data_version() == before + 1
+        ReportDataVersion.objects.update(version=before + 5)
+        assert get_data_version() == before + 5
+
+    def test_report_query_budget(self, inventory_factory, django_assert_num_queries, mailoutbox) -> None:
+        """Test that reports fetch their rows in one joined query, whatever the row count."""
+        from apps.inventories.report_cache import report_cache
+        from apps.inventories.utils import generate_inventory_pdf, generate_inventory_pdf_stream
+
+        for _ in range(20):
+            inventory_factory()
+        report_cache.clear()
+
+        with django_assert_num_queries(1):
+            generate_inventory_pdf(Inventory.objects.all())
+
+        # COUNT for the header plus the row fetch
+        with django_assert_num_queries(2):
+            b"".join(generate_inventory_pdf_stream(Inventory.objects.all()))
+
+        # EXISTS check, data version and the row fetch
+        with django_assert_num_queries(3):
+            response: Response = self.admin_client.post(
+                reverse("inventory-send-email"), {"email": "recipient@example.com"}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(mailoutbox) == 1
+
+    def test_download_bundle(self, inventory: Inventory, inventory_factory, settings) -> None:
+        """Test that the bundle holds one PDF per company, rendered in worker processes."""
+        import zipfile
+        from io import BytesIO
+
+        settings.INVENTORY_REPORT_WORKERS = 2
+        other = inventory_factory()
+
+        response = self.external_client.get(reverse("inventory-download-bundle"))
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/zip"
+
+        archive = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+        other_name = f"{slugify(other.company.name) or 'company'}-{other.company.id}.pdf"
+        assert sorted(archive.namelist()) == sorted([f"test-company-{self.company.id}.pdf", other_name])
+        assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+
+    def test_report_pool_is_shared(self, settings) -> None:
+        """Test that reports reuse one process pool, which is replaced once broken."""
+        from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+        from apps.inventories.workers import shared_report_executor
+
+        settings.INVENTORY_REPORT_WORKERS = 2
+        with shared_report_executor() as first, shared_report_executor() as second:
+            assert first is second
+            assert isinstance(first, ProcessPoolExecutor)
+
+        with pytest.raises(BrokenExecutor):
+            with shared_report_executor() as executor:
+                raise BrokenExecutor()
+        with shared_report_executor() as executor:
+            assert executor is not first
+
+        settings.INVENTORY_REPORT_WORKERS = 1
+        with shared_report_executor() as executor:
+            assert isinstance(executor, ThreadPoolExecutor)
+
+    def test_parallel_streaming_pdf_matches_sequential(self) -> None:
+        """Test that page-parallel layout produces exactly the sequential document."""
+        from apps.inventories.pdf_stream import Column, TextLine, stream_table_pdf, stream_table_pdf_parallel
+        from apps.inventories.workers import report_executor
+
+        columns = [Column("ID", 100), Column("Product", 300)]
+        header = [TextLine("Inventory Report", size=18, bold=True)]
+        footer = [TextLine("Footer", size=8)]
+
+        def rows():
+            return ((str(i), f"Product {i}") for i in range(500))
+
+        sequential = b"".join(stream_table_pdf(rows(), columns, header, footer))
+        with report_executor(2) as executor:
+            chunks = stream_table_pdf_parallel(
+                rows(), columns, executor, header, footer, pages_per_segment=3, max_in_flight=2
+            )
+            parallel = b"".join(chunks)
+        assert parallel == sequential
+        assert b"/Count 16" in parallel
+
+    def test_parallel_streaming_pdf_reuses_shared_pool(self, inventory_factory, settings) -> None:
+        """Test that streamed downloads lay out their pages on the shared pool instead of starting one each."""
+        from apps.inventories import workers
+        from apps.inventories.utils import generate_inventory_pdf_stream
+
+        settings.INVENTORY_REPORT_WORKERS = 2
+        settings.INVENTORY_PDF_PARALLEL_THRESHOLD = 0
+        for _ in range(3):
+            inventory_factory()
+
+        first = b"".join(generate_inventory_pdf_stream(Inventory.objects.all()))
+        pool = workers._shared_pool
+        second = b"".join(generate_inventory_pdf_stream(Inventory.objects.all()))
+        assert first.startswith(b"%PDF") and second.startswith(b"%PDF")
+        assert pool is not None and workers._shared_pool is pool
+
+    def test_send_email_bulk_reports_each_recipient(self, inventory: Inventory, mailoutbox) -> None:
+        """Test that a bad address is reported without stopping the other recipients."""
+        from unittest import mock
+        from django.core import mail
+
+        emails = ["first@example.com", "not-an-email", "second@example.com"]
+        with mock.patch("apps.inventories.utils.get_connection", wraps=mail.get_connection) as get_connection:
+            response: Response = self.admin_client.post(
+                reverse("inventory-send-email-bulk"), {"emails": emails}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data["sent"], response.data["failed"]) == (2, 1)
+        assert [result["status"] for result in response.data["results"]] == ["sent", "failed", "sent"]
+        # All the messages share one connection
+        assert get_connection.call_count == 1
+        assert [message.to for message in mailoutbox] == [["first@example.com"], ["second@example.com"]]
+        assert mailoutbox[0].attachments[0][1].startswith(b"%PDF")
+
+    def test_send_email_bulk_survives_smtp_outage(self, inventory: Inventory, settings) -> None:
+        """Test that a lost mail server fails the remaining recipients instead of the request."""
+        from smtplib import SMTPServerDisconnected
+        from unittest import mock
+        from django.core.mail.backends.locmem import EmailBackend
+
+        sent: list[str] = []
+
+        def send_messages(self, messages):
+            if sent:
+                raise SMTPServerDisconnected("Connection unexpectedly closed")
+            sent.extend(message.to[0] for message in messages)
+            return len(messages)
+
+        opened = iter([True, ConnectionRefusedError("Connection refused")])
+
+        def open_connection(self):
+            result = next(opened)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        settings.INVENTORY_EMAIL_BATCH_SIZE = 10
+        emails = ["first@example.com", "second@example.com", "third@example.com", "fourth@example.com"]
+        with mock.patch.object(EmailBackend, "send_messages", send_messages), mock.patch.object(
+            EmailBackend, "open", open_connection
+        ):
+            response: Response = self.admin_client.post(
+                reverse("inventory-send-email-bulk"), {"emails": emails}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data["sent"], response.data["failed"]) == (1, 3)
+        results = response.data["results"]
+        assert [result["status"] for result in results] == ["sent", "failed", "failed", "failed"]
+        assert "unexpectedly closed" in results[1]["error"]
+        assert all(result["error"].startswith("Could not connect") for result in results[2:])
+        assert sent == ["first@example.com"]
+
+    def test_export_inventories_csv(self, inventory: Inventory, django_assert_num_queries) -> None:
+        """Test that the inventory export reads its joined columns in one query."""
+        with django_assert_num_queries(1):
+            response = self.external_client.get(reverse("inventory-export"))
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "ID,Company ID,Company,Product ID,Product code,Product,Quantity,Created at"
+        expected = f"{inventory.id},{self.company.id},Test Company,{self.product.id},P001,Test Product,75,"
+        assert lines[1].startswith(expected)
+
+    def test_list_inventories_keyset_pagination(self, inventory_factory) -> None:
+        """Test that cursor pages walk (created_at, id) forwards and backwards without gaps."""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        now = timezone.now()
+        created = [inventory_factory(company=self.company, product=self.product) for _ in range(7)]
+        # Several rows share a timestamp, so the id tie-breaker matters
+        for index, item in enumerate(created):
+            Inventory.objects.filter(pk=item.pk).update(created_at=now - timedelta(minutes=index // 3))
+        expected = list(Inventory.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+        seen, url, pages = [], self.inventory_list_url + "?page_size=3", []
+        while url:
+            response: Response = self.external_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.data)
+            seen += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        assert seen == expected
+        assert pages[0]["previous"] is None
+
+        previous: Response = self.external_client.get(pages[-1]["previous"])
+        assert [item["id"] for item in previous.data["results"]] == expected[3:6]
+
+        invalid: Response = self.external_client.get(self.inventory_list_url, {"cursor": "not-a-cursor"})
+        assert invalid.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_list_inventories_filters(self, inventory_factory) -> None:
+        """Test that the list can be filtered by company, product, quantity and creation date."""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        other = inventory_factory(quantity=5)
+        small = inventory_factory(company=self.company, product=self.product, quantity=10)
+        large = inventory_factory(company=self.company, product=self.product, quantity=500)
+        Inventory.objects.filter(pk=large.pk).update(created_at=timezone.now() - timedelta(days=30))
+
+        def ids(params: Dict[str, Any]) -> set:
+            response: Response = self.external_client.get(self.inventory_list_url, params)
+            assert response.status_code == status.HTTP_200_OK
+            return {item["id"] for item in response.data["results"]}
+
+        assert ids({"company": self.company.id}) == {small.id, large.id}
+        assert ids({"product": other.product_id}) == {other.id}
+        assert ids({"quantity_min": 6, "quantity_max": 100}) == {small.id}
+        cutoff = (timezone.now() - timedelta(days=1)).isoformat()
+        assert ids({"company": self.company.id, "created_before": cutoff}) == {large.id}
+        assert ids({"company": self.company.id, "created_after": cutoff}) == {small.id}
+
+        invalid: Response = self.external_client.get(self.inventory_list_url, {"quantity_min": "many"})
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_inventories_expanded(self, inventory_factory, django_assert_num_queries) -> None:
+        """Test that ?expand embeds product and company names with a single joined query."""
+        for _ in range(3):
+            inventory_factory()
+
+        # The ETag aggregate, then the joined page
+        with django_assert_num_queries(2):
+            response: Response = self.external_client.get(self.inventory_list_url, {"expand": "product,company"})
+        assert response.status_code == status.HTTP_200_OK
+        for item in response.data["results"]:
+            inventory = Inventory.objects.select_related("product", "company").get(pk=item["id"])
+            assert item["product_name"] == inventory.product.name
+            assert item["product_code"] == inventory.product.code
+            assert item["company_name"] == inventory.company.name
+
+        plain: Response = self.external_client.get(self.inventory_list_url)
+        assert "product_name" not in plain.data["results"][0]
+        only_company: Response = self.external_client.get(self.inventory_list_url, {"expand": "company"})
+        assert "company_name" in only_company.data["results"][0]
+        assert "product_name" not in only_company.data["results"][0]
+
+        invalid: Response = self.external_client.get(self.inventory_list_url, {"expand": "product,owner"})
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_conditional_get_follows_expanded_rows(self, inventory: Inventory) -> None:
+        """Test that the ETag of an expanded list changes when an embedded product changes."""
+        params = {"expand": "product"}
+        listing: Response = self.external_client.get(self.inventory_list_url, params)
+        plain: Response = self.external_client.get(self.inventory_list_url)
+        assert listing["ETag"] != plain["ETag"]
+
+        cached = self.external_client.get(self.inventory_list_url, params, HTTP_IF_NONE_MATCH=listing["ETag"])
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+        self.product.name = "Renamed product"
+        self.product.save()
+        changed = self.external_client.get(self.inventory_list_url, params, HTTP_IF_NONE_MATCH=listing["ETag"])
+        assert changed.status_code == status.HTTP_200_OK
+        assert changed.data["results"][0]["product_name"] == "Renamed product"
+        unchanged = self.external_client.get(self.inventory_list_url, HTTP_IF_NONE_MATCH=plain["ETag"])
+        assert unchanged.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_sparse_fieldsets_with_expand(self, inventory: Inventory) -> None:
+        """Test that expanded fields can be selected and only their columns are read."""
+        from django.test.utils import CaptureQueriesContext
+        from django.db import connection
+
+        params = {"expand": "product", "fields": "id,quantity,product_name"}
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.external_client.get(self.inventory_list_url, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"id": inventory.id, "quantity": inventory.quantity, "product_name": self.product.name}
+        ]
+        page_sql: str = queries.captured_queries[-1]["sql"]
+        assert '"products_product"."name"' in page_sql
+        assert '"products_product"."features"' not in page_sql
+
+        # Writes keep every field
+        url: str = reverse("inventory-detail", kwargs={"pk": inventory.id})
+        updated: Response = self.admin_client.patch(url + "?fields=id", {"quantity": 5}, format="json")
+        assert updated.data["quantity"] == 5
+
+    def test_fast_list_matches_serializer_bytes(self, inventory_factory, settings) -> None:
+        """Test that the values() list path renders pages, cursors and expansions like the serializer."""
+        for quantity in range(5):
+            inventory_factory(company=self.company, product=self.product, quantity=quantity)
+
+        for params in ({}, {"expand": "product,company"}, {"page_size": 2}, {"fields": "id,created_at"}):
+            settings.API_FAST_LISTS = True
+            fast: Response = self.external_client.get(self.inventory_list_url, params)
+            settings.API_FAST_LISTS = False
+            regular: Response = self.external_client.get(self.inventory_list_url, params)
+            assert fast.content == regular.content, params
+
+            if "page_size" in params:
+                next_url: str = fast.data["next"]
+
+        settings.API_FAST_LISTS = True
+        second_page: Response = self.external_client.get(next_url)
+        settings.API_FAST_LISTS = False
+        assert second_page.content == self.external_client.get(next_url).content
+        assert len(second_page.data["results"]) == 2
+
+    def test_stock_summary_follows_inventory_writes(self, inventory_factory, product_factory) -> None:
+        """Test that the summary totals move with every create, update and delete."""
+        from apps.inventories.models import StockSummary
+        from django.core.management import call_command
+        from io import StringIO
+
+        def totals() -> dict:
+            return {
+                (row.company_id, row.product_id): (row.quantity, row.row_count) for row in StockSummary.objects.all()
+            }
+
+        first = inventory_factory(company=self.company, product=self.product, quantity=10)
+        second = inventory_factory(company=self.company, product=self.product, quantity=5)
+        assert totals() == {(self.company.id, self.product.id): (15, 2)}
+
+        first.quantity = 30
+        first.save()
+        assert totals() == {(self.company.id, self.product.id): (35, 2)}
+
+        other_product = product_factory(company=self.company, code="P002")
+        second.product = other_product
+        second.save()
+        assert totals() == {(self.company.id, self.product.id): (30, 1), (self.company.id, other_product.id): (5, 1)}
+
+        first.delete()
+        assert totals() == {(self.company.id, other_product.id): (5, 1)}
+
+        # Writes that bypass the signals are fixed by a rebuild
+        Inventory.objects.filter(pk=second.pk).update(quantity=7)
+        call_command("rebuild_stock_summary", stdout=StringIO())
+        assert totals() == {(self.company.id, other_product.id): (7, 1)}
+
+    def test_stock_summary_endpoint(self, inventory_factory, django_assert_num_queries) -> None:
+        """Test that the summary endpoint reads the totals without scanning the inventory rows."""
+        inventory_factory(company=self.company, product=self.product, quantity=10)
+        inventory_factory(company=self.company, product=self.product, quantity=20)
+        other = inventory_factory(quantity=3)
+        url: str = reverse("inventory-summary")
+
+        with django_assert_num_queries(1):
+            response: Response = self.external_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        rows = {row["product"]: row for row in response.data}
+        assert rows[self.product.id]["quantity"] == 30
+        assert rows[self.product.id]["row_count"] == 2
+        assert rows[self.product.id]["product_code"] == "P001"
+        assert rows[other.product_id]["quantity"] == 3
+
+        by_company: Response = self.external_client.get(url, {"group_by": "company", "company": self.company.id})
+        assert [(row["company_name"], row["quantity"], row["pairs"]) for row in by_company.data] == [
+            ("Test Company", 30, 1)
+        ]
+
+        invalid: Response = self.external_client.get(url, {"group_by": "warehouse"})
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_stock_as_of_replays_ledger_from_snapshot(self, inventory_factory, django_assert_num_queries) -> None:
+        """Test that past stock is the latest snapshot plus the movements recorded after it."""
+        from datetime import timedelta
+        from apps.inventories.ledger import take_stock_snapshot
+        from apps.inventories.models import StockMovement
+        from django.utils import timezone
+
+        now = timezone.now()
+        day = timedelta(days=1)
+        record = inventory_factory(company=self.company, product=self.product, quantity=10)
+        StockMovement.objects.update(created_at=now - 3 * day)
+        record.quantity = 25
+        record.save()
+        StockMovement.objects.filter(created_at__gt=now - day).update(created_at=now - 2 * day)
+        take_stock_snapshot(now - 2 * day + timedelta(hours=1))
+        record.delete()
+
+        reasons = list(StockMovement.objects.values_list("reason", "delta"))
+        assert reasons == [("created", 10), ("updated", 15), ("deleted", -25)]
+
+        url: str = reverse("inventory-as-of")
+
+        def stock(date: str) -> list:
+            response: Response = self.external_client.get(url, {"date": date})
+            assert response.status_code == status.HTTP_200_OK
+            return [(row["product"], row["quantity"]) for row in response.data["results"]]
+
+        assert stock((now - 4 * day).isoformat()) == []
+        assert stock((now - 3 * day).isoformat()) == [(self.product.id, 10)]
+        assert stock((now - day).isoformat()) == [(self.product.id, 25)]
+        assert stock(now.date().isoformat()) == []
+
+        # One query for the snapshot time, one for its rows and one for the replayed movements
+        with django_assert_num_queries(3):
+            response = self.external_client.get(url, {"date": (now - day).isoformat(), "company": self.company.id})
+        assert response.data["snapshot_at"] is not None
+
+        invalid: Response = self.external_client.get(url, {"date": "yesterday"})
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_worker_snapshots_stock_periodically(self, inventory: Inventory, settings) -> None:
+        """Test that the job worker schedules stock snapshots, skipped while nothing moved."""
+        from datetime import timedelta
+        from apps.inventories.models import StockSnapshot
+        from apps.jobs.models import Job, JobStatus
+        from apps.jobs.queue import enqueue_scheduled, run_pending
+        from django.utils import timezone
+
+        settings.STOCK_SNAPSHOT_LAG = 0
+        settings.STOCK_SNAPSHOT_INTERVAL = 60 * 60
+        assert [job.kind for job in enqueue_scheduled()] == ["inventories.snapshot_stock"]
+        assert enqueue_scheduled() == []  # already pending
+        run_pending()
+        job = Job.objects.get(kind="inventories.snapshot_stock")
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result["pairs"] == 1
+        assert StockSnapshot.objects.get().quantity == inventory.quantity
+        assert enqueue_scheduled() == []  # ran within the interval
+
+        Job.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        enqueue_scheduled()
+        run_pending()
+        assert Job.objects.filter(kind="inventories.snapshot_stock").first().result == {"skipped": True}
+        assert StockSnapshot.objects.count() == 1
+
+        settings.STOCK_SNAPSHOT_INTERVAL = 0
+        Job.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        assert enqueue_scheduled() == []
+
+    def test_bulk_create_and_update(self, inventory: Inventory, django_assert_max_num_queries) -> None:
+        """Test that a JSON array is written in batches with the summary and ledger kept in step."""
+        from apps.inventories.models import StockMovement, StockSummary
+
+        items = [{"company": self.company.id, "product": self.product.id, "quantity": n} for n in range(1, 51)]
+        items.append({"id": inventory.id, "quantity": 100})
+        url: str = reverse("inventory-bulk")
+
+        with django_assert_max_num_queries(15):
+            response: Response = self.admin_client.post(url, items, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"created": 50, "updated": 1, "errors": []}
+
+        inventory.refresh_from_db()
+        assert inventory.quantity == 100
+        summary = StockSummary.objects.get(company=self.company, product=self.product)
+        assert (summary.quantity, summary.row_count) == (100 + sum(range(1, 51)), 51)
+        assert StockMovement.objects.filter(reason="created").count() == 51
+        assert StockMovement.objects.get(reason="updated").delta == 25
+
+        forbidden: Response = self.external_client.post(url, items, format="json")
+        assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_bulk_reports_item_errors(self, inventory: Inventory) -> None:
+        """Test that invalid items are reported by index and block the write unless skipped."""
+        url: str = reverse("inventory-bulk")
+        body = "\n".join(
+            [
+                f'{{"company": {self.company.id}, "product": {self.product.id}, "quantity": 5}}',
+                f'{{"company": {self.company.id}, "product": 999999, "quantity": 5}}',
+                '{"id": 999999, "quantity": 1}',
+                f'{{"id": {inventory.id}, "quantity": -3}}',
+            ]
+        )
+
+        response: Response = self.admin_client.post(url, body, content_type="application/x-ndjson")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error["index"] for error in response.data["errors"]] == [1, 2, 3]
+        assert "product" in response.data["errors"][0]["errors"]
+        assert Inventory.objects.count() == 1
+
+        skipped: Response = self.admin_client.post(
+            url + "?skip_invalid=true", body, content_type="application/x-ndjson"
+        )
+        assert skipped.status_code == status.HTTP_200_OK
+        assert (skipped.data["created"], skipped.data["updated"], len(skipped.data["errors"])) == (1, 0, 3)
+        assert Inventory.objects.count() == 2
+
+        malformed: Response = self.admin_client.post(url, "{not json}\n", content_type="application/x-ndjson")
+        assert malformed.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_benchmark_command(self, tmp_path) -> None:
+        """Test that the benchmark writes comparable JSON results and fails on regressions."""
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        output = tmp_path / "bench.json"
+        options = {"companies": 2, "products": 5, "inventories": 20, "repeat": 2, "stderr": StringIO()}
+        call_command("benchmark", only="companies_list,inventories_filter", output=str(output), **options)
+        report = json.loads(output.read_text())
+        assert set(report["results"]) == {"companies_list", "inventories_filter"}
+        assert report["results"]["inventories_filter"]["status"] == 200
+        assert report["meta"]["volumes"]["inventories"] == Inventory.objects.count() + 20
+        assert not Inventory.objects.filter(company__nit__startswith="BENCH").exists()
+
+        baseline = tmp_path / "baseline.json"
+        compare = {"only": "companies_list", "baseline": str(baseline), "stdout": StringIO(), **options}
+        baseline.write_text(json.dumps({"results": {"companies_list": {"median_ms": 10**6}}}))
+        call_command("benchmark", **compare)
+        baseline.write_text(json.dumps({"results": {"companies_list": {"median_ms": 10**-6}}}))
+        with pytest.raises(CommandError, match="slower than the baseline"):
+            call_command("benchmark", **compare)
@@ -4,30 +4,50 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from io import BytesIO
-from django.core.mail import EmailMessage
+from smtplib import SMTPServerDisconnected
+from typing import Iterator
+from django.core.mail import EmailMessage, get_connection
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from django.conf import settings
-import tempfile
+from django.db.models import QuerySet
 from datetime import datetime
 import logging
 
 from apps.inventories.models import Inventory
+from apps.inventories.pdf_stream import Column, TextLine, stream_table_pdf, stream_table_pdf_parallel
+from apps.inventories.queries import fetch_report_rows
+from apps.inventories.report_cache import report_cache
+from apps.inventories.workers import report_workers, shared_report_executor
 
 logger = logging.getLogger(__name__)
 
 
-def create_inventory_pdf(buffer: BytesIO, inventory_items: list[Inventory], title: str = "Inventory Report", company_name: str = None) -> BytesIO:
+def create_inventory_pdf(buffer: BytesIO, inventory_items: QuerySet[Inventory], title: str = "Inventory Report", company_name: str = None) -> BytesIO:
     """
     Common function to create an elegant PDF with inventory information.
     
     Args:
         buffer: BytesIO buffer to write the PDF to
-        inventory_items: Queryset or list of inventory items
+        inventory_items: Queryset of inventory items
         title: Title for the PDF
         company_name: Optional company name for customization
     
     Returns:
         The buffer with the PDF content
     """
+    # Fetch every row in a single joined query
+    rows = list(fetch_report_rows(inventory_items, include_company=not company_name))
+    return build_inventory_pdf(buffer, rows, title, company_name)
+
+
+def build_inventory_pdf(
+    buffer: BytesIO, rows: list[tuple[str, ...]], title: str = "Inventory Report", company_name: str = None
+) -> BytesIO:
+    """
+    Lay out already fetched report rows (see fetch_report_rows) as a PDF.
+    Does not touch the database, so it can run in a worker process.
+    """
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
     
@@ -47,35 +67,17 @@ def create_inventory_pdf(buffer: BytesIO, inventory_items: list[Inventory], titl
     elements.append(Spacer(1, 30))
     
     # Resumen
-    elements.append(Paragraph(f"Total products in inventory: {len(inventory_items)}", styles["Normal"]))
+    elements.append(Paragraph(f"Total products in inventory: {len(rows)}", styles["Normal"]))
     elements.append(Spacer(1, 20))
     
     # Data for the table
     if company_name:
         # For a specific company, no need to include company column
         data = [["ID", "Product", "Code", "Quantity", "Date"]]
-        
-        for item in inventory_items:
-            data.append([
-                str(item.id),
-                item.product.name,
-                item.product.code,
-                str(item.quantity),
-                item.created_at.strftime("%d/%m/%Y %H:%M")
-            ])
     else:
         # For all companies, include company column
         data = [["ID", "Company", "Product", "Code", "Quantity", "Date"]]
-        
-        for item in inventory_items:
-            data.append([
-                str(item.id),
-                item.company.name,
-                item.product.name,
-                item.product.code,
-                str(item.quantity),
-                item.created_at.strftime("%d/%m/%Y %H:%M")
-            ])
+    data.extend(rows)
     
     # Create the table
     table = Table(data, repeatRows=1)
@@ -119,28 +121,23 @@ def create_inventory_pdf(buffer: BytesIO, inventory_items: list[Inventory], titl
     return buffer
 
 
-def generate_inventory_pdf_for_email(inventory_data: list[Inventory], company_name: str = None) -> str:
+def render_inventory_pdf_for_email(inventory_data: QuerySet[Inventory], company_name: str = None) -> bytes:
     """
-    Generate an elegant PDF with the inventory information using ReportLab.
-    Returns the path to a temporary file with the PDF.
+    Render the email version of the inventory PDF and return its bytes.
     """
     buffer = BytesIO()
     create_inventory_pdf(
-        buffer=buffer, 
-        inventory_items=inventory_data, 
-        title=f"Inventory of {company_name}", 
+        buffer=buffer,
+        inventory_items=inventory_data,
+        title=f"Inventory of {company_name}",
         company_name=company_name
     )
-    
-    # Create a temporary file
-    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-        temp_file.write(buffer.getvalue())
-        return temp_file.name
+    return buffer.getvalue()
 
 
-def send_inventory_email(email: str, pdf_path: str, company_name: str = None) -> None:
+def build_inventory_email(email: str, pdf_content: bytes, company_name: str = None) -> EmailMessage:
     """
-    Envía el PDF del inventario por correo electrónico.
+    Build the inventory email with the PDF attached straight from memory.
     """
     subject = f'Inventory of {company_name}' if company_name else 'Inventory of all companies'
     message = f'Please find attached the inventory of {company_name}.' if company_name else 'Please find attached the inventory of all companies.'
@@ -173,19 +170,178 @@ def send_inventory_email(email: str, pdf_path: str, company_name: str = None) ->
     email_message.content_subtype = "html"
     
     # Attach the PDF
-    with open(pdf_path, 'rb') as f:
-        email_message.attach('inventory.pdf', f.read(), 'application/pdf')
-    
-    # Send the email
-    email_message.send(fail_silently=False)
-    
+    email_message.attach('inventory.pdf', pdf_content, 'application/pdf')
+    return email_message
+
+
+def send_inventory_email(email: str, pdf_content: bytes, company_name: str = None) -> None:
+    """
+    Envía el PDF del inventario por correo electrónico.
+    """
+    build_inventory_email(email, pdf_content, company_name).send(fail_silently=False)
     logger.info(f"Email sent successfully to {email}")
 
 
-def generate_inventory_pdf(inventory_queryset: list[Inventory]) -> BytesIO:
+def _close_connection(connection) -> None:
+    """Close an SMTP session that may already be broken"""
+    try:
+        connection.close()
+    except Exception as e:
+        logger.warning(f"Could not close the mail connection: {e}")
+
+
+def send_inventory_emails(emails: list[str], pdf_content: bytes, company_name: str = None) -> list[dict]:
+    """
+    Send the same inventory PDF to many recipients.
+
+    Messages go out in batches of INVENTORY_EMAIL_BATCH_SIZE, each batch over a
+    single SMTP session. A failing recipient is reported and skipped instead of
+    aborting the rest; a dropped connection is reopened for the next message.
+    When the mail server cannot be reached, that recipient and every later one
+    are reported as failed, so the results of those already sent are kept.
+
+    Returns one {"email", "status", "error"} entry per recipient, in order.
+    """
+    results: list[dict] = []
+    batch_size = settings.INVENTORY_EMAIL_BATCH_SIZE
+    connection = None
+    connection_error: str | None = None
+    try:
+        for index, email in enumerate(emails):
+            if connection_error is None and (connection is None or index % batch_size == 0):
+                if connection is not None:
+                    _close_connection(connection)
+                    connection = None
+                try:
+                    connection = get_connection(fail_silently=False)
+                    connection.open()
+                except Exception as e:
+                    connection = None
+                    connection_error = f"Could not connect to the mail server: {e}"
+                    logger.error(connection_error)
+            if connection_error is not None:
+                results.append({"email": email, "status": "failed", "error": connection_error})
+                continue
+
+            try:
+                validate_email(email)
+                message = build_inventory_email(email, pdf_content, company_name)
+                connection.send_messages([message])
+            except Exception as e:
+                error = "; ".join(e.messages) if isinstance(e, ValidationError) else str(e)
+                logger.warning(f"Could not send the inventory to {email}: {error}")
+                results.append({"email": email, "status": "failed", "error": error})
+                if isinstance(e, SMTPServerDisconnected):
+                    # Reopened before the next message
+                    _close_connection(connection)
+                    connection = None
+            else:
+                results.append({"email": email, "status": "sent", "error": None})
+    finally:
+        if connection is not None:
+            _close_connection(connection)
+    return results
+
+
+def get_inventory_pdf_for_email(company_id: int | None = None) -> bytes:
+    """
+    Render (or reuse, while the data is unchanged) the inventory PDF of a
+    company, or of all companies.
+    """
+    inventories = Inventory.objects.filter(company_id=company_id) if company_id else Inventory.objects.all()
+    return report_cache.get_or_render(
+        report_cache.make_key("email", company_id),
+        lambda: render_inventory_pdf_for_email(inventory_data=inventories),
+    )
+
+
+def deliver_inventory_email(email: str, company_id: int | None = None) -> None:
+    """
+    Send the inventory PDF of a company, or of all companies, by email.
+    """
+    send_inventory_email(email=email, pdf_content=get_inventory_pdf_for_email(company_id))
+
+
+def deliver_inventory_emails(emails: list[str], company_id: int | None = None) -> dict:
+    """
+    Send the inventory PDF of a company, or of all companies, to many recipients.
+    The PDF is rendered once for all of them.
+
+    Returns the sent/failed totals and the per-recipient results.
+    """
+    results = send_inventory_emails(emails, get_inventory_pdf_for_email(company_id))
+    sent = sum(1 for result in results if result["status"] == "sent")
+    return {"sent": sent, "failed": len(results) - sent, "results": results}
+
+
+def generate_inventory_pdf(inventory_queryset: QuerySet[Inventory]) -> BytesIO:
     """
     Generate inventory PDF using ReportLab for download
     Uses the common function to create the PDF
     """
     buffer = BytesIO()
     return create_inventory_pdf(buffer, inventory_queryset)
+
+
+def generate_inventory_pdf_stream(
+    inventory_queryset: QuerySet[Inventory], title: str = "Inventory Report", company_name: str = None
+) -> Iterator[bytes]:
+    """
+    Generate the inventory PDF as a stream of byte chunks.
+    Rows are read with a chunked iterator and rendered one page at a time,
+    so memory stays flat regardless of the size of the queryset. Above
+    INVENTORY_PDF_PARALLEL_THRESHOLD rows the pages are laid out in parallel.
+    """
+    total = inventory_queryset.count()
+    rows = fetch_report_rows(
+        inventory_queryset, include_company=not company_name, chunk_size=settings.INVENTORY_REPORT_CHUNK_SIZE
+    )
+
+    if company_name:
+        columns = [
+            Column("ID", 60),
+            Column("Product", 200),
+            Column("Code", 110),
+            Column("Quantity", 70),
+            Column("Date", 100),
+        ]
+    else:
+        columns = [
+            Column("ID", 50),
+            Column("Company", 120),
+            Column("Product", 140),
+            Column("Code", 80),
+            Column("Quantity", 60),
+            Column("Date", 90),
+        ]
+
+    header_lines = [
+        TextLine(title, size=18, bold=True, space_after=20),
+        TextLine(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", space_after=30),
+        TextLine(f"Total products in inventory: {total}", space_after=20),
+    ]
+    owner = company_name or "Lite Thinking"
+    footer_lines = [
+        TextLine("This document was automatically generated by the inventory system.", size=8, space_after=4),
+        TextLine(f"© {datetime.now().year} {owner} - All rights reserved", size=8),
+    ]
+    workers = report_workers()
+    if total <= settings.INVENTORY_PDF_PARALLEL_THRESHOLD or workers <= 1:
+        return stream_table_pdf(rows, columns, header_lines, footer_lines)
+    return _stream_parallel(rows, columns, header_lines, footer_lines, workers)
+
+
+def _stream_parallel(rows, columns, header_lines, footer_lines, workers: int) -> Iterator[bytes]:
+    """
+    Large-report mode: page layout runs in the shared report pool of this process.
+    """
+    with shared_report_executor() as executor:
+        yield from stream_table_pdf_parallel(
+            rows,
+            columns,
+            executor,
+            header_lines,
+            footer_lines,
+            pages_per_segment=settings.INVENTORY_PDF_PAGES_PER_SEGMENT,
+            max_in_flight=workers * 2,
+        )
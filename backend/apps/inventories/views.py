@@ -3,48 +3,290 @@ Views for inventories
 """
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from apps.inventories.models import Inventory
-from apps.inventories.serializers import InventorySerializer, EmailInventorySerializer
+from apps.inventories.models import Inventory, StockSummary
+from apps.inventories.serializers import (
+    InventorySerializer,
+    EmailInventorySerializer,
+    BulkEmailInventorySerializer,
+    StockSummarySerializer,
+    StockAsOfQuerySerializer,
+)
 from rest_framework.decorators import action
-from django.http import FileResponse
-from apps.inventories.utils import generate_inventory_pdf, generate_inventory_pdf_for_email, send_inventory_email
-from core.permissions import IsAdminOrReadOnly
-from django.db.models import QuerySet
-import os
+from rest_framework.parsers import JSONParser
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from apps.inventories.filters import InventoryFilter, StockSummaryFilter
+from apps.inventories.ledger import stock_as_of
+from apps.inventories.bundle import generate_inventory_bundle
+from apps.inventories.report_cache import report_cache
+from apps.inventories.utils import (
+    deliver_inventory_email,
+    deliver_inventory_emails,
+    generate_inventory_pdf,
+    generate_inventory_pdf_stream,
+)
+from apps.jobs.models import Job
+from apps.jobs.queue import enqueue
+from core.conditional import ConditionalGetMixin
+from core.exports import ExportMixin
+from core.fastlist import FastListMixin
+from core.fieldsets import SparseFieldsetsMixin
+from core.parsers import NDJSONParser
+from core.pagination import InventoryCursorPagination
+from core.permissions import IsAdminOrReadOnly, IsAdminUser
+from django.db.models import Count, F, Max, QuerySet, Sum
+from django.urls import reverse
+from io import BytesIO
 import logging
 
 logger = logging.getLogger(__name__)
 # Create your views here.
 
 
-class InventoryViewSet(viewsets.ModelViewSet):
+def _query_flag(request, name: str) -> bool:
+    """Read a boolean query parameter such as ?stream=true"""
+    return request.query_params.get(name, "").lower() in ("1", "true", "yes")
+
+
+# Columns added to the stock totals when grouping by company or product
+SUMMARY_GROUPS = {
+    "company": {"company_name": "company__name"},
+    "product": {"product_name": "product__name", "product_code": "product__code"},
+}
+
+
+def _accepted(request, job: Job) -> Response:
+    """202 response pointing to the status endpoint of a queued job"""
+    status_url = request.build_absolute_uri(reverse("job-detail", kwargs={"pk": job.pk}))
+    return Response(
+        {"job_id": job.pk, "status": job.status, "status_url": status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url},
+    )
+
+
+class InventoryViewSet(
+    ConditionalGetMixin, SparseFieldsetsMixin, FastListMixin, ExportMixin, viewsets.ModelViewSet
+):
     """
     Viewset for inventory.
     - Administrators can create, read, update and delete inventory records.
     - External users can only view inventories.
-    - Both roles can download the inventory PDF report.
+    - Both roles can download the inventory PDF report and export it as CSV or XLSX.
+    - List and detail answer 304 when the client already has the current version.
+    - ?fields= and ?omit= trim the returned fields (and the columns read).
     """
 
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = InventoryCursorPagination
+    filterset_class = InventoryFilter
+    export_filename = "inventories"
+    expand_query_param = "expand"
+    export_fields = [
+        ("ID", "id"),
+        ("Company ID", "company_id"),
+        ("Company", "company__name"),
+        ("Product ID", "product_id"),
+        ("Product code", "product__code"),
+        ("Product", "product__name"),
+        ("Quantity", "quantity"),
+        ("Created at", "created_at"),
+    ]
+
+    def get_expand(self) -> list[str]:
+        """Relations listed in ?expand=product,company"""
+        if self.request is None:
+            return []
+        value = self.request.query_params.get(self.expand_query_param, "")
+        expand = [relation.strip() for relation in value.split(",") if relation.strip()]
+        unknown = set(expand) - set(InventorySerializer.expandable_fields)
+        if unknown:
+            allowed = ", ".join(InventorySerializer.expandable_fields)
+            raise ValidationError(
+                {self.expand_query_param: [f"Cannot expand {', '.join(sorted(unknown))}. Use: {allowed}."]}
+            )
+        return expand
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            expand = self.get_expand()
+            if expand:
+                queryset = queryset.select_related(*expand)
+        return queryset
+
+    def get_validator_fields(self) -> tuple[str, ...]:
+        """Expanded names change with the related rows"""
+        return self.validator_fields + tuple(f"{relation}__updated_at" for relation in self.get_expand())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "retrieve"):
+            context["expand"] = self.get_expand()
+        return context
 
     @action(detail=False, methods=["get"])
     def download_pdf(self, request):
         """
         Generate and download an inventory PDF report.
         This endpoint is accessible to both administrators and external users.
+
+        Large reports (or any report requested with ?stream=true) are rendered
+        page by page and streamed while they are generated. With ?async=true
+        the report is built by a background job instead (202 Accepted).
         """
         queryset = self.get_queryset()
+        stream = _query_flag(request, "stream")
+        if _query_flag(request, "async"):
+            return _accepted(request, enqueue("inventories.download_pdf", {"stream": stream}, user=request.user))
+
+        cache_key = report_cache.make_key("download_stream" if stream else "download")
+
+        cached_pdf = report_cache.get(cache_key)
+        if cached_pdf is not None:
+            return FileResponse(BytesIO(cached_pdf), as_attachment=True, filename="inventory.pdf")
+
+        if stream or queryset.count() > settings.INVENTORY_PDF_STREAMING_THRESHOLD:
+            chunks = report_cache.tee(cache_key, generate_inventory_pdf_stream(queryset))
+            response = StreamingHttpResponse(chunks, content_type="application/pdf")
+            response["Content-Disposition"] = 'attachment; filename="inventory.pdf"'
+            return response
+
         pdf_buffer = generate_inventory_pdf(queryset)
+        report_cache.set(cache_key, pdf_buffer.getvalue())
         return FileResponse(pdf_buffer, as_attachment=True, filename="inventory.pdf")
 
+    @action(detail=False, methods=["get"])
+    def download_bundle(self, request):
+        """
+        Download a ZIP with one inventory PDF per company.
+        The reports are rendered in a process pool and each one is streamed
+        into the archive as soon as it is ready.
+        """
+        queryset = self.get_queryset()
+        if not queryset.exists():
+            return Response({"error": "There are no inventory records."}, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(generate_inventory_bundle(queryset), content_type="application/zip")
+        response["Content-Disposition"] = 'attachment; filename="inventory-bundle.zip"'
+        return response
+
+    @action(detail=False, methods=["post"], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Create and update many inventory records in one transaction (admin only).
+
+        The body is a JSON array or NDJSON (Content-Type: application/x-ndjson).
+        Items with an "id" update that record (only the fields given), the
+        others create one. If any item is invalid nothing is written, unless
+        ?skip_invalid=true, which writes the valid items and reports the rest.
+
+        Example request:
+        [
+            {"company": 1, "product": 2, "quantity": 10},
+            {"id": 7, "quantity": 25}
+        ]
+        """
+        skip_invalid = _query_flag(request, "skip_invalid")
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.INVENTORY_BULK_MAX_ITEMS,
+            context={**self.get_serializer_context(), "skip_invalid": skip_invalid},
+        )
+        if not serializer.is_valid():
+            if isinstance(serializer.errors, dict):
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            errors = [{"index": index, "errors": error} for index, error in enumerate(serializer.errors) if error]
+            return Response({"created": 0, "updated": 0, "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = serializer.save()
+        logger.info(f"Bulk inventory write: {len(result.created)} created, {len(result.updated)} updated")
+        return Response(
+            {
+                "created": len(result.created),
+                "updated": len(result.updated),
+                "errors": [{"index": index, "errors": error} for index, error in serializer.skipped],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def summary(self, request):
+        """
+        Current stock per company and product, read from the StockSummary table.
+        Accepts ?company= and ?product=, and ?group_by=company|product for totals.
+        """
+        filterset = StockSummaryFilter(request.query_params, queryset=StockSummary.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        summaries = filterset.qs
+
+        group_by = request.query_params.get("group_by")
+        if group_by is None:
+            summaries = summaries.select_related("company", "product")
+            return Response(StockSummarySerializer(summaries, many=True).data)
+        if group_by not in SUMMARY_GROUPS:
+            return Response(
+                {"error": f"Unsupported group_by '{group_by}'. Use one of: {', '.join(SUMMARY_GROUPS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        totals = (
+            summaries.values(group_by, **{name: F(lookup) for name, lookup in SUMMARY_GROUPS[group_by].items()})
+            .annotate(
+                quantity=Sum("quantity"),
+                row_count=Sum("row_count"),
+                pairs=Count("id"),
+                last_changed_at=Max("last_changed_at"),
+            )
+            .order_by(group_by)
+        )
+        return Response(list(totals))
+
+    @action(detail=False, methods=["get"], url_path="as-of", pagination_class=None)
+    def as_of(self, request):
+        """
+        Stock per company and product at a past moment (?date=2025-01-31 or an ISO datetime).
+        Computed from the latest stock snapshot before that moment plus the
+        movements recorded since. Accepts ?company= and ?product=.
+        """
+        query = StockAsOfQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        moment = query.validated_data["date"]
+        result = stock_as_of(
+            moment, company_id=query.validated_data.get("company"), product_id=query.validated_data.get("product")
+        )
+        return Response(
+            {
+                "date": moment,
+                "snapshot_at": result["snapshot_at"],
+                "results": [
+                    {"company": company, "product": product, "quantity": quantity}
+                    for (company, product), quantity in result["stock"].items()
+                ],
+            }
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def report_cache_stats(self, request):
+        """
+        Hit/miss counters of the PDF report cache of this worker process.
+        Only available to administrators.
+        """
+        return Response(report_cache.stats())
+
     @action(detail=False, methods=['post'])
     def send_email(self, request):
         """
         Send an inventory PDF by email.
         This endpoint allows sending an email with a PDF of all inventories
-        of a specific company.
+        of a specific company. With ?async=true the email is delivered by a
+        background job and the response is 202 Accepted with the job status URL.
         
         Example request:
         {
@@ -71,21 +313,14 @@ class InventoryViewSet(viewsets.ModelViewSet):
                     'error': 'There are no inventory records for this company.'
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            logger.info(f"Generating PDF for all companies with {len(inventories)} inventories")
-            # Generate the PDF with all inventories
-            pdf_path : str = generate_inventory_pdf_for_email(
-                inventory_data=inventories
-            )
-            logger.info(f"PDF generated at: {pdf_path}")
-
-            # Send the email
-            send_inventory_email(
-                email=email,
-                pdf_path=pdf_path,
-            )
+            if _query_flag(request, "async"):
+                job = enqueue(
+                    "inventories.send_email", {"email": email, "company_id": company_id}, user=request.user
+                )
+                return _accepted(request, job)
 
-            # Clean the temporary file
-            os.unlink(pdf_path)
+            logger.info(f"Generating PDF for company {company_id or 'all'}")
+            deliver_inventory_email(email=email, company_id=company_id)
 
             return Response({
                 'message': f'The inventory has been sent successfully to {email}.'
@@ -95,3 +330,38 @@ class InventoryViewSet(viewsets.ModelViewSet):
             return Response({
                 'error': f'Error sending the email: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=["post"])
+    def send_email_bulk(self, request):
+        """
+        Send an inventory PDF to many recipients.
+        The PDF is rendered once and the messages share SMTP sessions; every
+        recipient gets its own "sent" or "failed" entry in the response, so a
+        bad address does not stop the others. With ?async=true the emails are
+        delivered by a background job.
+
+        Example request:
+        {
+            "emails": ["first@example.com", "second@example.com"],
+            "company_id": 1
+        }
+        """
+        serializer = BulkEmailInventorySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        emails: list[str] = serializer.validated_data["emails"]
+        company_id: int | None = serializer.validated_data.get("company_id")
+        inventories = Inventory.objects.filter(company_id=company_id) if company_id else Inventory.objects.all()
+        if not inventories.exists():
+            return Response(
+                {"error": "There are no inventory records for this company."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        if _query_flag(request, "async"):
+            payload = {"emails": emails, "company_id": company_id}
+            job = enqueue("inventories.send_email_bulk", payload, user=request.user)
+            return _accepted(request, job)
+
+        logger.info(f"Sending inventory of company {company_id or 'all'} to {len(emails)} recipients")
+        return Response(deliver_inventory_emails(emails, company_id=company_id), status=status.HTTP_200_OK)
@@ -0,0 +1,92 @@
+"""
+Functions that run inside report worker processes.
+
+Rendering with ReportLab is CPU-bound and holds the GIL, so large report jobs
+are spread over a process pool. The rows are fetched by the parent process and
+sent to the workers: workers never touch the database. Keep the top-level
+imports of this module free of Django models so it can be imported by a
+freshly spawned interpreter before ``django.setup()`` runs.
+
+Requests share one pool per process, started on first use, so concurrent
+reports queue for the same INVENTORY_REPORT_WORKERS processes instead of each
+forking a pool of their own.
+"""
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Iterator
+
+from django.conf import settings
+
+_shared_pool: tuple[int, ProcessPoolExecutor] | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def init_worker() -> None:
+    """Make the app registry available in spawned worker processes"""
+    import django
+
+    django.setup()
+
+
+def report_workers() -> int:
+    return max(settings.INVENTORY_REPORT_WORKERS, 1)
+
+
+def report_executor(workers: int | None = None) -> Executor:
+    """
+    New process pool for report rendering, for benchmarks; requests use shared_report_executor().
+    With a single worker the rendering stays in-process, which avoids the pool start-up cost.
+    """
+    workers = workers or report_workers()
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+
+
+def _get_shared_pool(workers: int) -> ProcessPoolExecutor:
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool[0] != workers:
+            if _shared_pool is not None:
+                _shared_pool[1].shutdown(wait=False, cancel_futures=True)
+            _shared_pool = (workers, ProcessPoolExecutor(max_workers=workers, initializer=init_worker))
+        return _shared_pool[1]
+
+
+def _discard_shared_pool(pool: ProcessPoolExecutor) -> None:
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None and _shared_pool[1] is pool:
+            _shared_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def shared_report_executor() -> Iterator[Executor]:
+    """
+    The report pool of this process, sized by INVENTORY_REPORT_WORKERS and kept
+    between requests. A pool broken by a dead worker is replaced for the next
+    report. With a single worker the rendering stays in-process.
+    """
+    workers = report_workers()
+    if workers <= 1:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            yield executor
+        return
+    pool = _get_shared_pool(workers)
+    try:
+        yield pool
+    except BrokenExecutor:
+        _discard_shared_pool(pool)
+        raise
+
+
+def render_company_pdf(company_name: str, rows: list[tuple[str, ...]]) -> bytes:
+    """Render the per-company inventory report"""
+    from apps.inventories.utils import build_inventory_pdf
+
+    buffer = BytesIO()
+    build_inventory_pdf(buffer, rows, title=f"Inventory of {company_name}", company_name=company_name)
+    return buffer.getvalue()
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.jobs"
+
+    def ready(self):
+        from apps.jobs import signals  # noqa: F401
+
+        # Each app registers its job handlers in its own jobs.py
+        autodiscover_modules("jobs")
@@ -0,0 +1,43 @@
+"""
+Worker process for background jobs.
+
+    python manage.py run_jobs            # poll forever
+    python manage.py run_jobs --burst    # drain the queue and exit
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.jobs.queue import default_worker_id, enqueue_scheduled, requeue_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = "Claim and run pending background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--worker-id", default=None, help="Name recorded on the jobs this worker claims")
+
+    def handle(self, *args, **options):
+        worker_id = options["worker_id"] or default_worker_id()
+        self.stdout.write(f"Worker {worker_id} started")
+        try:
+            while True:
+                requeued, failed = requeue_stale(settings.JOBS_STALE_TIMEOUT)
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} stale job(s)")
+                if failed:
+                    self.stdout.write(f"Failed {failed} stale job(s) out of attempts")
+                scheduled = enqueue_scheduled()
+                if scheduled:
+                    self.stdout.write(f"Scheduled {', '.join(job.kind for job in scheduled)}")
+                processed = run_pending(worker_id)
+                if processed:
+                    self.stdout.write(f"Processed {processed} job(s)")
+                if options["burst"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write(f"Worker {worker_id} stopped")
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(max_length=100, verbose_name="Kind")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("RUNNING", "Running"),
+                            ("SUCCEEDED", "Succeeded"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("payload", models.JSONField(blank=True, default=dict, verbose_name="Payload")),
+                ("result", models.JSONField(blank=True, null=True, verbose_name="Result")),
+                ("result_file", models.BinaryField(blank=True, null=True, verbose_name="Result file")),
+                ("result_filename", models.CharField(blank=True, max_length=255, verbose_name="Result filename")),
+                (
+                    "result_content_type",
+                    models.CharField(blank=True, max_length=100, verbose_name="Result content type"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                ("attempts", models.PositiveIntegerField(default=0, verbose_name="Attempts")),
+                ("max_attempts", models.PositiveIntegerField(default=3, verbose_name="Max attempts")),
+                ("locked_by", models.CharField(blank=True, max_length=255, verbose_name="Locked by")),
+                ("available_at", models.DateTimeField(default=django.utils.timezone.now, verbose_name="Available at")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Created at")),
+                ("started_at", models.DateTimeField(blank=True, null=True, verbose_name="Started at")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="Finished at")),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Job",
+                "verbose_name_plural": "Jobs",
+                "ordering": ["-created_at"],
+                "indexes": [models.Index(fields=["status", "available_at"], name="jobs_status_available_idx")],
+            },
+        ),
+    ]
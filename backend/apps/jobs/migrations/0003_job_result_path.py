@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0002_job_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="result_path",
+            field=models.CharField(blank=True, max_length=255, verbose_name="Result path"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.1 on 2026-10-17 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0003_job_result_path"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(fields=["kind", "-created_at"], name="jobs_kind_created_idx"),
+        ),
+    ]
@@ -0,0 +1,69 @@
+"""
+Models for background jobs
+"""
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class JobStatus(models.TextChoices):
+    """Job status choices"""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class Job(models.Model):
+    """A unit of background work claimed by the run_jobs worker"""
+
+    kind = models.CharField(max_length=100, verbose_name="Kind")
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.PENDING, verbose_name="Status"
+    )
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Payload")
+    result = models.JSONField(null=True, blank=True, verbose_name="Result")
+    result_file = models.BinaryField(null=True, blank=True, verbose_name="Result file")
+    # Name in JOBS_RESULT_DIR of a result written to disk instead of result_file
+    result_path = models.CharField(max_length=255, blank=True, verbose_name="Result path")
+    result_filename = models.CharField(max_length=255, blank=True, verbose_name="Result filename")
+    result_content_type = models.CharField(max_length=100, blank=True, verbose_name="Result content type")
+    error = models.TextField(blank=True, verbose_name="Error")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Max attempts")
+    locked_by = models.CharField(max_length=255, blank=True, verbose_name="Locked by")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        verbose_name="Created by",
+    )
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="Available at")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started at")
+    # Refreshed by the worker while the job runs; a stale heartbeat means the worker is gone
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Heartbeat at")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished at")
+
+    def __str__(self):
+        """String representation of the job"""
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def has_file(self) -> bool:
+        return bool(self.result_filename)
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="jobs_status_available_idx"),
+            # Last job of a scheduled kind
+            models.Index(fields=["kind", "-created_at"], name="jobs_kind_created_idx"),
+        ]
@@ -0,0 +1,255 @@
+"""
+Database-backed job queue.
+
+Jobs are rows in the ``Job`` table. Workers claim them with
+``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of ``run_jobs`` processes
+can share the table without handing the same job to two of them.
+
+While a job runs, a thread of its worker refreshes ``heartbeat_at`` every
+JOBS_HEARTBEAT_INTERVAL seconds. ``requeue_stale`` only takes back the jobs
+whose heartbeat stopped, however long they have been running, and fails the
+ones that have used up their attempts instead of handing them out again.
+
+Kinds registered with ``schedule`` are enqueued by the workers themselves
+every time their interval has passed since the last job of that kind.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.jobs.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+_handlers: dict[str, Callable[[dict], Any]] = {}
+# kind -> name of the setting holding its interval in seconds
+_schedules: dict[str, str] = {}
+
+
+@dataclass
+class JobResult:
+    """
+    What a handler returns when it produces a file as well as data: its
+    ``content``, stored on the job, or the ``path`` returned by save_result_file.
+    """
+
+    data: dict | None = None
+    content: bytes | None = None
+    path: str = ""
+    filename: str = ""
+    content_type: str = "application/octet-stream"
+
+
+def result_file_path(name: str) -> Path:
+    return Path(settings.JOBS_RESULT_DIR) / name
+
+
+def save_result_file(chunks: Iterable[bytes], filename: str) -> tuple[str, int]:
+    """
+    Write a result to a new file in JOBS_RESULT_DIR one chunk at a time, so it
+    never sits in memory whole. Returns the file name and the size written.
+    """
+    name = f"{uuid.uuid4().hex}-{filename}"
+    path = result_file_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    size = 0
+    try:
+        with path.open("wb") as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return name, size
+
+
+def register(kind: str) -> Callable:
+    """Register the decorated function as the handler for a job kind"""
+
+    def decorator(handler: Callable[[dict], Any]) -> Callable[[dict], Any]:
+        _handlers[kind] = handler
+        return handler
+
+    return decorator
+
+
+def schedule(kind: str, interval_setting: str) -> None:
+    """Have the workers enqueue ``kind`` every ``settings.<interval_setting>`` seconds (0 turns it off)"""
+    get_handler(kind)
+    _schedules[kind] = interval_setting
+
+
+def get_handler(kind: str) -> Callable[[dict], Any]:
+    try:
+        return _handlers[kind]
+    except KeyError:
+        raise LookupError(f"No handler registered for job kind '{kind}'")
+
+
+def enqueue(kind: str, payload: dict | None = None, user=None) -> Job:
+    """Store a new pending job; with JOBS_RUN_EAGERLY it runs before returning"""
+    get_handler(kind)
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        # request.user may be a ClaimsUser built from the token, not a model instance
+        created_by_id=user.pk if user is not None and user.is_authenticated else None,
+        max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_RUN_EAGERLY:
+        job = claim_job(worker_id="eager", job_id=job.pk) or job
+        # No heartbeat: the job may not be committed yet, and it ends with the request
+        run_job(job, heartbeat=False)
+    return job
+
+
+def enqueue_scheduled() -> list[Job]:
+    """
+    Enqueue the scheduled kinds without a job created within their interval.
+    A kind with a job still pending or running is not enqueued again.
+    """
+    now = timezone.now()
+    jobs = []
+    for kind, interval_setting in _schedules.items():
+        interval = getattr(settings, interval_setting)
+        if not interval:
+            continue
+        recent = Q(created_at__gt=now - timedelta(seconds=interval)) | Q(
+            status__in=[JobStatus.PENDING, JobStatus.RUNNING]
+        )
+        if not Job.objects.filter(recent, kind=kind).exists():
+            jobs.append(enqueue(kind))
+    return jobs
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_job(worker_id: str | None = None, job_id: int | None = None) -> Job | None:
+    """
+    Lock the next available job and mark it as running.
+    Rows locked by another worker are skipped instead of waited on.
+    """
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update(skip_locked=True).filter(
+            status=JobStatus.PENDING, available_at__lte=timezone.now()
+        )
+        if job_id is not None:
+            jobs = jobs.filter(pk=job_id)
+        job = jobs.defer("result_file").order_by("available_at", "id").first()
+        if job is None:
+            return None
+
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.locked_by = worker_id or default_worker_id()
+        job.save(update_fields=["status", "attempts", "started_at", "heartbeat_at", "locked_by"])
+    return job
+
+
+@contextmanager
+def _heartbeat(job: Job, interval: float):
+    """Refresh the heartbeat of a running job from a background thread until the block exits"""
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                Job.objects.filter(pk=job.pk, status=JobStatus.RUNNING, locked_by=job.locked_by).update(
+                    heartbeat_at=timezone.now()
+                )
+        except Exception:
+            logger.exception(f"Heartbeat of job {job.pk} stopped")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"job-{job.pk}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_job(job: Job, heartbeat: bool = True) -> Job:
+    """Run a claimed job and store its outcome; failed jobs are retried with backoff"""
+    try:
+        if heartbeat and settings.JOBS_HEARTBEAT_INTERVAL > 0:
+            with _heartbeat(job, settings.JOBS_HEARTBEAT_INTERVAL):
+                output = get_handler(job.kind)(job.payload)
+        else:
+            output = get_handler(job.kind)(job.payload)
+    except Exception as e:
+        logger.exception(f"Job {job.pk} ({job.kind}) failed on attempt {job.attempts}")
+        job.error = f"{e}\n\n{traceback.format_exc()}"
+        if job.attempts < job.max_attempts:
+            job.status = JobStatus.PENDING
+            job.available_at = timezone.now() + timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "available_at", "finished_at"])
+        return job
+
+    if not isinstance(output, JobResult):
+        output = JobResult(data=output)
+    job.status = JobStatus.SUCCEEDED
+    job.result = output.data
+    job.error = ""
+    job.finished_at = timezone.now()
+    update_fields = ["status", "result", "error", "finished_at"]
+    if output.content is not None or output.path:
+        job.result_file = output.content
+        job.result_path = output.path
+        job.result_filename = output.filename
+        job.result_content_type = output.content_type
+        update_fields += ["result_file", "result_path", "result_filename", "result_content_type"]
+    job.save(update_fields=update_fields)
+    logger.info(f"Job {job.pk} ({job.kind}) succeeded")
+    return job
+
+
+def run_pending(worker_id: str | None = None, limit: int | None = None) -> int:
+    """Run available jobs until the queue is empty (or ``limit`` is reached)"""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def requeue_stale(timeout: int) -> tuple[int, int]:
+    """
+    Give back the running jobs without a heartbeat for ``timeout`` seconds, their
+    worker having died; those out of attempts are failed. Returns (requeued, failed).
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=timeout)
+    stale = Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff), status=JobStatus.RUNNING
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=JobStatus.FAILED, locked_by="", error="The worker running the job stopped responding", finished_at=now
+    )
+    requeued = stale.update(status=JobStatus.PENDING, locked_by="", available_at=now)
+    return requeued, failed
@@ -0,0 +1,34 @@
+from rest_framework import serializers
+from django.urls import reverse
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Job status serializer"""
+
+    result_url = serializers.SerializerMethodField()
+
+    class Meta:
+        """Meta class"""
+
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "result",
+            "result_url",
+            "error",
+            "attempts",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_result_url(self, job: Job) -> str | None:
+        """Download link of the file produced by the job, once it exists"""
+        if not job.has_file:
+            return None
+        url = reverse("job-result", kwargs={"pk": job.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
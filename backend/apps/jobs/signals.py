@@ -0,0 +1,15 @@
+"""
+Signals for background jobs
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.jobs.models import Job
+from apps.jobs.queue import result_file_path
+
+
+@receiver(post_delete, sender=Job)
+def delete_result_file(sender, instance: Job, **kwargs) -> None:
+    """Result files written to disk go with their job"""
+    if instance.result_path:
+        result_file_path(instance.result_path).unlink(missing_ok=True)
@@ -0,0 +1,146 @@
+"""
+Tests for background jobs
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from apps.companies.models import Company
+from apps.inventories.models import Inventory
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.queue import claim_job, enqueue, register, requeue_stale, run_job, run_pending
+from apps.products.models import Product
+from apps.users.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+
+@register("tests.fail")
+def failing_job(payload: dict) -> None:
+    raise RuntimeError("boom")
+
+
+@register("tests.slow")
+def slow_job(payload: dict) -> None:
+    time.sleep(payload["seconds"])
+
+
+@pytest.mark.django_db
+class TestJobAPI:
+    @pytest.fixture(autouse=True)
+    def setup(self, admin_user: User, external_user: User, company: Company, product: Product) -> None:
+        """Initial setup for all tests"""
+        self.admin_client: APIClient = APIClient()
+        self.external_client: APIClient = APIClient()
+        self.admin_client.force_authenticate(user=admin_user)
+        self.external_client.force_authenticate(user=external_user)
+
+        Inventory.objects.create(company=company, product=product, quantity=75)
+        self.company = company
+
+    def test_send_email_async(self, mailoutbox) -> None:
+        """Test that the email is queued and delivered by the worker."""
+        url: str = reverse("inventory-send-email") + "?async=true"
+        response: Response = self.admin_client.post(
+            url, {"email": "recipient@example.com", "company_id": self.company.id}, format="json"
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response["Location"] == response.data["status_url"]
+        assert len(mailoutbox) == 0
+
+        call_command("run_jobs", "--burst")
+
+        assert len(mailoutbox) == 1
+        assert mailoutbox[0].to == ["recipient@example.com"]
+        assert mailoutbox[0].attachments[0][0] == "inventory.pdf"
+
+        job_response: Response = self.admin_client.get(response.data["status_url"])
+        assert job_response.data["status"] == JobStatus.SUCCEEDED
+        assert job_response.data["result_url"] is None
+
+    def test_download_pdf_async(self) -> None:
+        """Test that a queued PDF can be downloaded from the job result endpoint."""
+        response: Response = self.external_client.get(reverse("inventory-download-pdf") + "?async=true")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job_id: int = response.data["job_id"]
+
+        pending: Response = self.external_client.get(reverse("job-result", kwargs={"pk": job_id}))
+        assert pending.status_code == status.HTTP_409_CONFLICT
+
+        assert run_pending() == 1
+        result: Response = self.external_client.get(reverse("job-result", kwargs={"pk": job_id}))
+        assert result.status_code == status.HTTP_200_OK
+        assert result["Content-Type"] == "application/pdf"
+        assert b"".join(result.streaming_content).startswith(b"%PDF")
+
+    def test_streamed_pdf_job_writes_a_result_file(self, settings) -> None:
+        """Test that a streamed PDF is written to a result file, not to the job row, and goes with the job."""
+        from pathlib import Path
+
+        job = enqueue("inventories.download_pdf", {"stream": True})
+        run_pending()
+        job.refresh_from_db()
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result_file is None
+        path = Path(settings.JOBS_RESULT_DIR) / job.result_path
+        assert path.read_bytes().startswith(b"%PDF")
+        assert job.result == {"size": path.stat().st_size}
+
+        job.delete()
+        assert not path.exists()
+
+    def test_jobs_are_private(self, admin_user: User) -> None:
+        """Test that users only see the jobs they started."""
+        job = enqueue("inventories.download_pdf", user=admin_user)
+        response: Response = self.external_client.get(reverse("job-detail", kwargs={"pk": job.pk}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_failed_job_is_retried_then_failed(self) -> None:
+        """Test that a failing job goes back to the queue until it runs out of attempts."""
+        job = enqueue("tests.fail")
+        job.max_attempts = 2
+        job.save()
+
+        job = run_job(claim_job())
+        assert job.status == JobStatus.PENDING
+        assert "boom" in job.error
+        assert claim_job() is None  # backing off
+
+        Job.objects.filter(pk=job.pk).update(available_at=job.created_at)
+        job = run_job(claim_job())
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == 2
+
+    def test_stale_jobs_follow_the_heartbeat(self) -> None:
+        """Test that running jobs are taken back once their heartbeat stops, and failed when out of attempts."""
+        job = claim_job(job_id=enqueue("tests.fail").pk)
+        long_ago = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(pk=job.pk).update(started_at=long_ago)
+        assert requeue_stale(timeout=60) == (0, 0)
+
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)
+        assert requeue_stale(timeout=60) == (1, 0)
+        assert Job.objects.get(pk=job.pk).status == JobStatus.PENDING
+
+        job = claim_job(job_id=job.pk)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=long_ago, max_attempts=job.attempts)
+        assert requeue_stale(timeout=60) == (0, 1)
+        job.refresh_from_db()
+        assert job.status == JobStatus.FAILED
+        assert job.finished_at is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_running_job_keeps_a_heartbeat(settings) -> None:
+    """Test that the worker refreshes the heartbeat of the job it is running."""
+    settings.JOBS_HEARTBEAT_INTERVAL = 0.05
+    job = claim_job(job_id=enqueue("tests.slow", {"seconds": 0.3}).pk)
+    claimed_at = job.heartbeat_at
+
+    job = run_job(job)
+    assert job.status == JobStatus.SUCCEEDED
+    assert Job.objects.get(pk=job.pk).heartbeat_at > claimed_at
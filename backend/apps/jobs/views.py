@@ -0,0 +1,52 @@
+"""
+Views for background jobs
+"""
+from django.http import FileResponse, HttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.queue import result_file_path
+from apps.jobs.serializers import JobSerializer
+from apps.users.models import RoleChoices
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Viewset for background jobs.
+    - Users can follow the status of the jobs they started.
+    - Administrators can see every job.
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Job.objects.defer("result_file", "payload")
+        if self.request.user.role != RoleChoices.ADMIN:
+            queryset = queryset.filter(created_by_id=self.request.user.pk)
+        return queryset
+
+    @action(detail=True, methods=["get"])
+    def result(self, request, pk=None):
+        """
+        Download the file produced by a finished job.
+        """
+        job = self.get_object()
+        if job.status != JobStatus.SUCCEEDED or not job.has_file:
+            return Response(
+                {"error": "The job has not produced a file yet.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if job.result_path:
+            try:
+                stream = result_file_path(job.result_path).open("rb")
+            except FileNotFoundError:
+                return Response({"error": "The result file is no longer available."}, status=status.HTTP_410_GONE)
+            return FileResponse(
+                stream, as_attachment=True, filename=job.result_filename, content_type=job.result_content_type
+            )
+        response = HttpResponse(bytes(job.result_file), content_type=job.result_content_type)
+        response["Content-Disposition"] = f'attachment; filename="{job.result_filename}"'
+        return response
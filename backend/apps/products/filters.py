@@ -0,0 +1,84 @@
+"""
+Filters for products
+"""
+import django_filters
+from django import forms
+from django.core.validators import RegexValidator
+from apps.products.models import INDEXED_CURRENCIES, Product, price_in
+from core.search import SearchSpec, search
+
+PRODUCT_SEARCH = SearchSpec(
+    fields=("code", "name", "features"), trigram_fields=("code", "name"), vector_column="search_vector"
+)
+
+
+class ProductFilterForm(forms.Form):
+    """Price bounds only make sense in one currency"""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        has_bounds = cleaned_data.get("price_min") is not None or cleaned_data.get("price_max") is not None
+        if has_bounds and not cleaned_data.get("price_currency"):
+            raise forms.ValidationError("price_min and price_max need price_currency.")
+        return cleaned_data
+
+
+class PriceOrderingFilter(django_filters.OrderingFilter):
+    """Adds price_<currency> orderings (products without that price last) to the field orderings"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for currency in INDEXED_CURRENCIES:
+            key = f"price_{currency.lower()}"
+            self.extra["choices"] += [(key, f"Price ({currency})"), (f"-{key}", f"Price ({currency}) (descending)")]
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ordering = []
+        for param in value:
+            descending = param.startswith("-")
+            name = param.lstrip("-")
+            if name.startswith("price_"):
+                expression = price_in(name.removeprefix("price_").upper())
+                ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+            else:
+                ordering.append(self.get_ordering_value(param))
+        return qs.order_by(*ordering, "id")
+
+
+class ProductFilter(django_filters.FilterSet):
+    """
+    Product filters: ?search= (ranked full-text search over code, name and features),
+    ?company=, ?price_currency= (products priced in it),
+    ?price_min= and ?price_max= (in price_currency) and
+    ?ordering=name|code|price_usd|price_cop|price_eur (prefix - for descending).
+    Ranges and orderings in the INDEXED_CURRENCIES use their expression index.
+    """
+
+    search = django_filters.CharFilter(method="filter_search")
+    price_currency = django_filters.CharFilter(
+        method="filter_price_currency",
+        validators=[RegexValidator(r"^[A-Za-z]{3}$", "Enter a three letter currency code.")],
+    )
+    price_min = django_filters.NumberFilter(method="filter_price_range")
+    price_max = django_filters.NumberFilter(method="filter_price_range")
+    ordering = PriceOrderingFilter(fields=("name", "code"))
+
+    class Meta:
+        """Meta class"""
+
+        model = Product
+        fields = ["company"]
+        form = ProductFilterForm
+
+    def filter_search(self, queryset, name, value):
+        return search(queryset, PRODUCT_SEARCH, value)
+
+    def filter_price_currency(self, queryset, name, value):
+        return queryset.filter(price__has_key=value.upper())
+
+    def filter_price_range(self, queryset, name, value):
+        currency = self.form.cleaned_data["price_currency"].upper()
+        lookup = "gte" if name == "price_min" else "lte"
+        return queryset.alias(price_value=price_in(currency)).filter(**{f"price_value__{lookup}": value})
@@ -0,0 +1,169 @@
+"""
+Catalog import with upsert on ``Product.code``.
+
+Rows are read one at a time from CSV, NDJSON or a JSON array, checked
+without per-row queries, and written in batches of PRODUCT_IMPORT_BATCH_SIZE
+with ``bulk_create(update_conflicts=True)``, i.e. one
+``INSERT ... ON CONFLICT (code) DO UPDATE`` per batch. Only one batch is held
+in memory (JSON arrays are the exception: use CSV or NDJSON for big files).
+Each batch commits on its own, so a failure keeps the batches already written.
+"""
+import codecs
+import csv
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.companies.models import Company
+from apps.products.models import Product
+from apps.products.signals import products_imported
+from apps.products.validators import validate_price
+
+IMPORT_FORMATS = ("csv", "json", "ndjson")
+UPSERT_FIELDS = ["name", "features", "price", "company", "updated_at"]
+
+# CSV headers are matched case-insensitively; the product export headers are accepted too
+HEADER_ALIASES = {"company_id": "company"}
+
+
+@dataclass
+class ImportSummary:
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def reject(self, row_number: int, errors: dict) -> None:
+        self.rejected += 1
+        if len(self.errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def as_dict(self) -> dict:
+        return {"inserted": self.inserted, "updated": self.updated, "rejected": self.rejected, "errors": self.errors}
+
+
+def _header(name: str) -> str:
+    name = name.strip().lower().replace(" ", "_")
+    return HEADER_ALIASES.get(name, name)
+
+
+def read_csv(stream: Iterable[bytes]) -> Iterator[dict]:
+    reader = csv.reader(codecs.iterdecode(stream, "utf-8-sig"))
+    header = [_header(name) for name in next(reader, [])]
+    for values in reader:
+        if values:
+            yield dict(zip(header, values))
+
+
+def read_ndjson(stream: Iterable[bytes]) -> Iterator[Any]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+
+
+def read_json(stream) -> Iterator[Any]:
+    data = json.loads(stream.read())
+    if not isinstance(data, list):
+        raise ValueError("A JSON import must be an array of objects.")
+    yield from data
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson, "json": read_json}
+
+
+def clean_row(row: Any) -> tuple[dict | None, dict]:
+    """Check one input row; returns (values, errors)"""
+    if isinstance(row, ValueError):
+        return None, {"non_field_errors": [str(row)]}
+    if not isinstance(row, dict):
+        return None, {"non_field_errors": ["Expected an object."]}
+
+    errors: dict[str, list[str]] = {}
+    values = {}
+    for name, max_length in (("code", 50), ("name", 255), ("features", None)):
+        value = row.get(name)
+        value = "" if value is None else str(value).strip()
+        if not value:
+            errors[name] = ["This field is required."]
+        elif max_length and len(value) > max_length:
+            errors[name] = [f"Ensure this field has no more than {max_length} characters."]
+        values[name] = value
+
+    price = row.get("price")
+    if isinstance(price, str):
+        try:
+            price = json.loads(price)
+        except ValueError:
+            price = None
+    try:
+        validate_price(price)
+    except ValidationError as e:
+        errors["price"] = e.messages
+    values["price"] = price
+
+    try:
+        values["company_id"] = int(row.get("company"))
+    except (TypeError, ValueError):
+        errors["company"] = ["A valid company id is required."]
+
+    return (None if errors else values), errors
+
+
+def _write_batch(batch: dict[str, tuple[int, dict]], summary: ImportSummary) -> None:
+    company_ids = {values["company_id"] for _, values in batch.values()}
+    companies = set(Company.objects.filter(pk__in=company_ids).values_list("pk", flat=True))
+    products = []
+    for code, (row_number, values) in list(batch.items()):
+        if values["company_id"] not in companies:
+            summary.reject(row_number, {"company": [f'Invalid pk "{values["company_id"]}" - object does not exist.']})
+            del batch[code]
+            continue
+        products.append(Product(**values))
+    if not products:
+        return
+
+    with transaction.atomic():
+        existing = set(Product.objects.filter(code__in=batch.keys()).values_list("code", flat=True))
+        Product.objects.bulk_create(
+            products, update_conflicts=True, unique_fields=["code"], update_fields=UPSERT_FIELDS
+        )
+    summary.updated += len(existing)
+    summary.inserted += len(products) - len(existing)
+
+
+def import_products(stream, import_format: str, batch_size: int | None = None) -> ImportSummary:
+    """
+    Upsert the products read from ``stream`` (a binary file or request body).
+    When a code appears twice, the later row wins and the earlier one counts as updated.
+    """
+    if import_format not in READERS:
+        raise ValueError(f"Unsupported import format '{import_format}'. Use one of: {', '.join(IMPORT_FORMATS)}.")
+    batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+    summary = ImportSummary()
+    batch: dict[str, tuple[int, dict]] = {}
+
+    for row_number, row in enumerate(READERS[import_format](stream), start=1):
+        values, errors = clean_row(row)
+        if errors:
+            summary.reject(row_number, errors)
+            continue
+        if values["code"] in batch:
+            summary.updated += 1
+        batch[values["code"]] = (row_number, values)
+        if len(batch) >= batch_size:
+            _write_batch(batch, summary)
+            batch = {}
+    if batch:
+        _write_batch(batch, summary)
+
+    if summary.inserted or summary.updated:
+        products_imported.send(sender=Product, summary=summary)
+    return summary
@@ -0,0 +1,42 @@
+"""
+Insert or update products by code from a CSV, NDJSON or JSON file.
+
+    python manage.py import_products catalog.csv
+    python manage.py import_products - --type ndjson < catalog.ndjson
+"""
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products.importer import IMPORT_FORMATS, import_products
+
+
+class Command(BaseCommand):
+    help = "Upsert products by code from a catalog file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalog file, or - to read standard input")
+        parser.add_argument("--type", choices=IMPORT_FORMATS, help="File format (default: from the extension)")
+        parser.add_argument("--batch-size", type=int, help="Rows per upsert statement")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["type"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f"Cannot tell the format of '{path}'; use --type {{{','.join(IMPORT_FORMATS)}}}")
+
+        try:
+            if path == "-":
+                summary = import_products(sys.stdin.buffer, import_format, options["batch_size"])
+            else:
+                with open(path, "rb") as stream:
+                    summary = import_products(stream, import_format, options["batch_size"])
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        for error in summary.errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{summary.inserted} inserted, {summary.updated} updated, {summary.rejected} rejected")
+        )
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:34
+
+import apps.products.validators
+from django.db import migrations, models
+import django.db.models.fields.json
+import django.db.models.functions.comparison
+
+
+def create_price_gin_index(apps, schema_editor):
+    """GIN index on the whole price for has-key (?) and containment (@>) lookups; PostgreSQL only"""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE INDEX IF NOT EXISTS product_price_gin ON products_product USING gin (price)")
+
+
+def drop_price_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS product_price_gin")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="price",
+            field=models.JSONField(
+                validators=[apps.products.validators.validate_price], verbose_name="Price in multiple currencies"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                django.db.models.functions.comparison.Cast(
+                    django.db.models.fields.json.KeyTextTransform("USD", "price"), output_field=models.FloatField()
+                ),
+                name="product_price_usd_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                django.db.models.functions.comparison.Cast(
+                    django.db.models.fields.json.KeyTextTransform("COP", "price"), output_field=models.FloatField()
+                ),
+                name="product_price_cop_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                django.db.models.functions.comparison.Cast(
+                    django.db.models.fields.json.KeyTextTransform("EUR", "price"), output_field=models.FloatField()
+                ),
+                name="product_price_eur_idx",
+            ),
+        ),
+        migrations.RunPython(create_price_gin_index, drop_price_gin_index),
+    ]
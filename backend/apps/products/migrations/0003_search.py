@@ -0,0 +1,32 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from core.search import SearchSpec, drop_search_schema_statements, search_schema_statements
+
+PRODUCT_SEARCH = SearchSpec(
+    fields=("code", "name", "features"), trigram_fields=("code", "name"), vector_column="search_vector"
+)
+WEIGHTS = {"code": "A", "name": "A", "features": "B"}
+
+
+def create_search_schema(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for statement in search_schema_statements(vendor, "products_product", PRODUCT_SEARCH, WEIGHTS):
+        schema_editor.execute(statement)
+
+
+def drop_search_schema(apps, schema_editor):
+    for statement in drop_search_schema_statements(schema_editor.connection.vendor, "products_product", PRODUCT_SEARCH):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0002_price_indexes"),
+    ]
+
+    operations = [
+        # No-op on databases other than PostgreSQL
+        TrigramExtension(),
+        migrations.RunPython(create_search_schema, drop_search_schema),
+    ]
@@ -0,0 +1,33 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+from core.search import SearchSpec, sqlite_fts_statements
+
+PRODUCT_SEARCH = SearchSpec(
+    fields=("code", "name", "features"), trigram_fields=("code", "name"), vector_column="search_vector"
+)
+
+
+def restore_sqlite_fts(apps, schema_editor):
+    """SQLite rebuilds the table to add the column, which drops the FTS triggers"""
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in sqlite_fts_statements("products_product", PRODUCT_SEARCH):
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0003_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name="Updated at"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(restore_sqlite_fts, migrations.RunPython.noop),
+    ]
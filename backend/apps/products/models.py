@@ -1,5 +1,16 @@
 from django.db import models
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
 from apps.companies.models import Company
+from apps.products.validators import validate_price
+
+# Currencies with an expression index on their price, for range filters and ordering
+INDEXED_CURRENCIES = ("USD", "COP", "EUR")
+
+
+def price_in(currency: str) -> Cast:
+    """Price in one currency as a number; the indexed form of ``price ->> 'USD'``"""
+    return Cast(KeyTextTransform(currency, "price"), output_field=models.FloatField())
 
 
 class Product(models.Model):
@@ -8,8 +19,9 @@ class Product(models.Model):
     code = models.CharField(max_length=50, unique=True, verbose_name="Code")
     name = models.CharField(max_length=255, verbose_name="Name")
     features = models.TextField(verbose_name="Features")
-    price = models.JSONField(verbose_name="Price in multiple currencies")
+    price = models.JSONField(validators=[validate_price], verbose_name="Price in multiple currencies")
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="products", verbose_name="Company")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Updated at")
 
     def __str__(self):
         """String representation of the product"""
@@ -21,3 +33,7 @@ class Product(models.Model):
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ["name"]
+        indexes = [
+            models.Index(price_in(currency), name=f"product_price_{currency.lower()}_idx")
+            for currency in INDEXED_CURRENCIES
+        ]
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from .models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Product serializer"""
 
     class Meta:
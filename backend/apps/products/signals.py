@@ -0,0 +1,24 @@
+"""
+Signals of the products app
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.products.models import Product
+from core.response_cache import ResponseCache
+
+# Sent after a catalog import wrote products with bulk upserts, which skip post_save.
+products_imported = Signal()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_responses(sender, instance: Product, **kwargs) -> None:
+    """Drop the cached product lists and the cached detail of the changed product"""
+    ResponseCache.for_model(Product).invalidate(instance.pk)
+
+
+@receiver(products_imported)
+def invalidate_imported_product_responses(sender, **kwargs) -> None:
+    """An import may touch any number of products, so every cached product response is dropped"""
+    ResponseCache.for_model(Product).invalidate()
@@ -2,6 +2,8 @@
 Tests for products
 """
 import pytest
+from io import BytesIO
+from openpyxl import load_workbook
 from apps.products.models import Product
 from apps.companies.models import Company
 from apps.users.models import User
@@ -97,3 +99,153 @@ class TestProductAPI:
 
         response: Response = self.admin_client.post(self.product_list_url, self.product_data, format="json")
         assert response.status_code == status.HTTP_201_CREATED
+
+    def test_export_products_xlsx(self, product) -> None:
+        """Test that products can be exported as XLSX."""
+        response = self.external_client.get(reverse("product-export"), {"type": "xlsx"})
+        assert response.status_code == status.HTTP_200_OK
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        rows = list(sheet.values)
+        assert rows[0] == ("ID", "Code", "Name", "Features", "Price", "Company ID")
+        assert rows[1][1] == product.code
+        assert rows[1][4] == '{"USD": 10.99, "EUR": 9.99}'
+
+    def test_filter_products_by_company(self, product, product_factory) -> None:
+        """Test that products can be filtered by company."""
+        product_factory(code="P900")
+
+        response: Response = self.external_client.get(self.product_list_url, {"company": self.company.id})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.data] == [product.id]
+
+    def test_import_products_upserts_by_code(self, product, django_assert_max_num_queries, settings) -> None:
+        """Test that a CSV catalog inserts new codes, updates existing ones and reports bad rows."""
+        settings.API_CACHE_TIMEOUT = 300
+        url: str = reverse("product-import")
+        detail_url: str = reverse("product-detail", kwargs={"pk": product.id})
+        assert self.external_client.get(detail_url).data["name"] == product.name  # now cached
+        catalog = "\n".join(
+            [
+                "Code,Name,Features,Price,Company ID",
+                f'P001,Renamed Product,Feature,"{{""USD"": 12.5}}",{self.company.id}',
+                f'P100,Imported Product,Feature,"{{""USD"": 1}}",{self.company.id}',
+                'P101,Bad Company,Feature,"{""USD"": 1}",999999',
+                f"P102,Bad Price,Feature,cheap,{self.company.id}",
+            ]
+        )
+
+        with django_assert_max_num_queries(8):
+            response: Response = self.admin_client.post(url, catalog, content_type="text/csv")
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data["inserted"], response.data["updated"], response.data["rejected"]) == (1, 1, 2)
+        assert [error["row"] for error in response.data["errors"]] == [4, 3]
+
+        product.refresh_from_db()
+        assert (product.name, product.price) == ("Renamed Product", {"USD": 12.5})
+        assert Product.objects.get(code="P100").company_id == self.company.id
+        # The bulk upsert skips post_save; the import signal drops the cached responses
+        assert self.external_client.get(detail_url).data["name"] == "Renamed Product"
+
+        forbidden: Response = self.external_client.post(url, catalog, content_type="text/csv")
+        assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_import_products_command(self, tmp_path) -> None:
+        """Test that the command upserts an NDJSON catalog in batches."""
+        from django.core.management import call_command
+        from io import StringIO
+        import json
+
+        path = tmp_path / "catalog.ndjson"
+        rows = [
+            {
+                "code": f"C{n:03d}",
+                "name": f"Product {n}",
+                "features": "-",
+                "price": {"USD": n},
+                "company": self.company.id,
+            }
+            for n in range(25)
+        ]
+        path.write_text("\n".join(json.dumps(row) for row in rows + rows[:5]) + "\nnot json\n")
+
+        output = StringIO()
+        call_command("import_products", str(path), "--batch-size", "10", stdout=output, stderr=StringIO())
+        assert "25 inserted, 5 updated, 1 rejected" in output.getvalue()
+        assert Product.objects.filter(company=self.company).count() == 25
+
+    def test_filter_and_order_products_by_price(self, product_factory) -> None:
+        """Test that products can be filtered by a price range and ordered by price in one currency."""
+        cheap = product_factory(company=self.company, code="P010", price={"USD": 5, "COP": 20000})
+        mid = product_factory(company=self.company, code="P011", price={"USD": 15.5})
+        product_factory(company=self.company, code="P012", price={"COP": 90000})
+        expensive = product_factory(company=self.company, code="P013", price={"USD": 40})
+
+        def codes(params: Dict[str, Any]) -> list:
+            response: Response = self.external_client.get(self.product_list_url, params)
+            assert response.status_code == status.HTTP_200_OK
+            return [item["code"] for item in response.data]
+
+        assert codes({"price_currency": "usd", "price_min": 10, "ordering": "price_usd"}) == [mid.code, expensive.code]
+        assert codes({"price_currency": "USD", "price_max": 15.5, "ordering": "-price_usd"}) == [mid.code, cheap.code]
+        assert codes({"ordering": "price_usd"}) == ["P010", "P011", "P013", "P012"]
+        assert codes({"price_currency": "COP", "ordering": "code"}) == ["P010", "P012"]
+
+        missing_currency: Response = self.external_client.get(self.product_list_url, {"price_min": 1})
+        assert missing_currency.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_price_shape_is_validated(self) -> None:
+        """Test that a price must map currency codes to non-negative numbers."""
+        for price in ({}, {"usd": 1}, {"USD": "10"}, {"USD": -1}, ["USD", 1]):
+            response: Response = self.admin_client.post(
+                self.product_list_url, {**self.product_data, "price": price}, format="json"
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, price
+            assert "price" in response.data
+
+    def test_sparse_fieldsets(self, product, django_assert_num_queries) -> None:
+        """Test that ?fields= and ?omit= trim the response and the columns read."""
+        from django.test.utils import CaptureQueriesContext
+        from django.db import connection
+
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.external_client.get(self.product_list_url, {"fields": "id,name"})
+        assert response.data == [{"id": product.id, "name": product.name}]
+        assert '"features"' not in queries.captured_queries[-1]["sql"]
+
+        omitted: Response = self.external_client.get(self.product_list_url, {"omit": "features,price"})
+        assert set(omitted.data[0]) == {"id", "code", "name", "company"}
+        detail_url: str = reverse("product-detail", kwargs={"pk": product.id})
+        assert self.external_client.get(detail_url, {"fields": "code"}).data == {"code": product.code}
+
+        unknown: Response = self.external_client.get(self.product_list_url, {"fields": "id,secret"})
+        assert unknown.status_code == status.HTTP_400_BAD_REQUEST
+        assert "fields" in unknown.data
+
+    def test_fast_list_matches_serializer_bytes(self, product_factory, settings) -> None:
+        """Test that the values() list path renders products exactly like the serializer."""
+        settings.API_CACHE_TIMEOUT = 0
+        product_factory(company=self.company, code="A-1", name="Taladro", price={"USD": 12.5, "COP": 50000})
+        product_factory(company=self.company, code="A-2", name="Sierra", price={"EUR": 0.1})
+
+        for params in ({}, {"omit": "features"}, {"price_currency": "USD", "ordering": "-price_usd"}):
+            settings.API_FAST_LISTS = True
+            fast: Response = self.external_client.get(self.product_list_url, params)
+            settings.API_FAST_LISTS = False
+            regular: Response = self.external_client.get(self.product_list_url, params)
+            assert fast.status_code == status.HTTP_200_OK
+            assert fast.content == regular.content, params
+
+    def test_search_products(self, product_factory) -> None:
+        """Test that ?search= matches code, name and features by word prefix, best match first."""
+        drill = product_factory(company=self.company, code="DR-100", name="Cordless drill", features="18V battery")
+        product_factory(company=self.company, code="SW-200", name="Screwdriver set", features="Fits the drill bits")
+        product_factory(company=self.company, code="HM-300", name="Hammer", features="Steel")
+
+        response: Response = self.external_client.get(self.product_list_url, {"search": "drill"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["code"] for item in response.data][0] == drill.code
+        assert len(response.data) == 2
+
+        by_code: Response = self.external_client.get(self.product_list_url, {"search": "HM"})
+        assert [item["code"] for item in by_code.data] == ["HM-300"]
+        assert self.external_client.get(self.product_list_url, {"search": "batt"}).data[0]["code"] == drill.code
@@ -0,0 +1,28 @@
+"""
+Validators for products
+"""
+import math
+import re
+
+from django.core.exceptions import ValidationError
+
+CURRENCY_CODE = re.compile(r"^[A-Z]{3}$")
+
+
+def validate_price(value) -> None:
+    """
+    A price is a non-empty object of ISO 4217 currency codes to non-negative
+    numbers, e.g. {"USD": 10.5, "COP": 42000}. The price indexes and filters
+    read the amounts as numbers, so nothing else is stored.
+    """
+    if not isinstance(value, dict) or not value:
+        raise ValidationError('Enter a price object such as {"USD": 10.5}.', code="invalid_price")
+    for currency, amount in value.items():
+        if not CURRENCY_CODE.match(currency):
+            raise ValidationError(
+                f"'{currency}' is not a currency code (three capital letters).", code="invalid_currency"
+            )
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount):
+            raise ValidationError(f"The {currency} price must be a number.", code="invalid_amount")
+        if amount < 0:
+            raise ValidationError(f"The {currency} price cannot be negative.", code="negative_amount")
@@ -1,21 +1,95 @@
 """
 Views for products
 """
-from rest_framework import viewsets
+import os
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from apps.products.filters import ProductFilter
+from apps.products.importer import IMPORT_FORMATS, import_products
 from apps.products.models import Product
 from apps.products.serializers import ProductSerializer
+from core.conditional import ConditionalGetMixin
+from core.response_cache import CachedResponseMixin
+from core.exports import ExportMixin
+from core.fastlist import FastListMixin
+from core.fieldsets import SparseFieldsetsMixin
 from core.permissions import IsAdminOrReadOnly
 
 # Create your views here.
 
+# Formats of a raw (non multipart) import body
+IMPORT_CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/json": "json"}
+
+
+class RawBodyParser(MultiPartParser):
+    """Leaves non multipart bodies unread so the import can stream them from the request"""
+
+    media_type = "*/*"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if media_type and media_type.startswith("multipart/form-data"):
+            return super().parse(stream, media_type, parser_context)
+        return {}
 
-class ProductViewSet(viewsets.ModelViewSet):
+
+class ProductViewSet(
+    CachedResponseMixin, ConditionalGetMixin, SparseFieldsetsMixin, FastListMixin, ExportMixin, viewsets.ModelViewSet
+):
     """
     Viewset para productos.
     - Administradores pueden crear, leer, actualizar y eliminar productos.
     - Usuarios externos solo pueden ver los productos.
+    - Ambos roles pueden exportar los productos en CSV o XLSX.
+    - Listado y detalle responden 304 cuando el cliente ya tiene la versión actual.
+    - Listado y detalle se sirven desde la caché hasta que cambia una fila.
+    - ?fields= y ?omit= limitan los campos devueltos (y las columnas leídas).
     """
 
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAdminOrReadOnly]
+    filterset_class = ProductFilter
+    export_filename = "products"
+    export_fields = [
+        ("ID", "id"),
+        ("Code", "code"),
+        ("Name", "name"),
+        ("Features", "features"),
+        ("Price", "price"),
+        ("Company ID", "company_id"),
+    ]
+
+    @action(detail=False, methods=["post"], url_path="import", url_name="import", parser_classes=[RawBodyParser])
+    def import_catalog(self, request):
+        """
+        Insert or update products by code from CSV, NDJSON or a JSON array (admin only).
+
+        Send the file as the body (Content-Type text/csv, application/x-ndjson
+        or application/json) or as the "file" field of a multipart form, with
+        ?type=csv|ndjson|json when the extension does not tell. Answers with
+        the number of inserted, updated and rejected rows.
+        """
+        import_format = request.query_params.get("type")
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"error": 'Send the catalog in the "file" field.'}, status=status.HTTP_400_BAD_REQUEST)
+            import_format = import_format or os.path.splitext(upload.name)[1].lstrip(".").lower()
+            stream = upload
+        else:
+            import_format = import_format or IMPORT_CONTENT_TYPES.get(request.content_type.split(";")[0].strip())
+            stream = request.stream
+
+        if import_format not in IMPORT_FORMATS or stream is None:
+            return Response(
+                {"error": f"Unsupported import type '{import_format}'. Use one of: {', '.join(IMPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            summary = import_products(stream, import_format)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": f"Could not read the catalog: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary.as_dict(), status=status.HTTP_200_OK)
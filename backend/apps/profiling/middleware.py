@@ -0,0 +1,150 @@
+"""
+On-demand request profiling.
+
+An admin asks for a token (POST /api/profiles/token/) and sends it with the
+request to profile, in the ``X-Profile`` header. It is never read from the
+query string, which ends up in access logs and Referer headers.
+RequestProfilingMiddleware then runs that single request under
+pyinstrument (when installed and PROFILING_BACKEND is "pyinstrument") or
+cProfile, and stores the call tree with the request metadata as a
+RequestProfile; the response carries its id in ``X-Profile-Id``. Only the
+newest PROFILING_MAX_REPORTS profiles are kept.
+
+The token is signed with SECRET_KEY and expires after PROFILING_TOKEN_MAX_AGE
+seconds, so checking it costs nothing on regular requests. The body of
+streamed responses (CSV exports) is produced after the profiler stops.
+"""
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import time
+from contextlib import ExitStack
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+from apps.profiling.models import RequestProfile
+from apps.users.models import RoleChoices, User
+
+try:
+    import pyinstrument
+except ImportError:  # optional dependency
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+# Functions listed in the text report of cProfile
+CPROFILE_REPORT_LINES = 80
+
+_signer = signing.TimestampSigner(salt="apps.profiling")
+
+
+class Report(NamedTuple):
+    profiler: str
+    text: str
+    data: bytes
+    extension: str
+    content_type: str
+
+
+def make_token(user) -> str:
+    """Token that profiles the requests it is sent with, for PROFILING_TOKEN_MAX_AGE seconds"""
+    return _signer.sign(str(user.pk))
+
+
+def profiling_user_id(request) -> int | None:
+    """Id of the admin who asked to profile the request, or None for regular requests"""
+    token = request.headers.get(PROFILE_HEADER)
+    if not token:
+        return None
+    try:
+        user_id = int(_signer.unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE))
+    except (signing.BadSignature, ValueError):
+        logger.warning("Ignoring an invalid or expired profiling token for %s", request.path)
+        return None
+    if not User.objects.filter(pk=user_id, role=RoleChoices.ADMIN, is_active=True).exists():
+        return None
+    return user_id
+
+
+def _profile(get_response, request):
+    if pyinstrument is not None and settings.PROFILING_BACKEND == "pyinstrument":
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.stop()
+        text = profiler.output_text(unicode=True, color=False)
+        return response, Report("pyinstrument", text, profiler.output_html().encode(), "html", "text/html")
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(CPROFILE_REPORT_LINES)
+    # Same format as Profile.dump_stats(), readable by pstats and snakeviz
+    profiler.create_stats()
+    return response, Report(
+        "cprofile", stream.getvalue(), marshal.dumps(profiler.stats), "prof", "application/octet-stream"
+    )
+
+
+def enforce_retention() -> None:
+    """Delete the profiles beyond the newest PROFILING_MAX_REPORTS"""
+    stale = list(RequestProfile.objects.values_list("pk", flat=True)[settings.PROFILING_MAX_REPORTS :])
+    if stale:
+        RequestProfile.objects.filter(pk__in=stale).delete()
+
+
+class RequestProfilingMiddleware:
+    """Profiles the requests carrying a valid profiling token; turned off with PROFILING_ENABLED=False"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = profiling_user_id(request) if settings.PROFILING_ENABLED else None
+        if user_id is None:
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            started = time.perf_counter()
+            response, report = _profile(self.get_response, request)
+            duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path(),
+            view_name=match.view_name if match else "",
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            db_queries=queries,
+            profiler=report.profiler,
+            report=report.text,
+            report_file=report.data,
+            report_filename=f"profile-{time.strftime('%Y%m%d-%H%M%S')}.{report.extension}",
+            report_content_type=report.content_type,
+            created_by_id=user_id,
+        )
+        enforce_retention()
+        response["X-Profile-Id"] = str(profile.pk)
+        return response
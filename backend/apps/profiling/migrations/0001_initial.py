@@ -0,0 +1,50 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("method", models.CharField(max_length=10, verbose_name="Method")),
+                ("path", models.TextField(verbose_name="Path")),
+                ("view_name", models.CharField(blank=True, max_length=200, verbose_name="View name")),
+                ("status_code", models.PositiveSmallIntegerField(verbose_name="Status code")),
+                ("duration_ms", models.FloatField(verbose_name="Duration (ms)")),
+                ("db_queries", models.PositiveIntegerField(default=0, verbose_name="Database queries")),
+                ("profiler", models.CharField(max_length=20, verbose_name="Profiler")),
+                ("report", models.TextField(verbose_name="Report")),
+                ("report_file", models.BinaryField(verbose_name="Report file")),
+                ("report_filename", models.CharField(max_length=255, verbose_name="Report filename")),
+                ("report_content_type", models.CharField(max_length=100, verbose_name="Report content type")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Created at")),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="request_profiles",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Request profile",
+                "verbose_name_plural": "Request profiles",
+                "ordering": ["-created_at", "-id"],
+            },
+        ),
+    ]
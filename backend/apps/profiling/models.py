@@ -0,0 +1,41 @@
+"""
+Models for request profiling
+"""
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """Profiler report of one request run with a profiling token (apps.profiling.middleware)"""
+
+    method = models.CharField(max_length=10, verbose_name="Method")
+    path = models.TextField(verbose_name="Path")
+    view_name = models.CharField(max_length=200, blank=True, verbose_name="View name")
+    status_code = models.PositiveSmallIntegerField(verbose_name="Status code")
+    duration_ms = models.FloatField(verbose_name="Duration (ms)")
+    db_queries = models.PositiveIntegerField(default=0, verbose_name="Database queries")
+    profiler = models.CharField(max_length=20, verbose_name="Profiler")
+    report = models.TextField(verbose_name="Report")
+    report_file = models.BinaryField(verbose_name="Report file")
+    report_filename = models.CharField(max_length=255, verbose_name="Report filename")
+    report_content_type = models.CharField(max_length=100, verbose_name="Report content type")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="request_profiles",
+        verbose_name="Created by",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+
+    def __str__(self):
+        """String representation of the profile"""
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = "Request profile"
+        verbose_name_plural = "Request profiles"
+        ordering = ["-created_at", "-id"]
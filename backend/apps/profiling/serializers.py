@@ -0,0 +1,42 @@
+from rest_framework import serializers
+from django.urls import reverse
+from .models import RequestProfile
+
+
+class RequestProfileSerializer(serializers.ModelSerializer):
+    """Request profile metadata serializer"""
+
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        """Meta class"""
+
+        model = RequestProfile
+        fields = [
+            "id",
+            "method",
+            "path",
+            "view_name",
+            "status_code",
+            "duration_ms",
+            "db_queries",
+            "profiler",
+            "download_url",
+            "created_by",
+            "created_at",
+        ]
+
+    def get_download_url(self, profile: RequestProfile) -> str:
+        """Download link of the profiler output"""
+        url = reverse("profile-download", kwargs={"pk": profile.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class RequestProfileDetailSerializer(RequestProfileSerializer):
+    """Request profile with the text call tree"""
+
+    class Meta(RequestProfileSerializer.Meta):
+        """Meta class"""
+
+        fields = RequestProfileSerializer.Meta.fields + ["report"]
@@ -0,0 +1,79 @@
+"""
+Tests for request profiling
+"""
+import marshal
+
+import pytest
+from apps.profiling.middleware import make_token
+from apps.profiling.models import RequestProfile
+from apps.users.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestRequestProfiling:
+    @pytest.fixture(autouse=True)
+    def setup(self, admin_user: User, external_user: User, settings) -> None:
+        """Initial setup for all tests"""
+        settings.PROFILING_BACKEND = "cprofile"
+        self.admin_client: APIClient = APIClient()
+        self.external_client: APIClient = APIClient()
+        self.admin_client.force_authenticate(user=admin_user)
+        self.external_client.force_authenticate(user=external_user)
+        self.admin_user = admin_user
+        self.external_user = external_user
+
+    def test_profile_request(self) -> None:
+        """Test that a request sent with an admin token is profiled and stored."""
+        response: Response = self.admin_client.post(reverse("profile-token"))
+        assert response.status_code == status.HTTP_201_CREATED
+        token: str = response.data["token"]
+
+        response = self.external_client.get(reverse("company-list"), {"page_size": 5}, HTTP_X_PROFILE=token)
+        assert response.status_code == status.HTTP_200_OK
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        assert profile.path == "/api/companies/?page_size=5"
+        assert profile.view_name == "company-list"
+        assert profile.status_code == 200
+        assert profile.created_by == self.admin_user
+        assert profile.profiler == "cprofile"
+        assert "cumulative" in profile.report
+
+        response = self.admin_client.get(reverse("profile-list"))
+        assert [item["id"] for item in response.data] == [profile.pk]
+        assert "report" not in response.data[0]
+        assert "report" in self.admin_client.get(reverse("profile-detail", kwargs={"pk": profile.pk})).data
+
+        download: Response = self.admin_client.get(reverse("profile-download", kwargs={"pk": profile.pk}))
+        assert download.status_code == status.HTTP_200_OK
+        assert isinstance(marshal.loads(download.content), dict)
+
+    def test_retention(self, settings) -> None:
+        """Test that only the newest profiles are kept."""
+        settings.PROFILING_MAX_REPORTS = 2
+        token = make_token(self.admin_user)
+        ids = [self.admin_client.get(reverse("company-list"), HTTP_X_PROFILE=token)["X-Profile-Id"] for _ in range(3)]
+        assert sorted(RequestProfile.objects.values_list("pk", flat=True)) == sorted(map(int, ids[1:]))
+
+    def test_invalid_tokens_are_ignored(self) -> None:
+        """Test that forged tokens and tokens of non admins do not profile the request."""
+        for token in ("forged", make_token(self.external_user)):
+            response: Response = self.admin_client.get(reverse("company-list"), HTTP_X_PROFILE=token)
+            assert response.status_code == status.HTTP_200_OK
+            assert "X-Profile-Id" not in response
+        assert not RequestProfile.objects.exists()
+
+    def test_query_string_token_is_ignored(self) -> None:
+        """Test that the token is only accepted in the X-Profile header, not in the URL."""
+        response: Response = self.admin_client.get(reverse("company-list"), {"profile": make_token(self.admin_user)})
+        assert response.status_code == status.HTTP_200_OK
+        assert "X-Profile-Id" not in response
+        assert not RequestProfile.objects.exists()
+
+    def test_profiles_admin_only(self) -> None:
+        """Test that external users can neither get tokens nor see profiles."""
+        assert self.external_client.post(reverse("profile-token")).status_code == status.HTTP_403_FORBIDDEN
+        assert self.external_client.get(reverse("profile-list")).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,56 @@
+"""
+Views for request profiling
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from apps.profiling.middleware import PROFILE_HEADER, make_token
+from apps.profiling.models import RequestProfile
+from apps.profiling.serializers import RequestProfileDetailSerializer, RequestProfileSerializer
+from core.permissions import IsAdminUser
+
+
+class RequestProfileViewSet(mixins.DestroyModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Viewset for stored request profiles (admin only).
+    - POST token/ returns a token that profiles the requests sent with it.
+    - Details include the text call tree; download/ returns the profiler output file.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        if self.action == "list":
+            return RequestProfile.objects.defer("report", "report_file")
+        return RequestProfile.objects.all()
+
+    def get_serializer_class(self):
+        if self.action == "retrieve":
+            return RequestProfileDetailSerializer
+        return RequestProfileSerializer
+
+    @action(detail=False, methods=["post"])
+    def token(self, request):
+        """
+        Token to send in the X-Profile header of the request to profile.
+        """
+        return Response(
+            {
+                "token": make_token(request.user),
+                "header": PROFILE_HEADER,
+                "expires_in": settings.PROFILING_TOKEN_MAX_AGE,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """
+        Download the profiler output: cProfile stats (.prof) or pyinstrument HTML.
+        """
+        profile = self.get_object()
+        response = HttpResponse(bytes(profile.report_file), content_type=profile.report_content_type)
+        response["Content-Disposition"] = f'attachment; filename="{profile.report_filename}"'
+        return response
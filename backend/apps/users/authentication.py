@@ -0,0 +1,74 @@
+"""
+Stateless JWT authentication.
+
+Access tokens carry the user's role (see CustomTokenObtainPairSerializer), so
+``request.user`` is built from the claims without a ``users_user`` query.
+Every token is minted after reading the user row, at login or on refresh, so
+it is enough to reject tokens issued before a user was deactivated, deleted or
+changed role: the revocation timestamps live in the default Django cache for
+one access token lifetime, after which those tokens have expired anyway.
+
+That only holds when every process reads the same cache, so the claims are
+trusted only with JWT_STATELESS_AUTH, which defaults to off on per-process
+caches (and the users.E001 check refuses the combination). Otherwise the
+user row is loaded on every request, as simplejwt does.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Claims copied from the user into every token
+ROLE_CLAIM = "role"
+USERNAME_CLAIM = "username"
+
+
+def _revocation_key(user_id) -> str:
+    return f"auth:revoked:{user_id}"
+
+
+def revoke_user_tokens(user_id) -> None:
+    """Reject the access tokens of a user issued until now"""
+    if settings.JWT_REVOCATION_CACHE:
+        timeout = int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        cache.set(_revocation_key(user_id), int(time.time()), timeout=timeout)
+
+
+def is_revoked(token) -> bool:
+    if not settings.JWT_REVOCATION_CACHE:
+        return False
+    revoked_at = cache.get(_revocation_key(token[jwt_settings.USER_ID_CLAIM]))
+    # iat has one second resolution: a token from the second of the revocation is rejected too
+    return revoked_at is not None and token.get("iat", 0) <= revoked_at
+
+
+class ClaimsUser(TokenUser):
+    """User built from the access token claims; enough for the role based permissions"""
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM)
+
+    @cached_property
+    def username(self):
+        return self.token.get(USERNAME_CLAIM, "")
+
+
+class TokenClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWTAuthentication without the per-request user lookup when JWT_STATELESS_AUTH is on.
+    Tokens issued before the role claim existed still load the user row.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_STATELESS_AUTH or ROLE_CLAIM not in validated_token:
+            return JWTAuthentication.get_user(self, validated_token)
+        user = super().get_user(validated_token)
+        if is_revoked(validated_token):
+            raise AuthenticationFailed("Token revoked: the user changed or was deactivated", code="token_revoked")
+        return user
@@ -0,0 +1,31 @@
+"""
+System checks for users
+"""
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+
+@register()
+def check_stateless_auth(app_configs, **kwargs):
+    """Stateless JWT authentication needs revocations every worker can see"""
+    if not settings.JWT_STATELESS_AUTH:
+        return []
+    if not settings.JWT_REVOCATION_CACHE:
+        return [
+            Warning(
+                "JWT_STATELESS_AUTH is on without JWT_REVOCATION_CACHE: deactivated users keep access "
+                "until their access token expires.",
+                hint="Set JWT_REVOCATION_CACHE=True or JWT_STATELESS_AUTH=False.",
+                id="users.W001",
+            )
+        ]
+    if settings.CACHES["default"]["BACKEND"] in settings.PROCESS_LOCAL_CACHE_BACKENDS:
+        return [
+            Error(
+                "JWT_STATELESS_AUTH needs a cache shared by every process: with a per-process cache, token "
+                "revocations made in one worker are not seen by the others.",
+                hint="Set CACHE_BACKEND/CACHE_LOCATION to a shared cache (e.g. Redis) or JWT_STATELESS_AUTH=False.",
+                id="users.E001",
+            )
+        ]
+    return []
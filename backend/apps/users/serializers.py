@@ -1,9 +1,13 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from .models import User, RoleChoices
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from apps.users.authentication import ROLE_CLAIM, USERNAME_CLAIM
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "role", "password"]
@@ -18,13 +22,59 @@ class UserSerializer(serializers.ModelSerializer):
         )
         return user
 
+
 class UserTokenSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "role"]
 
+
+def add_user_claims(token, user):
+    """Claims read by apps.users.authentication.ClaimsUser"""
+    token[ROLE_CLAIM] = user.role
+    token[USERNAME_CLAIM] = user.username
+    return token
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
         data["user"] =  UserTokenSerializer(self.user).data
         return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes from the current user row: inactive or deleted users get no new
+    access token, and a changed role is stamped on the new one.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(**{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]}).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        access = add_user_claims(refresh.access_token, user)
+        # The access token copies the refresh token's iat, which may predate a revocation
+        access.set_iat()
+        data = {"access": str(access)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # token_blacklist app not installed
+                    pass
+            add_user_claims(refresh, user)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
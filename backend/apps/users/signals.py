@@ -0,0 +1,35 @@
+"""
+Signals for users
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.users.authentication import revoke_user_tokens
+from apps.users.models import User
+
+# Columns copied into the access token claims, or deciding whether it is honoured
+TOKEN_FIELDS = ("role", "username", "is_active")
+
+
+@receiver(pre_save, sender=User)
+def remember_token_fields(sender, instance: User, update_fields=None, **kwargs) -> None:
+    """Keep the stored values of TOKEN_FIELDS to compare them after the save"""
+    instance._token_fields = None
+    if instance.pk is None or (update_fields is not None and not set(TOKEN_FIELDS) & set(update_fields)):
+        return
+    instance._token_fields = User.objects.filter(pk=instance.pk).values(*TOKEN_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_stale_tokens(sender, instance: User, created: bool, **kwargs) -> None:
+    """Tokens carrying an outdated role or belonging to a deactivated user stop being accepted"""
+    stored = getattr(instance, "_token_fields", None)
+    if created or stored is None:
+        return
+    if any(stored[name] != getattr(instance, name) for name in TOKEN_FIELDS):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance: User, **kwargs) -> None:
+    revoke_user_tokens(instance.pk)
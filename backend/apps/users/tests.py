@@ -5,6 +5,9 @@ from apps.users.models import User, RoleChoices
 from rest_framework.response import Response
 from rest_framework.test import APIClient
 from typing import Dict, Any
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
 
 
 @pytest.mark.django_db
@@ -48,6 +51,69 @@ class TestAuthenticationAPI:
         response: Response = self.api_client.post(self.token_url, data, format="json")
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    def login(self) -> Dict[str, str]:
+        data: Dict[str, str] = {"email": self.email, "password": self.password}
+        response: Response = self.api_client.post(self.token_url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_access_token_authenticates_without_user_query(self, settings) -> None:
+        """Test that requests authenticated with the access token do not read the user table."""
+        settings.JWT_STATELESS_AUTH = True
+        tokens = self.login()
+        assert AccessToken(tokens["access"])["role"] == RoleChoices.ADMIN
+
+        self.api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.api_client.get(reverse("company-list"))
+        assert response.status_code == status.HTTP_200_OK
+        assert not [query for query in queries.captured_queries if "users_user" in query["sql"]]
+
+    @pytest.mark.parametrize("stateless", [True, False])
+    def test_deactivated_user_tokens_are_rejected(self, settings, stateless: bool) -> None:
+        """Test that deactivating a user rejects its access tokens and refreshes, with and without stateless auth."""
+        settings.JWT_STATELESS_AUTH = stateless
+        tokens = self.login()
+        self.api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        assert self.api_client.get(reverse("company-list")).status_code == status.HTTP_200_OK
+
+        # update() skips the revocation signals: only the per-request lookup notices it
+        User.objects.filter(pk=self.test_user.pk).update(is_active=False)
+        expected = status.HTTP_200_OK if stateless else status.HTTP_401_UNAUTHORIZED
+        assert self.api_client.get(reverse("company-list")).status_code == expected
+        User.objects.filter(pk=self.test_user.pk).update(is_active=True)
+
+        self.test_user.is_active = False
+        self.test_user.save()
+
+        assert self.api_client.get(reverse("company-list")).status_code == status.HTTP_401_UNAUTHORIZED
+        self.api_client.credentials()
+        response: Response = self.api_client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_stateless_auth_needs_a_shared_cache(self, settings) -> None:
+        """Test the system check refusing stateless auth with revocations in a per-process cache."""
+        from apps.users.checks import check_stateless_auth
+
+        settings.JWT_STATELESS_AUTH = False
+        assert check_stateless_auth(None) == []
+        settings.JWT_STATELESS_AUTH = True
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        assert [message.id for message in check_stateless_auth(None)] == ["users.E001"]
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        assert check_stateless_auth(None) == []
+        settings.JWT_REVOCATION_CACHE = False
+        assert [message.id for message in check_stateless_auth(None)] == ["users.W001"]
+
+    def test_refresh_stamps_current_role(self) -> None:
+        """Test that a refreshed access token carries the role stored when refreshing."""
+        tokens = self.login()
+        User.objects.filter(pk=self.test_user.pk).update(role=RoleChoices.EXTERNAL)
+
+        response: Response = self.api_client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]})
+        assert response.status_code == status.HTTP_200_OK
+        assert AccessToken(response.data["access"])["role"] == RoleChoices.EXTERNAL
+
 
 @pytest.mark.django_db
 class TestUserAPI:
@@ -82,6 +148,13 @@ class TestUserAPI:
         response: Response = self.admin_client.get(self.user_list_url)
         assert response.status_code == status.HTTP_200_OK
 
+    def test_list_users_fields(self) -> None:
+        """Test that ?fields= trims the user list."""
+
+        response: Response = self.admin_client.get(self.user_list_url, {"fields": "id,username"})
+        assert response.status_code == status.HTTP_200_OK
+        assert all(set(user) == {"id", "username"} for user in response.data)
+
     def test_create_user(self) -> None:
         """Test that a user can be created."""
 
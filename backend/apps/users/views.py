@@ -1,20 +1,26 @@
 """
 Views for users
 """
+import logging
+
 from rest_framework import viewsets
 from apps.users.models import User
 from apps.users.serializers import UserSerializer
+from core.fieldsets import SparseFieldsetsMixin
 from core.permissions import IsAdminUser, IsOwnerOrAdmin
-from rest_framework_simplejwt.views import TokenObtainPairView
-from apps.users.serializers import CustomTokenObtainPairSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from apps.users.serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
+
+logger = logging.getLogger(__name__)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetsMixin, viewsets.ModelViewSet):
     """
     Viewset for users.
     - Only admins can create new users and view the complete list.
     - Users can only view and edit their own profile.
     - Admins can edit any profile.
+    - ?fields= and ?omit= trim the returned fields (and the columns read).
     """
 
     queryset = User.objects.all()
@@ -27,7 +33,7 @@ class UserViewSet(viewsets.ModelViewSet):
         - retrieve, update, partial_update, destroy: Owner or admin (IsOwnerOrAdmin)
         """
         if self.action in ["list", "create"]:
-            print("list or create")
+            logger.debug("User %s restricted to admins", self.action)
             permission_classes = [IsAdminUser]
         else:
             permission_classes = [IsOwnerOrAdmin]
@@ -35,3 +41,7 @@ class UserViewSet(viewsets.ModelViewSet):
     
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+
+
+class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
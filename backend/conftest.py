@@ -26,6 +26,25 @@ def django_db_setup():
     }
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Empties the Django cache before each test.
+    The database is rolled back between tests but cached responses are not.
+    """
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def job_result_dir(settings, tmp_path):
+    """
+    Writes the result files of the jobs run by a test to its temporary directory.
+    """
+    settings.JOBS_RESULT_DIR = str(tmp_path / "job_results")
+
+
 @pytest.fixture
 def api_client():
     """
@@ -0,0 +1,23 @@
+"""
+System checks for the shared API building blocks in core
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_response_cache(app_configs, **kwargs):
+    """Cached responses are only invalidated in the processes sharing the cache"""
+    backend = settings.CACHES.get(settings.API_CACHE_ALIAS, {}).get("BACKEND")
+    if settings.API_CACHE_TIMEOUT and backend in settings.PROCESS_LOCAL_CACHE_BACKENDS:
+        return [
+            Warning(
+                f"The response cache is on with the per-process cache backend {backend}: writes made in one "
+                "process (another web worker, the job worker, import_products) do not invalidate the responses "
+                "cached by the others, which stay stale for up to API_CACHE_TIMEOUT seconds.",
+                hint="Set CACHE_BACKEND/CACHE_LOCATION to a shared cache (e.g. Redis or Memcached), "
+                "or API_CACHE_TIMEOUT=0 when running more than one process.",
+                id="core.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,89 @@
+"""
+Conditional GET for the list and detail endpoints.
+
+Validators come from one aggregate query over the ``updated_at`` column
+(``MAX(updated_at)`` plus ``COUNT(*)`` for lists, the row's own value for
+details), so a client that already has the current representation gets a
+``304 Not Modified`` before anything is serialized.
+"""
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# (ETag, Last-Modified) of a representation
+Validators = tuple[str, datetime | None]
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag: equal data, not necessarily byte-identical responses"""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return "W/" + quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified to ``list`` and ``retrieve`` and answers
+    ``If-None-Match`` / ``If-Modified-Since`` with 304.
+
+    ``validator_fields`` are the timestamp lookups a representation depends on;
+    a viewset that embeds related rows can add theirs with ``get_validator_fields``.
+    Deleting a row does not move ``MAX(updated_at)``, so lists are only
+    validated by their ETag (which includes the count); ``If-Modified-Since``
+    is honoured on details only.
+    """
+
+    validator_fields: tuple[str, ...] = ("updated_at",)
+
+    def get_validator_fields(self) -> tuple[str, ...]:
+        return self.validator_fields
+
+    def get_list_validators(self) -> Validators:
+        fields = self.get_validator_fields()
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        aggregates = {f"max_{index}": Max(field) for index, field in enumerate(fields)}
+        values = queryset.aggregate(count=Count("pk"), **aggregates)
+        stamps = [values[name] for name in aggregates]
+        return make_etag(queryset.model._meta.label, fields, values["count"], stamps), _latest(stamps)
+
+    def get_detail_validators(self) -> Validators | None:
+        fields = self.get_validator_fields()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        stamps = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values_list(*fields).first()
+        if stamps is None:
+            # Let retrieve() answer with its usual 404
+            return None
+        return make_etag(queryset.model._meta.label, self.kwargs[lookup_url_kwarg], fields, stamps), _latest(stamps)
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators()
+        return self._conditional(request, etag, last_modified, None, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_detail_validators()
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = validators
+        return self._conditional(request, etag, last_modified, last_modified, super().retrieve, *args, **kwargs)
+
+    def _conditional(self, request, etag, last_modified, check_last_modified, view, *args, **kwargs):
+        timestamp = int(check_last_modified.timestamp()) if check_last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = view(request, *args, **kwargs)
+        elif not isinstance(response, HttpResponseNotModified):
+            # A failed precondition (412) on a GET
+            return response
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+
+def _latest(stamps) -> datetime | None:
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
@@ -0,0 +1,127 @@
+"""
+Expandable and sparse fieldsets for the model viewsets.
+
+``?fields=id,name`` keeps only the listed fields of each record and ``?omit=features``
+drops some. The same selection trims the SQL column list with ``.only()``, so
+dropdowns and lookups neither read nor send the columns they do not show.
+Both apply to ``list`` and ``retrieve``; writes always use every field.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from core.pagination import ordering_fields
+
+# Query parameters, also used as serializer context keys
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+class ExpandableFieldsMixin:
+    """
+    Adds read-only fields from related rows for the relations in ``context["expand"]``.
+    ``expandable_fields`` maps each relation to {field name: source}.
+    """
+
+    expandable_fields: dict[str, dict[str, str]] = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for relation in self.context.get("expand", ()):
+            for name, source in self.expandable_fields[relation].items():
+                fields[name] = serializers.CharField(source=source, read_only=True)
+        return fields
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Keeps the fields named in ``context["fields"]`` and drops those in ``context["omit"]``.
+    Unknown names are a validation error. Put it first among the bases so it
+    sees the fields added by the other mixins.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        keep, omit = self.context.get(FIELDS_PARAM), self.context.get(OMIT_PARAM) or []
+        for param, names in ((FIELDS_PARAM, keep or []), (OMIT_PARAM, omit)):
+            unknown = [name for name in names if name not in fields]
+            if unknown:
+                raise ValidationError({param: [f"Unknown field(s): {', '.join(unknown)}."]})
+        for name in list(fields):
+            if (keep and name not in keep) or name in omit:
+                del fields[name]
+        return fields
+
+
+def source_lookups(model, field) -> list[str] | None:
+    """
+    ORM lookups behind a serializer field: the relations it follows, then the
+    column it reads (``product.name`` -> ["product", "product__name"]).
+    None when the source is not a model column.
+    """
+    attrs = field.source_attrs
+    if field.source == "*" or not attrs:
+        return None
+    lookups = []
+    try:
+        related = model._meta.get_field(attrs[0])
+        if not getattr(related, "concrete", False):
+            return None
+        for depth, attr in enumerate(attrs[1:], start=1):
+            if related.related_model is None:
+                return None
+            related = related.related_model._meta.get_field(attr)
+            lookups.append("__".join(attrs[:depth]))
+    except FieldDoesNotExist:
+        return None
+    return lookups + ["__".join(attrs)]
+
+
+def _names(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsetsMixin:
+    """
+    Reads ``?fields=`` and ``?omit=`` for ``list`` and ``retrieve``, passes them to a
+    serializer using SparseFieldsetSerializerMixin and reads only the matching
+    columns. A field whose source is not a model column (or a column of a
+    select_related row) keeps the full column list.
+    """
+
+    sparse_actions = ("list", "retrieve")
+
+    def _sparse_requested(self) -> bool:
+        if self.request is None or self.action not in self.sparse_actions:
+            return False
+        params = self.request.query_params
+        return bool(_names(params.get(FIELDS_PARAM, "")) or _names(params.get(OMIT_PARAM, "")))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self._sparse_requested():
+            context[FIELDS_PARAM] = _names(self.request.query_params.get(FIELDS_PARAM, ""))
+            context[OMIT_PARAM] = _names(self.request.query_params.get(OMIT_PARAM, ""))
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._sparse_requested():
+            columns = self.get_sparse_columns(queryset.model)
+            if columns is not None:
+                queryset = queryset.only(*columns)
+        return queryset
+
+    def get_sparse_columns(self, model) -> list[str] | None:
+        """Lookups for ``.only()`` covering the selected fields, or None when they cannot be derived"""
+        columns = [model._meta.pk.name]
+        # Keyset pagination reads its ordering values from the last row of the page
+        columns += ordering_fields(self.paginator)
+        for field in self.get_serializer().fields.values():
+            if field.write_only:
+                continue
+            lookups = source_lookups(model, field)
+            if lookups is None:
+                return None
+            columns += lookups
+        return columns
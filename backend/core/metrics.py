@@ -0,0 +1,258 @@
+"""
+Per-request performance metrics.
+
+RequestMetricsMiddleware measures every request: database queries and time,
+the time spent in the view outside the database (serialization, mostly),
+rendering time, total time and response size. They go out in a
+``Server-Timing`` header and are added to per-route histograms that
+/api/metrics/ exposes in the Prometheus text format.
+
+Each process keeps its own registry. Under several workers (gunicorn), set
+METRICS_DIR to a directory shared by them: every process dumps its registry
+there (metrics-<pid>.json, at most every METRICS_FLUSH_INTERVAL seconds) and
+the endpoint adds up all the files, whichever worker answers the scrape.
+Files of stopped workers are kept so the counters never go down; empty the
+directory when the service starts.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "Requests by route, method and status"),
+    "http_request_duration_seconds": ("histogram", "Request latency"),
+    "http_request_phase_seconds": ("histogram", "Time spent per phase: db, app (view outside the db) and render"),
+    "http_request_db_queries_total": ("counter", "Database queries run by the requests"),
+    "http_response_size_bytes_total": ("counter", "Bytes of response content sent"),
+}
+
+
+class Registry:
+    """Counters and histograms of one process, keyed by metric name and label values"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        # Bucket counts (non cumulative, the last one is +Inf), then sum and count
+        self.histograms: dict[tuple, list[float]] = {}
+        self.dirty = False
+
+    def inc(self, name: str, labels: dict, amount: float = 1) -> None:
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self.dirty = True
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            values = self.histograms.setdefault(key, [0] * (len(DURATION_BUCKETS) + 3))
+            bucket = next((i for i, bound in enumerate(DURATION_BUCKETS) if value <= bound), len(DURATION_BUCKETS))
+            values[bucket] += 1
+            values[-2] += value
+            values[-1] += 1
+            self.dirty = True
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [
+                    [name, list(labels), list(values)] for (name, labels), values in self.histograms.items()
+                ],
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        with self.lock:
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, values in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = self.histograms.setdefault(key, [0] * len(values))
+                for i, value in enumerate(values):
+                    merged[i] += value
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, (kind, help_text) in METRICS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                if kind == "counter":
+                    for (metric, labels), value in sorted(self.counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                for (metric, labels), values in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(DURATION_BUCKETS + ("+Inf",), values):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {_number(cumulative)}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(values[-2])}")
+                    lines.append(f"{name}_count{_labels(labels)} {_number(values[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    escaped = (f'{key}="{_escape(str(value))}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+
+_flusher_lock = threading.Lock()
+_flusher_started = False
+
+
+def _process_file(directory: str) -> Path:
+    return Path(directory) / f"metrics-{os.getpid()}.json"
+
+
+def flush() -> None:
+    """Dump this process's registry to METRICS_DIR"""
+    if not settings.METRICS_DIR or not registry.dirty:
+        return
+    registry.dirty = False
+    path = _process_file(settings.METRICS_DIR)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written aside and renamed so readers never see a partial file
+    handle, temporary = tempfile.mkstemp(dir=path.parent, prefix=".metrics-")
+    with os.fdopen(handle, "w") as stream:
+        json.dump(registry.snapshot(), stream)
+    os.replace(temporary, path)
+
+
+def _start_flusher() -> None:
+    """Flush every METRICS_FLUSH_INTERVAL seconds from a daemon thread, and at exit"""
+    global _flusher_started
+    with _flusher_lock:
+        if _flusher_started:
+            return
+        _flusher_started = True
+
+    def run():
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            flush()
+
+    threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+    atexit.register(flush)
+
+
+def collect() -> Registry:
+    """Metrics of every process writing to METRICS_DIR, or of this process alone"""
+    if not settings.METRICS_DIR:
+        return registry
+    flush()
+    total = Registry()
+    for path in Path(settings.METRICS_DIR).glob("metrics-*.json"):
+        try:
+            total.merge(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Removed while listing the directory
+            continue
+    return total
+
+
+class _Timings:
+    """Measurements of one request; also the execute wrapper counting its queries"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_finished = None
+        self.render_finished = None
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+    def phases(self, finished: float) -> dict[str, float]:
+        view_finished = self.view_finished or finished
+        render = (self.render_finished or view_finished) - view_finished
+        app = max(view_finished - self.started - self.db_seconds, 0.0)
+        return {"db": self.db_seconds, "app": app, "render": render}
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures each request for the Server-Timing header and the registry.
+    Goes first in MIDDLEWARE so the other middleware counts in the total.
+    Turned off with API_METRICS=False.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.API_METRICS:
+            return self.get_response(request)
+        timings = request._metrics_timings = _Timings()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        self.record(request, response, timings)
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs after the view and before rendering (DRF responses are template responses)
+        timings = getattr(request, "_metrics_timings", None)
+        if timings is not None:
+            timings.view_finished = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self._rendered(timings))
+        return response
+
+    @staticmethod
+    def _rendered(timings: _Timings) -> None:
+        timings.render_finished = time.perf_counter()
+
+    def record(self, request, response, timings: _Timings) -> None:
+        finished = time.perf_counter()
+        total = finished - timings.started
+        phases = timings.phases(finished)
+
+        header = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in phases.items()]
+        header[0] += f';desc="{timings.db_queries} queries"'
+        header.append(f"total;dur={total * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(header)
+
+        match = getattr(request, "resolver_match", None)
+        labels = {"route": match.view_name if match else "unmatched", "method": request.method}
+        registry.inc("http_requests_total", {**labels, "status": str(response.status_code)})
+        registry.observe("http_request_duration_seconds", labels, total)
+        for phase, seconds in phases.items():
+            registry.observe("http_request_phase_seconds", {**labels, "phase": phase}, seconds)
+        registry.inc("http_request_db_queries_total", labels, timings.db_queries)
+        if not response.streaming:
+            registry.inc("http_response_size_bytes_total", labels, len(response.content))
+        if settings.METRICS_DIR:
+            _start_flusher()
@@ -0,0 +1,178 @@
+"""
+Pagination classes shared by the viewsets.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def ordering_fields(paginator) -> list[str]:
+    """Fields a cursor paginator orders by (and reads back from the rows), if any"""
+    ordering = getattr(paginator, "ordering", None) or ()
+    return [field.lstrip("-") for field in ([ordering] if isinstance(ordering, str) else ordering)]
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """
+    Opt-in page number pagination.
+    Lists stay unpaginated unless API_PAGE_SIZE is set or the client sends ?page_size=.
+    """
+
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a unique ordering such as ("-created_at", "-id").
+
+    Each page is fetched with ``WHERE (created_at, id) < (last seen values)``
+    instead of an OFFSET, so deep pages cost the same as the first one when an
+    index matches the ordering. All ordering fields must share one direction
+    and the last one must be unique.
+
+    The cursor is the URL-safe base64 of ``{"v": 1, "k": [values], "r": reverse}``.
+    """
+
+    ordering: tuple[str, ...] = ("-created_at", "-id")
+    page_size = settings.API_CURSOR_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    cursor_version = 1
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [field.lstrip("-") for field in self.ordering]
+        self.descending = self.ordering[0].startswith("-")
+
+        key, reverse = self.decode_cursor(request, queryset)
+        # Walking backwards means reading the ordering the other way round
+        descending = self.descending != reverse
+        ordering = [f"-{field}" if descending else field for field in self.fields]
+        queryset = queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self._after(key, descending))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = key is not None, has_more
+
+        self.first_key = self._key(results[0]) if results else key
+        self.last_key = self._key(results[-1]) if results else key
+        return results
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def _key(self, instance) -> list:
+        if isinstance(instance, dict):
+            # Rows of a .values() queryset
+            return [instance[field] for field in self.fields]
+        return [getattr(instance, field) for field in self.fields]
+
+    def _after(self, key: list, descending: bool) -> Q:
+        """
+        Lexicographic comparison: (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y).
+        The redundant ``a <= x`` bound lets the database start the index scan at the cursor.
+        """
+        lookup = "lt" if descending else "gt"
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f"{field}__{lookup}": key[index]})
+            for previous, value in zip(self.fields[:index], key[:index]):
+                step &= Q(**{previous: value})
+            condition |= step
+        return Q(**{f"{self.fields[0]}__{lookup}e": key[0]}) & condition
+
+    def encode_cursor(self, key: list, reverse: bool) -> str:
+        values = [value.isoformat() if hasattr(value, "isoformat") else value for value in key]
+        payload = json.dumps({"v": self.cursor_version, "k": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, queryset: QuerySet) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if payload["v"] != self.cursor_version or len(payload["k"]) != len(self.fields):
+                raise ValueError
+            opts = queryset.model._meta
+            key = [opts.get_field(field).to_python(value) for field, value in zip(self.fields, payload["k"])]
+            return key, bool(payload["r"])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, key: list | None, reverse: bool) -> str | None:
+        if key is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(key, reverse))
+
+    def get_next_link(self) -> str | None:
+        return self._link(self.last_key, False) if self.has_next else None
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        return self._link(self.first_key, True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("previous", self.get_previous_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class InventoryCursorPagination(KeysetPagination):
+    """Newest inventory records first, backed by the (created_at, id) index"""
+
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,30 @@
+"""
+Request parsers shared by the viewsets.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON: one object per line, read line by line from the
+    request stream. Blank lines are ignored. Parses to a list.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> list:
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line.decode(encoding)))
+            except ValueError as e:
+                raise ParseError(f"NDJSON parse error on line {line_number} - {e}")
+        return items
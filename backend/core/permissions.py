@@ -1,6 +1,12 @@
+import hmac
+import logging
+
+from django.conf import settings
 from rest_framework import permissions
 from apps.users.models import RoleChoices
 
+logger = logging.getLogger(__name__)
+
 
 class IsAdminUser(permissions.BasePermission):
     """
@@ -37,10 +43,10 @@ class IsAdminOrReadOnly(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        print(request.user.role)
         # Verificar si el usuario está autenticado
         if not request.user.is_authenticated:
             return False
+        logger.debug("%s request by a user with role %s", request.method, request.user.role)
 
         # Permitir operaciones de lectura a todos los usuarios autenticados
         if request.method in permissions.SAFE_METHODS:
@@ -65,3 +71,16 @@ class IsOwnerOrAdmin(permissions.BasePermission):
             return obj.user == request.user
 
         return False
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """
+    Permite el acceso con la cabecera "Authorization: Bearer <METRICS_TOKEN>".
+    Si METRICS_TOKEN no está configurado, nadie tiene acceso.
+    """
+
+    def has_permission(self, request, view):
+        if not settings.METRICS_TOKEN:
+            return False
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        return hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode())
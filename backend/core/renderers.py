@@ -0,0 +1,36 @@
+"""
+JSON renderer backed by ``orjson``.
+
+The output matches ``rest_framework.renderers.JSONRenderer`` byte for byte:
+compact separators, UTF-8 text, U+2028/U+2029 escaped, and the types orjson
+would format its own way (datetimes, Decimal, non-str keys...) handed to the
+DRF encoder. One difference remains: floats below 1e-4 or from 1e16 up are
+spelled ``1e-05``/``1e+16`` by DRF and ``0.00001``/``1e16`` by orjson, the
+same numbers. Indented output, non-compact settings, or data orjson rejects
+are rendered by the stock renderer.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``application/json`` encoded with orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, ValueError):
+            # Integers beyond 64 bits, circular data...
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape the line and paragraph separators, as JSONRenderer does
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,174 @@
+"""
+Read-through cache of serialized list and detail responses.
+
+Entries live in the Django cache (``CACHES``), so the backend is whatever the
+deployment configures: per-process memory by default, files, Redis or
+Memcached in production. Keys embed version counters that the model signals
+bump, which invalidates precisely without scanning or deleting keys:
+
+- ``<model>:generation`` moves on bulk writes and drops every entry of the model;
+- ``<model>:list`` moves on any saved or deleted row and drops the lists;
+- ``<model>:<pk>`` moves when that row changes and drops its detail.
+
+A cold key is computed by a single request: the others wait for it behind a
+lock taken with ``cache.add`` and read the stored result.
+"""
+import hashlib
+import time
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+# Response headers stored with the data and sent again on a hit
+CACHED_HEADERS = ("ETag", "Last-Modified")
+# Seconds between two looks at a key another request is computing
+LOCK_POLL_INTERVAL = 0.05
+
+
+class ResponseCache:
+    """Versioned keys and stampede-protected reads for the responses of one model"""
+
+    def __init__(self, label: str):
+        self.prefix = f"api:{label}"
+
+    @classmethod
+    def for_model(cls, model) -> "ResponseCache":
+        return cls(model._meta.label_lower)
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE_ALIAS]
+
+    def _versions(self, *names: str) -> list:
+        keys = [f"{self.prefix}:{name}" for name in names]
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                # Start from the clock so a version lost by eviction never matches older entries
+                self.cache.add(key, time.time_ns(), timeout=None)
+                found[key] = self.cache.get(key, 0)
+        return [found[key] for key in keys]
+
+    def _bump(self, name: str) -> None:
+        key = f"{self.prefix}:{name}"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns(), timeout=None)
+
+    @staticmethod
+    def _digest(request) -> str:
+        return hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+
+    def list_key(self, request) -> str:
+        generation, version = self._versions("generation", "list")
+        return f"{self.prefix}:g{generation}:list:v{version}:{self._digest(request)}"
+
+    def detail_key(self, request, pk) -> str:
+        generation, version = self._versions("generation", str(pk))
+        return f"{self.prefix}:g{generation}:{pk}:v{version}:{self._digest(request)}"
+
+    def invalidate(self, pk=None) -> None:
+        """
+        Drop the lists and the detail of ``pk`` (every entry when no pk is given).
+        Bumped again on commit so a response computed by another request
+        before the transaction committed is not kept either.
+        """
+
+        def bump() -> None:
+            if pk is None:
+                self._bump("generation")
+            else:
+                self._bump("list")
+                self._bump(str(pk))
+
+        bump()
+        transaction.on_commit(bump)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Cached value of ``key``, computing and storing it on a miss.
+        ``compute`` returning None means "do not store".
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        lock_key = f"{key}:lock"
+        lock_timeout = settings.API_CACHE_LOCK_TIMEOUT
+        deadline = time.monotonic() + lock_timeout
+        while not self.cache.add(lock_key, 1, timeout=lock_timeout):
+            if time.monotonic() >= deadline:
+                # The request holding the lock is too slow; answer without waiting for it
+                return compute()
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = self.cache.get(key)
+            if value is not None:
+                return value
+
+        try:
+            value = self.cache.get(key)
+            if value is not None:
+                return value
+            value = compute()
+            if value is not None:
+                self.cache.set(key, value, timeout=settings.API_CACHE_TIMEOUT)
+            return value
+        finally:
+            self.cache.delete(lock_key)
+
+
+class CachedResponseMixin:
+    """
+    Serves ``list`` and ``retrieve`` from a ResponseCache of the viewset model.
+
+    Only 200 responses are stored, with their ETag and Last-Modified, so a hit
+    still answers ``If-None-Match`` with 304. Place it before
+    ConditionalGetMixin so a hit skips the validator query as well.
+    The model signals call ``ResponseCache.invalidate``.
+    """
+
+    def get_response_cache(self) -> ResponseCache:
+        return ResponseCache.for_model(self.queryset.model)
+
+    def list(self, request, *args, **kwargs):
+        if not settings.API_CACHE_TIMEOUT:
+            return super().list(request, *args, **kwargs)
+        key = self.get_response_cache().list_key(request)
+        return self._cached(key, False, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.API_CACHE_TIMEOUT:
+            return super().retrieve(request, *args, **kwargs)
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = self.get_response_cache().detail_key(request, pk)
+        return self._cached(key, True, super().retrieve, request, *args, **kwargs)
+
+    def _cached(self, key: str, detail: bool, view, request, *args, **kwargs):
+        computed = {}
+
+        def compute():
+            response = computed["response"] = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return None
+            headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+            return {"data": response.data, "headers": headers}
+
+        entry = self.get_response_cache().get_or_compute(key, compute)
+        if "response" in computed:
+            return computed["response"]
+
+        headers = entry["headers"]
+        last_modified = parse_http_date_safe(headers.get("Last-Modified", "")) if detail else None
+        conditional = get_conditional_response(request, etag=headers.get("ETag"), last_modified=last_modified)
+        if conditional is not None:
+            for name, value in headers.items():
+                conditional[name] = value
+            return conditional
+        return Response(entry["data"], headers=headers)
@@ -0,0 +1,158 @@
+"""
+Ranked text search shared by the viewsets and /api/search/.
+
+PostgreSQL
+    Models with long text get a generated ``tsvector`` column with a GIN
+    index, matched with ``websearch_to_tsquery``. Short columns (names,
+    codes) get ``pg_trgm`` GIN indexes, used by the ``<%`` word similarity
+    operator, which tolerates typos and matches parts of a name. Results are
+    ordered by ts_rank plus the word similarities.
+SQLite
+    An external-content FTS5 table kept in sync by triggers, queried with
+    prefix terms and ordered by bm25. Meant for development and tests.
+Other databases
+    ``icontains`` over the fields, unranked.
+
+The columns, indexes, tables and triggers are created by the migrations of
+each app with the statements built here. On SQLite, a migration that rebuilds
+the table drops its triggers; run ``sqlite_fts_statements`` again after it.
+"""
+import re
+from dataclasses import dataclass
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+# Text search configuration of the tsvector columns; "simple" neither stems nor drops words,
+# which suits product codes and mixed-language catalogs
+SEARCH_CONFIG = "simple"
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    """What to search in a model"""
+
+    # Columns searched (all of them in the SQLite FTS5 table)
+    fields: tuple[str, ...]
+    # Columns with a pg_trgm index, matched by word similarity
+    trigram_fields: tuple[str, ...] = ()
+    # Generated tsvector column, for PostgreSQL full-text search
+    vector_column: str | None = None
+
+
+def fts_table(db_table: str) -> str:
+    return f"{db_table}_fts"
+
+
+def search(queryset: QuerySet, spec: SearchSpec, terms: str) -> QuerySet:
+    """Filter ``queryset`` to the rows matching ``terms``, best first, with a ``search_rank`` annotation"""
+    terms = terms.strip()
+    if not terms:
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        queryset = _search_postgresql(queryset, spec, terms)
+    elif connection.vendor == "sqlite":
+        queryset = _search_sqlite(queryset, spec, terms)
+    else:
+        condition = Q()
+        for field in spec.fields:
+            condition |= Q(**{f"{field}__icontains": terms})
+        queryset = queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by("-search_rank", "pk")
+
+
+def _search_postgresql(queryset: QuerySet, spec: SearchSpec, terms: str) -> QuerySet:
+    db_table = queryset.model._meta.db_table
+    condition = Q()
+    ranks = []
+    if spec.vector_column:
+        query = SearchQuery(terms, search_type="websearch", config=SEARCH_CONFIG)
+        vector = RawSQL(f'"{db_table}"."{spec.vector_column}"', [], output_field=SearchVectorField())
+        queryset = queryset.alias(search_vector=vector)
+        condition |= Q(search_vector=query)
+        ranks.append(SearchRank(vector, query))
+    for field in spec.trigram_fields:
+        condition |= Q(**{f"{field}__trigram_word_similar": terms})
+        ranks.append(TrigramWordSimilarity(terms, field))
+    return queryset.filter(condition).annotate(search_rank=sum(ranks[1:], ranks[0]))
+
+
+def _search_sqlite(queryset: QuerySet, spec: SearchSpec, terms: str) -> QuerySet:
+    words = re.findall(r"\w+", terms)
+    if not words:
+        return queryset.none()
+    match = " ".join(f'"{word}"*' for word in words)
+    db_table = queryset.model._meta.db_table
+    fts = fts_table(db_table)
+    matches = RawSQL(f'SELECT rowid FROM "{fts}" WHERE "{fts}" MATCH %s', [match])
+    rank = RawSQL(
+        f'SELECT -bm25("{fts}") FROM "{fts}" WHERE "{fts}" MATCH %s AND rowid = "{db_table}"."id"',
+        [match],
+        output_field=FloatField(),
+    )
+    return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+
+def postgresql_search_statements(db_table: str, spec: SearchSpec, weights: dict[str, str] | None = None) -> list[str]:
+    """DDL of the generated tsvector column and the GIN indexes of a model (pg_trgm must exist)"""
+    statements = []
+    if spec.vector_column:
+        weights = weights or {}
+        config = f"'{SEARCH_CONFIG}'::regconfig"
+        vector = " || ".join(
+            f"setweight(to_tsvector({config}, coalesce(\"{field}\", '')), '{weights.get(field, 'D')}')"
+            for field in spec.fields
+        )
+        statements += [
+            f'ALTER TABLE "{db_table}" ADD COLUMN "{spec.vector_column}" tsvector '
+            f"GENERATED ALWAYS AS ({vector}) STORED",
+            f'CREATE INDEX "{db_table}_{spec.vector_column}_idx" ON "{db_table}" USING gin ("{spec.vector_column}")',
+        ]
+    statements += [
+        f'CREATE INDEX "{db_table}_{field}_trgm_idx" ON "{db_table}" USING gin ("{field}" gin_trgm_ops)'
+        for field in spec.trigram_fields
+    ]
+    return statements
+
+
+def sqlite_fts_statements(db_table: str, spec: SearchSpec) -> list[str]:
+    """DDL of the FTS5 table mirroring a model and the triggers keeping it in sync"""
+    fts = fts_table(db_table)
+    columns = ", ".join(f'"{field}"' for field in spec.fields)
+    new = ", ".join(f'new."{field}"' for field in spec.fields)
+    old = ", ".join(f'old."{field}"' for field in spec.fields)
+    delete_old = f'INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES (\'delete\', old.id, {old});'
+    insert_new = f'INSERT INTO "{fts}"(rowid, {columns}) VALUES (new.id, {new});'
+    return [
+        f'DROP TABLE IF EXISTS "{fts}"',
+        f'CREATE VIRTUAL TABLE "{fts}" USING fts5({columns}, content="{db_table}", content_rowid="id", '
+        f'tokenize="unicode61 remove_diacritics 2")',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{db_table}" BEGIN {insert_new} END',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{db_table}" BEGIN {delete_old} END',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE ON "{db_table}" BEGIN {delete_old} {insert_new} END',
+        f'INSERT INTO "{fts}"("{fts}") VALUES (\'rebuild\')',
+    ]
+
+
+def search_schema_statements(vendor: str, db_table: str, spec: SearchSpec, weights: dict | None = None) -> list[str]:
+    if vendor == "postgresql":
+        return postgresql_search_statements(db_table, spec, weights)
+    if vendor == "sqlite":
+        return sqlite_fts_statements(db_table, spec)
+    return []
+
+
+def drop_search_schema_statements(vendor: str, db_table: str, spec: SearchSpec) -> list[str]:
+    if vendor == "postgresql":
+        statements = [f'DROP INDEX IF EXISTS "{db_table}_{field}_trgm_idx"' for field in spec.trigram_fields]
+        if spec.vector_column:
+            statements.append(f'ALTER TABLE "{db_table}" DROP COLUMN IF EXISTS "{spec.vector_column}"')
+        return statements
+    if vendor == "sqlite":
+        fts = fts_table(db_table)
+        return [f'DROP TRIGGER IF EXISTS "{fts}_{suffix}"' for suffix in ("ai", "ad", "au")] + [
+            f'DROP TABLE IF EXISTS "{fts}"'
+        ]
+    return []
@@ -42,19 +42,25 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Apps del proyecto
     "apps.companies",
     "apps.products",
     "apps.inventories",
     "apps.users",
+    "apps.jobs",
+    "apps.profiling",
     # Dependencias externas
     "rest_framework",
     "rest_framework_simplejwt",
     "drf_spectacular",
+    "django_filters",
     "corsheaders",
 ]
 
 MIDDLEWARE = [
+    "core.metrics.RequestMetricsMiddleware",
+    "apps.profiling.middleware.RequestProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -99,6 +105,18 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+# Per-process memory by default. Set CACHE_BACKEND and CACHE_LOCATION to share it between workers, e.g.
+# django.core.cache.backends.filebased.FileBasedCache with a directory, or
+# django.core.cache.backends.redis.RedisCache with redis://redis:6379
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -142,19 +160,83 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Authentication (apps.users.authentication)
+# Cache backends that each process keeps to itself; revocations stored there are not seen by the other workers
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+# Build request.user from the access token claims instead of loading the user on every request.
+# Only safe with a shared cache (revocations), so it defaults to off with the per-process one
+JWT_STATELESS_AUTH = (
+    os.environ.get("JWT_STATELESS_AUTH", str(CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS))
+    == "True"
+)
+# Reject the tokens issued before a user was deactivated, deleted or changed role (needs a cache shared by all workers)
+JWT_REVOCATION_CACHE = os.environ.get("JWT_REVOCATION_CACHE", "True") == "True"
+
 # Configuración de Django REST Framework y JWT
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    # Loads the user on every request unless JWT_STATELESS_AUTH is on
+    "DEFAULT_AUTHENTICATION_CLASSES": ("apps.users.authentication.TokenClaimsAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.StandardPageNumberPagination",
+    "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
+    # Same bytes as the stock JSONRenderer, encoded with orjson
+    "DEFAULT_RENDERER_CLASSES": ("core.renderers.ORJSONRenderer", "rest_framework.renderers.BrowsableAPIRenderer"),
 }
 
+# Pagination (core.pagination)
+# Default page size of page-number lists; unset keeps them unpaginated unless ?page_size= is sent
+API_PAGE_SIZE = int(os.environ["API_PAGE_SIZE"]) if os.environ.get("API_PAGE_SIZE") else None
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 1000))
+# Default page size of cursor-paginated lists (inventories)
+API_CURSOR_PAGE_SIZE = int(os.environ.get("API_CURSOR_PAGE_SIZE", 50))
+# Matches of each kind returned by /api/search/ (capped at API_MAX_PAGE_SIZE)
+SEARCH_RESULTS_LIMIT = int(os.environ.get("SEARCH_RESULTS_LIMIT", 10))
+# Build company, product and inventory lists from .values() rows instead of model instances (core.fastlist)
+API_FAST_LISTS = os.environ.get("API_FAST_LISTS", "True") == "True"
+
+# Request metrics (core.metrics): Server-Timing header and /api/metrics/
+API_METRICS = os.environ.get("API_METRICS", "True") == "True"
+# Directory shared by the workers to add up their metrics; empty keeps them per process
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+# Seconds between dumps of a worker's metrics to METRICS_DIR
+METRICS_FLUSH_INTERVAL = int(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+# Bearer token required by /api/metrics/; empty closes the endpoint
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# On-demand request profiling (apps.profiling)
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "True") == "True"
+# "pyinstrument" when the optional package is installed, otherwise cProfile
+PROFILING_BACKEND = os.environ.get("PROFILING_BACKEND", "pyinstrument")
+# Seconds a profiling token stays valid
+PROFILING_TOKEN_MAX_AGE = int(os.environ.get("PROFILING_TOKEN_MAX_AGE", 60 * 60))
+# Stored profiles; older ones are deleted
+PROFILING_MAX_REPORTS = int(os.environ.get("PROFILING_MAX_REPORTS", 50))
+
+# Cached company and product responses (core.response_cache)
+# Cache alias the serialized lists and details are stored in
+API_CACHE_ALIAS = os.environ.get("API_CACHE_ALIAS", "default")
+# Seconds a cached response is kept (0 disables the cache). Off by default on a per-process cache: writes made
+# in one process (another worker, the job worker, import_products) would not invalidate the others' entries
+API_CACHE_TIMEOUT = int(
+    os.environ.get(
+        "API_CACHE_TIMEOUT",
+        0 if CACHES.get(API_CACHE_ALIAS, {}).get("BACKEND") in PROCESS_LOCAL_CACHE_BACKENDS else 300,
+    )
+)
+# Seconds a request waits for another one computing the same response before computing it itself
+API_CACHE_LOCK_TIMEOUT = int(os.environ.get("API_CACHE_LOCK_TIMEOUT", 10))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "UPDATE_LAST_LOGIN": True,
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
+    "TOKEN_USER_CLASS": "apps.users.authentication.ClaimsUser",
 }
 
 # DRF Spectacular Settings
@@ -194,6 +276,62 @@ EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
+# Messages sent over one SMTP session by the multi-recipient inventory email
+INVENTORY_EMAIL_BATCH_SIZE = int(os.environ.get("INVENTORY_EMAIL_BATCH_SIZE", 50))
+# Maximum number of recipients accepted by a single send_email_bulk request
+INVENTORY_EMAIL_MAX_RECIPIENTS = int(os.environ.get("INVENTORY_EMAIL_MAX_RECIPIENTS", 1000))
+
+# Inventory reports
+# Rows fetched per round-trip when streaming large reports
+INVENTORY_REPORT_CHUNK_SIZE = int(os.environ.get("INVENTORY_REPORT_CHUNK_SIZE", 2000))
+# Above this many rows, download_pdf switches to the constant-memory streaming writer
+INVENTORY_PDF_STREAMING_THRESHOLD = int(os.environ.get("INVENTORY_PDF_STREAMING_THRESHOLD", 5000))
+# Above this many rows, streamed reports lay out their pages in parallel, in segments of this many pages
+INVENTORY_PDF_PARALLEL_THRESHOLD = int(os.environ.get("INVENTORY_PDF_PARALLEL_THRESHOLD", 50000))
+INVENTORY_PDF_PAGES_PER_SEGMENT = int(os.environ.get("INVENTORY_PDF_PAGES_PER_SEGMENT", 50))
+# Worker processes of the pool each web or job process keeps to render reports in parallel (1 = render in-process)
+INVENTORY_REPORT_WORKERS = int(os.environ.get("INVENTORY_REPORT_WORKERS", 2))
+# Per-process LRU of rendered reports; reports bigger than the entry limit are never cached
+INVENTORY_REPORT_CACHE_MAX_BYTES = int(os.environ.get("INVENTORY_REPORT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+INVENTORY_REPORT_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("INVENTORY_REPORT_CACHE_MAX_ENTRY_BYTES", 16 * 1024 * 1024))
+# Seconds a cached report is served for at most, even if the data version did not move (0 = no limit)
+INVENTORY_REPORT_CACHE_MAX_AGE = int(os.environ.get("INVENTORY_REPORT_CACHE_MAX_AGE", 10 * 60))
+
+# Bulk inventory writes (POST /api/inventories/bulk/)
+INVENTORY_BULK_MAX_ITEMS = int(os.environ.get("INVENTORY_BULK_MAX_ITEMS", 10000))
+# Rows per INSERT/UPDATE statement
+INVENTORY_BULK_BATCH_SIZE = int(os.environ.get("INVENTORY_BULK_BATCH_SIZE", 1000))
+
+# Product catalog import (apps.products.importer)
+# Rows per INSERT ... ON CONFLICT (code) DO UPDATE statement
+PRODUCT_IMPORT_BATCH_SIZE = int(os.environ.get("PRODUCT_IMPORT_BATCH_SIZE", 2000))
+# Rejected rows listed in the import summary (all of them are counted)
+PRODUCT_IMPORT_MAX_ERRORS = int(os.environ.get("PRODUCT_IMPORT_MAX_ERRORS", 100))
+
+# Stock ledger (apps.inventories.ledger); snapshots are taken by the job worker or `python manage.py snapshot_stock`
+# Seconds between the snapshots the job worker takes (0 = only with the command)
+STOCK_SNAPSHOT_INTERVAL = int(os.environ.get("STOCK_SNAPSHOT_INTERVAL", 60 * 60))
+# Seconds a snapshot lags behind now, so movements of transactions still in flight are not missed
+STOCK_SNAPSHOT_LAG = int(os.environ.get("STOCK_SNAPSHOT_LAG", 60))
+
+# Tabular exports (core.exports)
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+# XLSX files stay in memory up to this size before spilling to disk
+EXPORT_XLSX_SPOOL_SIZE = int(os.environ.get("EXPORT_XLSX_SPOOL_SIZE", 10 * 1024 * 1024))
+
+# Background jobs (see apps.jobs and `python manage.py run_jobs`)
+# Run jobs inside the request that enqueues them, for development without a worker
+JOBS_RUN_EAGERLY = os.environ.get("JOBS_RUN_EAGERLY", "False") == "True"
+JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", 3))
+# Base delay in seconds before a failed job is retried; doubles on every attempt
+JOBS_RETRY_DELAY = int(os.environ.get("JOBS_RETRY_DELAY", 30))
+# Directory, shared by the web and worker processes, of the result files written by jobs (large PDFs)
+JOBS_RESULT_DIR = os.environ.get("JOBS_RESULT_DIR", os.path.join(BASE_DIR, "job_results"))
+# Seconds between the heartbeats a worker records on the job it is running
+JOBS_HEARTBEAT_INTERVAL = int(os.environ.get("JOBS_HEARTBEAT_INTERVAL", 30))
+# Running jobs without a heartbeat for this many seconds are assumed lost: they are handed
+# out again, or marked failed once out of attempts. Keep it several heartbeat intervals long
+JOBS_STALE_TIMEOUT = int(os.environ.get("JOBS_STALE_TIMEOUT", 5 * 60))
 
 
 
@@ -233,6 +371,10 @@ LOGGING = {
             "handlers": ["console"],
             "level": "INFO",
         },
+        "core": {
+            "handlers": ["console"],
+            "level": "INFO",
+        },
     },
 }
 
@@ -25,19 +25,23 @@ from rest_framework.routers import DefaultRouter
 from apps.companies.views import CompanyViewSet
 from apps.products.views import ProductViewSet
 from apps.inventories.views import InventoryViewSet
-from apps.users.views import UserViewSet, MyTokenObtainPairView
-from rest_framework_simplejwt.views import TokenRefreshView
+from apps.users.views import UserViewSet, MyTokenObtainPairView, MyTokenRefreshView
+from apps.jobs.views import JobViewSet
+from apps.profiling.views import RequestProfileViewSet
+from core.views import MetricsView, SearchView
 
 router = DefaultRouter()
 router.register(r"companies", CompanyViewSet, basename="company")
 router.register(r"products", ProductViewSet, basename="product")
 router.register(r"inventories", InventoryViewSet, basename="inventory")
 router.register(r"users", UserViewSet, basename="user")
+router.register(r"jobs", JobViewSet, basename="job")
+router.register(r"profiles", RequestProfileViewSet, basename="profile")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/token/", MyTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/refresh/", MyTokenRefreshView.as_view(), name="token_refresh"),
     path(
         "api/",
         include(
@@ -49,6 +53,8 @@ urlpatterns = [
                     name="swagger-ui",
                 ),
                 path("redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+                path("search/", SearchView.as_view(), name="search"),
+                path("metrics/", MetricsView.as_view(), name="metrics"),
                 path("", include(router.urls)),
             ]
         ),
@@ -0,0 +1,76 @@
+"""
+Views that span several apps.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from apps.companies.filters import COMPANY_SEARCH
+from apps.companies.models import Company
+from apps.companies.serializers import CompanySerializer
+from apps.products.filters import PRODUCT_SEARCH
+from apps.products.models import Product
+from apps.products.serializers import ProductSerializer
+from core.metrics import collect
+from core.permissions import HasMetricsToken
+from core.search import search
+
+# (result key, queryset, search spec, serializer, router basename)
+SEARCH_TARGETS = [
+    ("products", Product.objects.all(), PRODUCT_SEARCH, ProductSerializer, "product"),
+    ("companies", Company.objects.all(), COMPANY_SEARCH, CompanySerializer, "company"),
+]
+
+
+class SearchView(APIView):
+    """
+    Ranked search across products and companies: /api/search/?q=...
+
+    Returns the best ?limit= matches of each kind (default SEARCH_RESULTS_LIMIT).
+    When there are more, "next" points to the second page of the matching
+    list endpoint (?search=), which pages through the rest in the same order.
+    """
+
+    def get(self, request):
+        terms = request.query_params.get("q", "").strip()
+        if not terms:
+            return Response({"error": "Send the search terms in ?q=."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get("limit", settings.SEARCH_RESULTS_LIMIT))
+        except ValueError:
+            limit = settings.SEARCH_RESULTS_LIMIT
+        limit = min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+        results = {}
+        for key, queryset, spec, serializer_class, basename in SEARCH_TARGETS:
+            rows = list(search(queryset, spec, terms)[: limit + 1])
+            next_url = None
+            if len(rows) > limit:
+                next_url = request.build_absolute_uri(reverse(f"{basename}-list"))
+                for param, value in (("search", terms), ("page_size", limit), ("page", 2)):
+                    next_url = replace_query_param(next_url, param, value)
+            results[key] = {
+                "next": next_url,
+                "results": serializer_class(rows[:limit], many=True, context={"request": request}).data,
+            }
+        return Response(results)
+
+
+class MetricsView(APIView):
+    """
+    Request metrics (core.metrics) in the Prometheus text format: /api/metrics/
+
+    Meant for the Prometheus scraper, so it takes no JWT but requires
+    "Authorization: Bearer <METRICS_TOKEN>"; it is closed while METRICS_TOKEN
+    is not set.
+    """
+
+    authentication_classes = []
+    permission_classes = [HasMetricsToken]
+
+    def get(self, request):
+        return HttpResponse(collect().render(), content_type="text/plain; version=0.0.4; charset=utf-8")
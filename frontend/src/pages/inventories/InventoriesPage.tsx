@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { DocumentArrowDownIcon, EnvelopeIcon, PlusIcon, PencilIcon, TrashIcon } from '@heroicons/react/24/outline';
 import inventoryService from '../../services/inventoryService';
-import type { InventoryItem, CreateInventoryItemDto, UpdateInventoryItemDto } from '../../services/inventoryService';
+import type { InventoryItem, CreateInventoryItemDto, UpdateInventoryItemDto, CursorPage } from '../../services/inventoryService';
 import companyService from '../../services/companyService';
 import productService from '../../services/productService';
 
@@ -24,6 +24,11 @@ interface InventoryFormState {
 
 export default function InventoriesPage() {
   const [inventoryItems, setInventoryItems] = useState<InventoryItem[]>([]);
+  // Enlaces de cursor de la página mostrada
+  const [pageLinks, setPageLinks] = useState<{ next: string | null; previous: string | null }>({
+    next: null,
+    previous: null
+  });
   const [isLoading, setIsLoading] = useState(true);
   const [selectedCompany, setSelectedCompany] = useState<string>('all');
   const [emailForm, setEmailForm] = useState<EmailFormState>({
@@ -51,65 +56,46 @@ export default function InventoriesPage() {
   const [error, setError] = useState<string | null>(null);
   const [products, setProducts] = useState<{id: number, name: string, code: string}[]>([]);
 
-  // Cargar datos del inventario
+  const showPage = (page: CursorPage<InventoryItem>) => {
+    setInventoryItems(page.results);
+    setPageLinks({ next: page.next, previous: page.previous });
+  };
+
+  // Pide una página del inventario: la primera de la empresa seleccionada, o la del enlace indicado
+  const loadPage = async (url?: string) => {
+    setIsLoading(true);
+    setError(null);
+
+    try {
+      const companyId = selectedCompany !== 'all' ? parseInt(selectedCompany) : undefined;
+      showPage(await inventoryService.getPage(companyId, url));
+    } catch (error) {
+      console.error('Error al cargar el inventario:', error);
+      setError('No se pudieron cargar los datos del inventario. Por favor, intenta de nuevo.');
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  // Cargar las empresas y productos para el filtro y el formulario
   useEffect(() => {
-    const fetchData = async () => {
-      setIsLoading(true);
-      setError(null);
-      
+    const fetchOptions = async () => {
       try {
-        // En producción, este sería un llamado real a la API
-        const data = await inventoryService.getAll();
-        setInventoryItems(data);
-        
-        // Obtener la lista de empresas para el filtro
-        const companiesData = await companyService.getAll();
-        setCompanies(companiesData.map(company => ({ 
-          id: company.id, 
-          name: company.name 
-        })));
-        
-        // Obtener la lista de productos usando productService
-        const productsData = await productService.getAll();
-        setProducts(productsData.map((product: any) => ({
-          id: product.id,
-          name: product.name,
-          code: product.code
-        })));
+        setCompanies(await companyService.getOptions());
+        // Obtener la lista de productos (solo id, código y nombre)
+        setProducts(await productService.getOptions());
       } catch (error) {
         console.error('Error al cargar los datos:', error);
         setError('No se pudieron cargar los datos del inventario. Por favor, intenta de nuevo.');
-      } finally {
-        setIsLoading(false);
       }
     };
-    
-    fetchData();
+
+    fetchOptions();
   }, []);
 
-  // Actualizar los datos cuando cambia la empresa seleccionada
+  // Cargar la primera página cada vez que cambia la empresa seleccionada
   useEffect(() => {
-    const fetchInventoryByCompany = async () => {
-      if (selectedCompany === 'all') return;
-      
-      setIsLoading(true);
-      setError(null);
-      
-      try {
-        const companyId = parseInt(selectedCompany);
-        const data = await inventoryService.getByCompany(companyId);
-        setInventoryItems(data);
-      } catch (error) {
-        console.error('Error al filtrar por empresa:', error);
-        setError('No se pudieron cargar los datos del inventario. Por favor, intenta de nuevo.');
-      } finally {
-        setIsLoading(false);
-      }
-    };
-    
-    if (selectedCompany !== 'all') {
-      fetchInventoryByCompany();
-    }
+    loadPage();
   }, [selectedCompany]);
 
   const handleDownloadPDF = async () => {
@@ -194,13 +180,10 @@ export default function InventoriesPage() {
   const handleOpenInventoryForm = (item?: any) => {
     if (item && item.id) {
       // Modo edición
-      const product = products.find(p => p.id === item.product);
-      const productCode = product ? product.code : '';
-      
       setInventoryForm({
         isOpen: true,
-        productCode: productCode,
-        productName: product ? product.name : '',
+        productCode: item.productCode,
+        productName: item.productName,
         quantity: item.quantity,
         companyId: item.company.toString(),
         isSubmitting: false,
@@ -283,8 +266,7 @@ export default function InventoriesPage() {
       }
       
       // Actualizar la lista de inventario
-      const updatedInventory = await inventoryService.getAll();
-      setInventoryItems(updatedInventory);
+      await loadPage();
       
       // Limpiar y cerrar el formulario
       setInventoryForm({
@@ -327,8 +309,7 @@ export default function InventoriesPage() {
       await inventoryService.remove(deletingItemId);
       
       // Actualizar la lista eliminando el item
-      const updatedInventory = await inventoryService.getAll();
-      setInventoryItems(updatedInventory);
+      await loadPage();
       
       // Mostrar mensaje de éxito
       setInventoryDeleted(true);
@@ -345,21 +326,14 @@ export default function InventoriesPage() {
     }
   };
 
-  // Lista filtrada de elementos de inventario
-  const filteredItems = inventoryItems.map(item => {
-    // Buscar el producto y la empresa por ID
-    const product = products.find(p => p.id === item.product);
-    const company = companies.find(c => c.id === item.company);
-    return {
-      ...item,
-      productCode: product ? product.code : '',
-      productName: product ? product.name : '',
-      companyName: company ? company.name : ''
-    };
-  }).filter(item => {
-    if (selectedCompany === 'all') return true;
-    return item.company === parseInt(selectedCompany);
-  });
+  // Elementos de la página actual (el backend ya filtra por empresa)
+  // Los nombres llegan embebidos gracias a ?expand=product,company
+  const filteredItems = inventoryItems.map(item => ({
+    ...item,
+    productCode: item.product_code ?? '',
+    productName: item.product_name ?? '',
+    companyName: item.company_name ?? ''
+  }));
 
   return (
     <div>
@@ -682,6 +656,24 @@ export default function InventoriesPage() {
               )}
             </tbody>
           </table>
+          {(pageLinks.previous || pageLinks.next) && (
+            <div className="flex items-center justify-between px-6 py-3 border-t border-gray-200 bg-gray-50">
+              <button
+                onClick={() => pageLinks.previous && loadPage(pageLinks.previous)}
+                disabled={!pageLinks.previous}
+                className="px-3 py-1 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                Anterior
+              </button>
+              <button
+                onClick={() => pageLinks.next && loadPage(pageLinks.next)}
+                disabled={!pageLinks.next}
+                className="px-3 py-1 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                Siguiente
+              </button>
+            </div>
+          )}
         </div>
       )}
 
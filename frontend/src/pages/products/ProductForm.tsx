@@ -39,10 +39,10 @@ const ProductSchema = Yup.object().shape({
 });
 
 export default function ProductForm({ product, onSave, onCancel }: ProductFormProps) {
-  const [companies, setCompanies] = useState<Company[]>([]);
+  const [companies, setCompanies] = useState<Pick<Company, 'id' | 'name'>[]>([]);
 
   useEffect(() => {
-    companyService.getAll().then(setCompanies);
+    companyService.getOptions().then(setCompanies);
   }, []);
 
   const formik = useFormik({
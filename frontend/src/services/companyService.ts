@@ -34,6 +34,18 @@ export const createCompany = async (data: Omit<Company, 'id'>): Promise<Company>
   return response.data;
 };
 
+/**
+ * Obtiene solo el id y el nombre de las empresas, para selectores y filtros
+ */
+const getOptions = async (): Promise<Pick<Company, 'id' | 'name'>[]> => {
+  try {
+    const response = await axios.get<Pick<Company, 'id' | 'name'>[]>(`${API_URL}/companies/?fields=id,name`);
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
 const getById = async (id: number): Promise<Company> => {
   try {
     const response = await axios.get<Company>(`${API_URL}/companies/${id}/`);
@@ -62,6 +74,7 @@ const remove = async (id: number): Promise<void> => {
 
 export const companyService = {
   getAll: getCompanies,
+  getOptions,
   getById,
   create: createCompany,
   update,
@@ -29,6 +29,13 @@ export interface InventoryItemSummary {
   lastUpdated?: string;
 }
 
+// Página de resultados paginada por cursor que devuelve /inventories/
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface CreateInventoryItemDto {
   product: number;
   company: number;
@@ -39,25 +46,22 @@ export interface UpdateInventoryItemDto {
   quantity?: number;
 }
 
-/**
- * Obtiene todos los elementos del inventario
- */
-const getAll = async (): Promise<InventoryItem[]> => {
-  try {
-    const response = await axios.get<InventoryItem[]>(`${API_URL}/inventories/`);
-    return response.data;
-  } catch (error) {
-    throw error;
-  }
-};
+// Pide al backend los nombres de producto y empresa junto con cada registro
+const EXPAND = 'expand=product,company';
 
 /**
- * Obtiene los elementos de inventario filtrados por empresa
- * @param companyId ID de la empresa a filtrar
+ * Obtiene una página del inventario
+ * Sin url pide la primera página (filtrada por empresa si se indica);
+ * con url sigue los enlaces next/previous que devolvió el backend
+ * @param companyId ID de la empresa a filtrar (opcional)
+ * @param url Enlace de cursor de una página anterior (opcional)
  */
-const getByCompany = async (companyId: number): Promise<InventoryItem[]> => {
+const getPage = async (companyId?: number, url?: string): Promise<CursorPage<InventoryItem>> => {
   try {
-    const response = await axios.get<InventoryItem[]>(`${API_URL}/inventories/?company=${companyId}`);
+    const firstPage = companyId
+      ? `${API_URL}/inventories/?company=${companyId}&${EXPAND}`
+      : `${API_URL}/inventories/?${EXPAND}`;
+    const response = await axios.get<CursorPage<InventoryItem>>(url ?? firstPage);
     return response.data;
   } catch (error) {
     throw error;
@@ -154,8 +158,7 @@ const sendPDFByEmail = async (email: string, companyId?: number): Promise<void>
 };
 
 export const inventoryService = {
-  getAll,
-  getByCompany,
+  getPage,
   getById,
   create,
   update,
@@ -43,6 +43,18 @@ const getAll = async (): Promise<Product[]> => {
   }
 };
 
+/**
+ * Obtiene solo el id, el código y el nombre de los productos, para selectores
+ */
+const getOptions = async (): Promise<Pick<Product, 'id' | 'code' | 'name'>[]> => {
+  try {
+    const response = await axios.get<Pick<Product, 'id' | 'code' | 'name'>[]>(`${API_URL}/products/?fields=id,code,name`);
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
 const getById = async (id: number): Promise<Product> => {
   try {
     const response = await axios.get<Product>(`${API_URL}/products/${id}/`);
@@ -80,6 +92,7 @@ const remove = async (id: number): Promise<void> => {
 
 export const productService = {
   getAll,
+  getOptions,
   getById,
   create,
   update,